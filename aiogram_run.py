@@ -5,6 +5,9 @@ from dotenv import load_dotenv
 from create_bot import bot, dp, scheduler, admins, logger
 from handlers.admin_router import admin_router, create_sheduler_jobs
 from middlewares import CommandMiddleware
+from utils.scrap_utils_new import browser_maintenance, session_pool
+from utils.scrap_executor import run_in_scraper, shutdown_scraper
+from utils.page_archive import page_archive
 
 load_dotenv()
 
@@ -15,6 +18,8 @@ logger.info(f"aiogram_run.py: {admins=}")
 
 async def start_bot():
     #await create_tables()
+    # Убираем процессы Chrome и профили, оставшиеся от предыдущего запуска
+    await asyncio.to_thread(browser_maintenance)
     await create_sheduler_jobs()
     for admin_id in admins:
         try:
@@ -24,6 +29,11 @@ async def start_bot():
 
 
 async def stop_bot():
+    # Закрываем браузеры, которые пул держал авторизованными между запусками задач
+    await run_in_scraper(session_pool.close_all)
+    shutdown_scraper()
+    # Дописываем страницы, ещё стоящие в очереди архива
+    await asyncio.to_thread(page_archive.close)
     try:
         for admin_id in admins:
             await bot.send_message(admin_id, 'Бот остановлен!')
@@ -34,6 +44,7 @@ async def main():
     scheduler.start()
     dp.update.middleware(CommandMiddleware())
     dp.startup.register(start_bot)
+    dp.shutdown.register(stop_bot)
     dp.include_router(admin_router)
     await bot.delete_webhook(drop_pending_updates=True)
     await dp.start_polling(bot)
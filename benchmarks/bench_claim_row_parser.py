@@ -0,0 +1,78 @@
+"""
+Сравнение разбора строк таблицы заявок при наполнении базы:
+parse_claim_from_html (отдельное дерево BeautifulSoup на каждую строку)
+и parse_claims_from_html (один разбор lxml на все строки).
+
+Строки берутся из последней страницы new_claims в архиве страниц (бот кладёт её туда
+при FORENSICS_LEVEL=always) и размножаются до --rows. Если страницы нет — используется
+строка-образец с вёрсткой таблицы сайта.
+
+Запуск из корня проекта:
+    python benchmarks/bench_claim_row_parser.py
+    python benchmarks/bench_claim_row_parser.py --rows 5000 --runs 3
+"""
+import os, sys
+
+project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(project_directory)
+
+import argparse
+import statistics
+import time
+from lxml import html as lxml_html
+from utils.scrap_utils_new import parse_claim_from_html, parse_claims_from_html
+from utils.page_archive import page_archive
+
+
+SAMPLE_ROW = """<tr _ngcontent-ng-c1 role="row" class="mat-mdc-row mdc-data-table__row cdk-row">
+<td role="cell" class="mat-mdc-cell cdk-cell cdk-column-id"><span>{claim_id}</span></td>
+<td role="cell" class="mat-mdc-cell cdk-cell cdk-column-created"><span> 23 февраля 2026 14:21 </span></td>
+<td role="cell" class="mat-mdc-cell cdk-cell cdk-column-category-name"><span>Протечка кровли</span></td>
+<td role="cell" class="mat-mdc-cell cdk-cell cdk-column-address-address"><span>г. Москва, ул. Ленина, д. 1, кв. 5</span></td>
+<td role="cell" class="mat-mdc-cell cdk-cell cdk-column-type-description"><div class="claim-type"><span>Аварийная</span><!----></div></td>
+<td role="cell" class="mat-mdc-cell cdk-cell cdk-column-deadline"><span>24 февраля 2026 14:21</span></td>
+<td role="cell" class="mat-mdc-cell cdk-cell cdk-column-status"><div class="claim-status"><span class="claim-status-name">В работе</span></div></td>
+</tr>"""
+
+
+def load_rows(count: int) -> list[str]:
+    html = page_archive.latest(name="new_claims")
+    rows = []
+    if html:
+        document = lxml_html.document_fromstring(html)
+        rows = [lxml_html.tostring(row, encoding="unicode") for row in document.xpath("//tr[contains(@class, 'cdk-row')]")]
+    if not rows:
+        rows = [SAMPLE_ROW.format(claim_id=6180000 + number) for number in range(10)]
+    return [rows[number % len(rows)] for number in range(count)]
+
+
+def measure(func, rows: list[str], runs: int) -> tuple[float, list]:
+    timings = []
+    result = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = func(rows)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=3000, help="количество строк таблицы")
+    parser.add_argument("--runs", type=int, default=3, help="количество замеров каждой реализации")
+    args = parser.parse_args()
+
+    rows = load_rows(args.rows)
+    print(f"Строк: {len(rows)}, замеров: {args.runs}")
+
+    bs4_time, bs4_result = measure(lambda items: [parse_claim_from_html(row) for row in items], rows, args.runs)
+    lxml_time, lxml_result = measure(parse_claims_from_html, rows, args.runs)
+
+    print(f"BeautifulSoup на каждую строку: {bs4_time * 1000:8.1f} мс")
+    print(f"один разбор lxml:               {lxml_time * 1000:8.1f} мс")
+    print(f"Ускорение: x{bs4_time / lxml_time:.1f}")
+    print(f"Результаты совпадают: {bs4_result == lxml_result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Сравнение поиска управляющей компании в карточке заявки:
+прежний find_company_in_html (BeautifulSoup + отдельное выражение на каждую компанию)
+и новый (lxml + одно скомпилированное выражение CompanyMatcher).
+
+Страницы берутся из архива страниц (claim_approve) и из файлов work_parsed_pages/claim_approve_*.html.
+
+Запуск из корня проекта:
+    python benchmarks/bench_company_matcher.py
+    python benchmarks/bench_company_matcher.py --limit 500 --runs 3
+"""
+import os, sys
+
+project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(project_directory)
+
+import argparse
+import glob
+import re
+import statistics
+import time
+from bs4 import BeautifulSoup
+from utils.data_utils import company_matcher, find_company_in_html
+from utils.page_archive import page_archive
+
+
+def find_company_in_html_bs4(html_content: str, company_names: list[str]) -> str | None:
+    """Прежняя реализация find_company_in_html"""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    claim_body = soup.find('div', class_='claim-view__body')
+    if not claim_body:
+        return None
+    body_text_lower = str(claim_body).lower()
+
+    matches = []
+    for company in company_names:
+        pattern = r'\b' + re.escape(company.lower()) + r'\b'
+        for match in re.finditer(pattern, body_text_lower):
+            matches.append({'company': company, 'start': match.start()})
+
+    for match in matches:
+        context = body_text_lower[max(0, match['start'] - 80):match['start']]
+        if re.search(r'\bкому\b', context, re.IGNORECASE):
+            return match['company']
+    return None
+
+
+def load_pages(limit: int) -> list[str]:
+    pages = [page_archive.read(page["sha256"]) for page in page_archive.find(name="claim_approve", limit=limit)]
+    for filename in sorted(glob.glob("work_parsed_pages/claim_approve_*.html"))[:max(0, limit - len(pages))]:
+        with open(filename, 'r', encoding='utf-8') as f:
+            pages.append(f.read())
+    return pages
+
+
+def measure(func, pages: list[str], runs: int) -> tuple[float, list]:
+    timings = []
+    results = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        results = [func(page) for page in pages]
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=200, help="максимум страниц для замера")
+    parser.add_argument("--runs", type=int, default=3, help="количество замеров каждой реализации")
+    args = parser.parse_args()
+
+    pages = load_pages(args.limit)
+    if not pages:
+        sys.exit("Нет сохранённых страниц claim_approve — ни в архиве, ни в work_parsed_pages")
+
+    company_names = company_matcher.company_names
+    print(f"Страниц: {len(pages)}, компаний: {len(company_names)}, замеров: {args.runs}")
+
+    old_time, old_results = measure(lambda page: find_company_in_html_bs4(page, company_names), pages, args.runs)
+    new_time, new_results = measure(find_company_in_html, pages, args.runs)
+
+    mismatches = sum(1 for old, new in zip(old_results, new_results) if old != new)
+    print(f"BeautifulSoup + выражение на компанию: {old_time * 1000 / len(pages):7.2f} мс/страница")
+    print(f"lxml + CompanyMatcher:                 {new_time * 1000 / len(pages):7.2f} мс/страница")
+    print(f"Ускорение: x{old_time / new_time:.1f}")
+    print(f"Расхождений в результатах: {mismatches} из {len(pages)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Сравнение скорости извлечения таблицы новых заявок:
+поячеечный обход через find_element (прежняя реализация collect_new_claims_data)
+и один вызов execute_script (extract_claims_table).
+
+Страница берётся из файла --html (если его нет — последняя страница new_claims из архива страниц;
+бот кладёт её туда при FORENSICS_LEVEL=always) и открывается через file://.
+
+Запуск из корня проекта:
+    python benchmarks/bench_new_claims_extract.py
+    python benchmarks/bench_new_claims_extract.py --html work_parsed_pages/new_claims.html --rows 50 --runs 5
+"""
+import os, sys
+
+project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(project_directory)
+
+import argparse
+import pathlib
+import statistics
+import tempfile
+import time
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from utils.scrap_utils_new import extract_claims_table
+from utils.page_archive import page_archive
+
+
+# Размножает строки таблицы до нужного количества (если в сохранённой странице их мало)
+CLONE_ROWS_JS = """
+const tbody = document.querySelector("tbody[role='rowgroup']");
+const rows = Array.from(tbody.querySelectorAll("tr[role='row']"));
+let i = 0;
+while (tbody.querySelectorAll("tr[role='row']").length < arguments[0]) {
+    tbody.appendChild(rows[i % rows.length].cloneNode(true));
+    i++;
+}
+return tbody.querySelectorAll("tr[role='row']").length;
+"""
+
+
+def collect_by_elements(driver) -> dict:
+    """Прежняя реализация: шесть find_element и .text на каждую строку"""
+    tbody = driver.find_element(By.XPATH, "//tbody[@role='rowgroup']")
+    rows = tbody.find_elements(By.XPATH, ".//tr[@role='row']")
+    xpaths = {
+        "claim_id": ".//td[contains(@class, 'cdk-column-id')]//span",
+        "appeal_date": ".//td[contains(@class, 'cdk-column-created')]//span",
+        "description": ".//td[contains(@class, 'cdk-column-category-name')]//span",
+        "address": ".//td[contains(@class, 'cdk-column-address-address')]//span",
+        "urgency": ".//td[contains(@class, 'cdk-column-type-description')]//div[@class='claim-type']//span",
+        "due_date": ".//td[contains(@class, 'cdk-column-deadline')]//span",
+    }
+    claims_data = {}
+    for row in rows:
+        values = {}
+        for field, xpath in xpaths.items():
+            try:
+                values[field] = row.find_element(By.XPATH, xpath).text.strip()
+            except Exception:
+                values[field] = "N/A"
+        claims_data[values.pop("claim_id")] = values
+    return claims_data
+
+
+def collect_by_script(driver) -> dict:
+    """Новая реализация: один execute_script"""
+    claims_data = {}
+    for row in extract_claims_table(driver):
+        claims_data[row["claim_id"]] = {
+            "appeal_date": row["appeal_date"],
+            "description": row["description"],
+            "address": row["address"],
+            "urgency": row["urgency"],
+            "due_date": row["due_date"]
+        }
+    return claims_data
+
+
+def measure(func, driver, runs: int) -> tuple[float, dict]:
+    timings = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = func(driver)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--html", default="work_parsed_pages/new_claims.html", help="сохранённая страница новых заявок")
+    parser.add_argument("--rows", type=int, default=50, help="довести количество строк таблицы до этого числа")
+    parser.add_argument("--runs", type=int, default=5, help="количество замеров каждой реализации")
+    args = parser.parse_args()
+
+    html_path = pathlib.Path(args.html).resolve()
+    if not html_path.exists():
+        html = page_archive.latest(name="new_claims")
+        if html is None:
+            sys.exit(f"Не найден файл {html_path} и страница new_claims в архиве — запустите бота с FORENSICS_LEVEL=always")
+        html_path = pathlib.Path(tempfile.gettempdir()) / "new_claims.html"
+        html_path.write_text(html, encoding="utf-8")
+
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    driver = webdriver.Chrome(options=options)
+    try:
+        driver.get(html_path.as_uri())
+        rows = driver.execute_script(CLONE_ROWS_JS, args.rows)
+        print(f"Строк в таблице: {rows}, замеров: {args.runs}")
+
+        elements_time, elements_result = measure(collect_by_elements, driver, args.runs)
+        script_time, script_result = measure(collect_by_script, driver, args.runs)
+
+        print(f"find_element по ячейкам: {elements_time * 1000:8.1f} мс")
+        print(f"один execute_script:     {script_time * 1000:8.1f} мс")
+        print(f"Ускорение: x{elements_time / script_time:.1f}")
+        print(f"Результаты совпадают: {elements_result == script_result}")
+    finally:
+        driver.quit()
+
+
+if __name__ == "__main__":
+    main()
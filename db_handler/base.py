@@ -6,12 +6,25 @@ project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."
 sys.path.append(project_directory)
 
 import json
+import time
 
 from db_handler.models import Claim
 from db_handler.db_class import engine, Base, async_session
 from create_bot import logger
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sqlalchemy import select
+from sqlalchemy import select, delete, insert, or_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+
+# Количество заявок в одном INSERT ... ON CONFLICT при наполнении базы
+BACKFILL_BATCH_SIZE = int(os.getenv("BACKFILL_BATCH_SIZE", 500))
+
+# Диалекты, поддерживающие INSERT ... ON CONFLICT (claim_id) DO UPDATE
+UPSERT_INSERTS = {
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert,
+}
 
 
 
@@ -122,6 +135,73 @@ async def add_new_claims(session, new_claims_by_company: dict, batch_size: int =
 
 
 
+@connection
+async def upsert_claims(session, claims: List[dict], batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    Добавляет или обновляет заявки пакетами: один многострочный
+    INSERT ... ON CONFLICT (claim_id) DO UPDATE и одна транзакция на пакет.
+    Для диалектов без ON CONFLICT пакет записывается как DELETE + INSERT.
+
+    Args:
+        claims (List[dict]): заявки в формате add_new_claim (обязательно поле claim_id)
+        batch_size (int): количество заявок в одном запросе
+
+    Returns:
+        int: количество записанных заявок
+    """
+    columns = {column.name for column in Claim.__table__.columns} - {"id"}
+    # Повтор заявки внутри пакета недопустим для ON CONFLICT — оставляем последнюю версию
+    unique_claims = {claim["claim_id"]: claim for claim in claims if claim.get("claim_id")}
+    rows = [{key: value for key, value in claim.items() if key in columns} for claim in unique_claims.values()]
+    if not rows:
+        return 0
+
+    make_insert = UPSERT_INSERTS.get(engine.dialect.name)
+    started = time.perf_counter()
+    total_written = 0
+
+    for i in range(0, len(rows), batch_size):
+        batch = rows[i:i + batch_size]
+        # Все строки многострочного INSERT должны иметь одинаковый набор полей
+        batch_columns = sorted({key for row in batch for key in row})
+        batch = [{key: row.get(key) for key in batch_columns} for row in batch]
+        try:
+            async with session.begin():
+                if make_insert is not None:
+                    statement = make_insert(Claim).values(batch)
+                    statement = statement.on_conflict_do_update(
+                        index_elements=[Claim.claim_id],
+                        set_={key: statement.excluded[key] for key in batch_columns if key != "claim_id"}
+                    )
+                    await session.execute(statement)
+                else:
+                    await session.execute(delete(Claim).where(Claim.claim_id.in_([row["claim_id"] for row in batch])))
+                    await session.execute(insert(Claim), batch)
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка в пакете {i//batch_size + 1} при записи заявок: {e}")
+            raise
+        total_written += len(batch)
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"Записано {total_written} заявок пакетами по {batch_size} за {elapsed:.2f} сек "
+        f"({total_written / elapsed if elapsed else 0:.0f} заявок/сек)"
+    )
+    return total_written
+
+
+@connection
+async def get_accepted_claim_ids(session, new_status: str = "Новая") -> List[str]:
+    """Возвращает номера сохранённых в базе заявок, которые уже не в статусе new_status (приняты в работу)"""
+    try:
+        return list((await session.execute(
+            select(Claim.claim_id).where(or_(Claim.status.is_(None), Claim.status != new_status))
+        )).scalars().all())
+    except SQLAlchemyError as e:
+        logger.error(f"Произошла ошибка при получении номеров заявок: {e}")
+        return []
+
+
 @connection
 async def get_all_not_closed_claims(session):
     """Возвращает список не завершенных работой заявок"""
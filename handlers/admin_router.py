@@ -5,7 +5,8 @@ from dotenv import load_dotenv
 
 from db_handler.base import get_claims_by_company_from_db
 from utils.data_utils import get_details_of_exceeded_claims, get_info_from_site_to_compare, process_and_update_claims, transform_claims_by_status
-from utils.scrap_utils_new import find_info_of_new_claims
+from utils.scrap_utils_new import browser_maintenance, find_info_of_new_claims
+from utils.known_claims import ACCEPTED_CLAIM_STATUS
 
 project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(project_directory)
@@ -78,6 +79,13 @@ async def create_sheduler_jobs():
         }
     )
 
+    # Уборка осиротевших процессов Chrome и профилей, пересоздание тяжёлых браузеров
+    scheduler.add_job(
+        browser_maintenance_sheduler,
+        trigger="interval",
+        minutes=int(os.getenv("BROWSER_MAINTENANCE_INTERVAL", 30)),
+    )
+
 
 async def send_long_message_to_group(
     bot: Bot,
@@ -225,6 +233,22 @@ async def go_to_admin_menu(callback: CallbackQuery):
 
 
 
+def new_claims_message(new_claims_by_company: dict) -> str:
+    """Текст отчёта о новых заявках: принятые в работу и оставшиеся новыми — отдельно"""
+    accepted_text = ''
+    pending_text = ''
+    for company, info in new_claims_by_company.items():
+        for claim_id, details in (info or {}).items():
+            claim_info = f"<b>Тип:</b>{details.get('urgency')}\n<b>Срок ответа исполнителя:</b>{details.get('due_date')}\n\n"
+            if details.get('status') == ACCEPTED_CLAIM_STATUS:
+                accepted_text += emoji.emojize(f":NEW_button: <b>Новая заявка</b> для УК {company} ID {claim_id}\n:check_mark_button: Статус заявки для УК {company} ID {claim_id} - <b>В работе</b>\n{claim_info}")
+            else:
+                pending_text += emoji.emojize(f":NEW_button: <b>Новая заявка</b> для УК {company} ID {claim_id}\n:warning: Статус заявки для УК {company} ID {claim_id} - <b>Новая / не принята</b>\n{claim_info}")
+    if pending_text:
+        pending_text = "<b>Не удалось принять в работу, повторим при следующей проверке:</b>\n\n" + pending_text
+    return accepted_text + pending_text
+
+
 @admin_router.callback_query(lambda c: c.data == "new_claims")
 async def check_new_claims_handler(callback: CallbackQuery):
     """Проверяет наличие новых заявок и принимает их в работу, а также
@@ -233,13 +257,8 @@ async def check_new_claims_handler(callback: CallbackQuery):
         await callback.message.bot.send_message(chat_id=GROUP_CHAT_ID, text="Приступили к поиску новых заявок. Подождите...")
         await callback.answer("ok")
         new_claims_by_company = await find_info_of_new_claims()
-        text_message = ''
         if new_claims_by_company:
-            for company, info in new_claims_by_company.items():
-                #text_message += f"**{company.upper()}**\n"
-                if info:
-                    for claim_id, details in info.items():
-                        text_message += emoji.emojize(f":NEW_button: <b>Новая заявка</b> для УК {company} ID {claim_id}\n:check_mark_button: Статус заявки для УК {company} ID {claim_id} - <b>В работе</b>\n<b>Тип:</b>{details.get('urgency')}\n<b>Срок ответа исполнителя:</b>{details.get('due_date')}\n\n")
+            text_message = new_claims_message(new_claims_by_company)
             if text_message:
                 await callback.message.bot.send_message(chat_id=GROUP_CHAT_ID,text=text_message)
         await callback.message.bot.send_message(chat_id=GROUP_CHAT_ID, text="Поиск новых заявок завершен!")
@@ -250,19 +269,22 @@ async def check_new_claims_handler(callback: CallbackQuery):
         await callback.answer("ok")
 
 
+async def browser_maintenance_sheduler():
+    """Периодическое обслуживание браузеров (в отдельном потоке — psutil и удаление файлов блокируют)"""
+    try:
+        await asyncio.to_thread(browser_maintenance)
+    except Exception as e:
+        logger.error(f'Ошибка при обслуживании браузеров: {e}')
+
+
 async def check_new_claims_sheduler(bot: Bot):
     """Проверяет наличие новых заявок и принимает их в работу, а также
     добавляет в базу данных о расписанию"""
     try:
         await bot.send_message(chat_id=GROUP_CHAT_ID, text="Приступили к поиску новых заявок. Подождите...")
         new_claims_by_company = await find_info_of_new_claims()
-        text_message = ''
         if new_claims_by_company:
-            for company, info in new_claims_by_company.items():
-                #text_message += f"**{company.upper()}**\n"
-                if info:
-                    for claim_id, details in info.items():
-                        text_message += emoji.emojize(f":NEW_button: <b>Новая заявка</b> для УК {company} ID {claim_id}\n:check_mark_button: Статус заявки для УК {company} ID {claim_id} - <b>В работе</b>\n<b>Тип:</b>{details.get('urgency')}\n<b>Срок ответа исполнителя:</b>{details.get('due_date')}\n\n")
+            text_message = new_claims_message(new_claims_by_company)
             if text_message:
                 await bot.send_message(chat_id=GROUP_CHAT_ID,text=text_message)
         await bot.send_message(chat_id=GROUP_CHAT_ID, text="Поиск новых заявок завершен!")
@@ -1,6 +1,8 @@
 # redis_db.py
 import redis
 import os
+import json
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -47,7 +49,161 @@ class RedisDB:
         except Exception as e:
             print(f"Ошибка при проверке процесса: {e}")
             return False
-    
+
+    def save_auth_session(self, company_name: str, auth_state: dict, ttl: int) -> bool:
+        """
+        Сохраняет cookies и localStorage авторизованной сессии управляющей компании.
+
+        Args:
+            company_name (str): название управляющей компании.
+            auth_state (dict): {"cookies": [...], "local_storage": {...}}.
+            ttl (int): время жизни записи в секундах.
+
+        Returns:
+            bool: True, если запись сохранена.
+        """
+        try:
+            key = f"auth_session:{company_name.lower()}"
+            return bool(self.redis_client.set(key, json.dumps(auth_state, ensure_ascii=False), ex=ttl))
+        except Exception as e:
+            print(f"Ошибка при сохранении сессии авторизации: {e}")
+            return False
+
+    def get_auth_session(self, company_name: str) -> dict | None:
+        """Возвращает сохранённую сессию авторизации компании или None, если её нет или срок истёк."""
+        try:
+            raw = self.redis_client.get(f"auth_session:{company_name.lower()}")
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            print(f"Ошибка при получении сессии авторизации: {e}")
+            return None
+
+    def delete_auth_session(self, company_name: str) -> bool:
+        """Удаляет сохранённую сессию авторизации компании."""
+        try:
+            return bool(self.redis_client.delete(f"auth_session:{company_name.lower()}"))
+        except Exception as e:
+            print(f"Ошибка при удалении сессии авторизации: {e}")
+            return False
+
+    def get_selector_winners(self) -> dict:
+        """Возвращает сохранённые победившие стратегии поиска элементов {действие: ключ стратегии}."""
+        try:
+            return self.redis_client.hgetall("selector_winners")
+        except Exception as e:
+            print(f"Ошибка при получении стратегий поиска элементов: {e}")
+            return {}
+
+    def set_selector_winner(self, action: str, strategy_key: str) -> bool:
+        """Сохраняет стратегию, которая последней сработала для действия."""
+        try:
+            self.redis_client.hset("selector_winners", action, strategy_key)
+            return True
+        except Exception as e:
+            print(f"Ошибка при сохранении стратегии поиска элементов: {e}")
+            return False
+
+    def get_claims_list_url(self, company_name: str) -> str | None:
+        """Возвращает запомненный адрес запроса списка заявок компании (для выгрузки через API)."""
+        try:
+            return self.redis_client.get(f"claims_list_url:{company_name.lower()}")
+        except Exception as e:
+            print(f"Ошибка при получении адреса списка заявок: {e}")
+            return None
+
+    def set_claims_list_url(self, company_name: str, url: str) -> bool:
+        """Запоминает адрес запроса списка заявок компании, перехваченный в браузере."""
+        try:
+            self.redis_client.set(f"claims_list_url:{company_name.lower()}", url)
+            return True
+        except Exception as e:
+            print(f"Ошибка при сохранении адреса списка заявок: {e}")
+            return False
+
+    def record_new_claims_probe(self, company_name: str, count: int | None, history_size: int = 1000) -> bool:
+        """
+        Сохраняет результат проверки счётчика «Новые:» для метрик:
+        последнее значение по компании и общую историю проверок.
+        """
+        try:
+            probe = {"company": company_name, "count": count, "ts": int(time.time())}
+            pipe = self.redis_client.pipeline()
+            pipe.hset("new_claims_probe:last", company_name, json.dumps(probe, ensure_ascii=False))
+            pipe.lpush("new_claims_probe:history", json.dumps(probe, ensure_ascii=False))
+            pipe.ltrim("new_claims_probe:history", 0, history_size - 1)
+            pipe.hincrby("new_claims_probe:stats", f"{company_name}:{'empty' if count == 0 else 'not_empty'}", 1)
+            pipe.execute()
+            return True
+        except Exception as e:
+            print(f"Ошибка при сохранении проверки новых заявок: {e}")
+            return False
+
+    def replace_known_claims(self, claim_ids: list, ttl: int, chunk_size: int = 5000) -> bool:
+        """
+        Полностью заменяет множество известных номеров заявок (claim_id из таблицы claims).
+        Множество собирается во временном ключе и подменяется атомарно.
+
+        Args:
+            claim_ids (list): номера всех заявок в базе.
+            ttl (int): через сколько секунд множество нужно прогреть заново.
+        """
+        try:
+            tmp_key = "known_claims:tmp"
+            pipe = self.redis_client.pipeline()
+            pipe.delete(tmp_key)
+            for i in range(0, len(claim_ids), chunk_size):
+                pipe.sadd(tmp_key, *[str(claim_id) for claim_id in claim_ids[i:i + chunk_size]])
+            if claim_ids:
+                pipe.rename(tmp_key, "known_claims")
+            else:
+                pipe.delete("known_claims")
+            pipe.set("known_claims:warmed", 1, ex=ttl)
+            pipe.execute()
+            return True
+        except Exception as e:
+            print(f"Ошибка при заполнении множества известных заявок: {e}")
+            return False
+
+    def is_known_claims_warmed(self) -> bool:
+        """True, если множество известных заявок прогрето и ещё не устарело."""
+        try:
+            return bool(self.redis_client.exists("known_claims:warmed"))
+        except Exception as e:
+            print(f"Ошибка при проверке множества известных заявок: {e}")
+            return False
+
+    def add_known_claims(self, claim_ids: list) -> bool:
+        """Добавляет номера заявок в множество известных."""
+        if not claim_ids:
+            return True
+        try:
+            self.redis_client.sadd("known_claims", *[str(claim_id) for claim_id in claim_ids])
+            return True
+        except Exception as e:
+            print(f"Ошибка при добавлении известных заявок: {e}")
+            return False
+
+    def remove_known_claims(self, claim_ids: list) -> int:
+        """Убирает номера заявок из множества известных; возвращает, сколько их там было."""
+        if not claim_ids:
+            return 0
+        try:
+            return self.redis_client.srem("known_claims", *[str(claim_id) for claim_id in claim_ids])
+        except Exception as e:
+            print(f"Ошибка при удалении известных заявок: {e}")
+            return 0
+
+    def get_known_claims(self, claim_ids: list) -> set:
+        """Возвращает те номера из claim_ids, которые уже есть в базе (одним запросом SMISMEMBER)."""
+        if not claim_ids:
+            return set()
+        try:
+            claim_ids = [str(claim_id) for claim_id in claim_ids]
+            flags = self.redis_client.smismember("known_claims", claim_ids)
+            return {claim_id for claim_id, known in zip(claim_ids, flags) if known}
+        except Exception as e:
+            print(f"Ошибка при проверке известных заявок: {e}")
+            return set()
     
     
 
@@ -0,0 +1,169 @@
+import os, sys
+
+project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(project_directory)
+
+import json
+import time
+from create_bot import logger
+from redis_db import redis_db
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+# Сколько событий хранится в потоке журнала (приблизительно)
+ACCEPTANCE_JOURNAL_MAXLEN = int(os.getenv("ACCEPTANCE_JOURNAL_MAXLEN", 10000))
+
+STREAM_KEY = "acceptance_journal"
+
+# Этапы обработки новой заявки
+STAGE_INTENT = "intent"            # начали обработку, «В работу» ещё не нажата
+STAGE_CLICK_FAILED = "click_failed"  # кнопку «В работу» нажать не удалось
+STAGE_ACCEPTED = "accepted"        # кнопка «В работу» нажата
+STAGE_SAVED = "saved"              # карточка после принятия сохранена, компания определена
+ACCEPTED_STAGES = (STAGE_ACCEPTED, STAGE_SAVED)
+
+
+class AcceptanceJournal:
+    """
+    Журнал предзаписи принятия заявок «В работу».
+
+    Каждый шаг (намерение, результат нажатия, сохранённая карточка) записывается сразу,
+    как только он произошёл: событие — в поток Redis acceptance_journal (история),
+    текущий этап — в hash acceptance_state:{компания}. Запись заявки удаляется из hash,
+    когда заявка сохранена в базу (committed).
+
+    После падения бота принятые, но не сохранённые в базу заявки возвращает uncommitted(),
+    а is_accepted() не даёт нажать «В работу» повторно.
+
+    Через subscribe() можно получать заявку сразу после сохранения её карточки —
+    чтобы записывать её в базу, не дожидаясь обработки остальных заявок компании.
+    """
+
+    def __init__(self):
+        # компания -> callback(claim_id, claim) для заявок, чья карточка сохранена
+        self._subscribers = dict()
+
+    @staticmethod
+    def _state_key(company_name: str | None) -> str:
+        return f"acceptance_state:{(company_name or 'unknown').lower()}"
+
+    def _write(self, company_name: str | None, claim_id: str, stage: str, **fields):
+        claim_id = str(claim_id)
+        state_key = self._state_key(company_name)
+        try:
+            raw = redis_db.redis_client.hget(state_key, claim_id)
+            record = json.loads(raw) if raw else {"claim_id": claim_id, "company": company_name}
+            record.update(fields)
+            record.update(stage=stage, ts=int(time.time()))
+
+            pipe = redis_db.redis_client.pipeline()
+            pipe.xadd(
+                STREAM_KEY,
+                {"company": company_name or "", "claim_id": claim_id, "stage": stage,
+                 "data": json.dumps(fields, ensure_ascii=False)},
+                maxlen=ACCEPTANCE_JOURNAL_MAXLEN,
+                approximate=True
+            )
+            pipe.hset(state_key, claim_id, json.dumps(record, ensure_ascii=False))
+            pipe.execute()
+            return record
+        except Exception as e:
+            logger.error(f"Не удалось записать в журнал принятия заявку {claim_id} ({stage}): {e}")
+            return None
+
+    @staticmethod
+    def _claim_from_record(record: dict) -> dict | None:
+        """Заявка из записи журнала в формате add_new_claims (без claim_id)"""
+        if not record.get("claim"):
+            return None
+        claim = dict(record["claim"])
+        detail = record.get("detail") or {}
+        if detail.get("company_name"):
+            claim["company_name"] = detail["company_name"]
+        return claim
+
+    def subscribe(self, company_name: str | None, callback):
+        """Вызывать callback(claim_id, claim) для каждой заявки компании, чья карточка сохранена"""
+        self._subscribers[(company_name or "unknown").lower()] = callback
+
+    def unsubscribe(self, company_name: str | None):
+        self._subscribers.pop((company_name or "unknown").lower(), None)
+
+    def intent(self, company_name: str | None, claim_id: str, claim_data: dict | None = None):
+        """Перед открытием карточки: запоминаем данные заявки из таблицы"""
+        self._write(company_name, claim_id, STAGE_INTENT, claim=claim_data or {})
+
+    def clicked(self, company_name: str | None, claim_id: str, success: bool):
+        """Результат нажатия «В работу»"""
+        self._write(company_name, claim_id, STAGE_ACCEPTED if success else STAGE_CLICK_FAILED)
+
+    def saved(self, company_name: str | None, claim_id: str, approve_info: dict):
+        """Карточка после принятия сохранена"""
+        record = self._write(company_name, claim_id, STAGE_SAVED, detail={
+            "company_name": approve_info.get("company_name"),
+            "url": approve_info.get("url"),
+            "html_file": approve_info.get("html_file"),
+        })
+        callback = self._subscribers.get((company_name or "unknown").lower())
+        claim = self._claim_from_record(record) if record and callback else None
+        if claim is not None:
+            try:
+                callback(str(claim_id), claim)
+            except Exception as e:
+                # Заявка останется в журнале и будет записана в базу после обработки компании
+                logger.error(f"Не удалось передать на запись заявку {claim_id}: {e}")
+
+    def committed(self, company_name: str | None, claim_ids):
+        """Заявки сохранены в базу — убираем их из текущего состояния"""
+        claim_ids = [str(claim_id) for claim_id in claim_ids or []]
+        if not claim_ids:
+            return
+        try:
+            pipe = redis_db.redis_client.pipeline()
+            for claim_id in claim_ids:
+                pipe.xadd(
+                    STREAM_KEY,
+                    {"company": company_name or "", "claim_id": claim_id, "stage": "committed", "data": "{}"},
+                    maxlen=ACCEPTANCE_JOURNAL_MAXLEN,
+                    approximate=True
+                )
+            pipe.hdel(self._state_key(company_name), *claim_ids)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Не удалось отметить в журнале сохранение заявок {claim_ids}: {e}")
+
+    def get_state(self, company_name: str | None) -> dict:
+        """Текущие (ещё не сохранённые в базу) записи компании: {claim_id: запись}"""
+        try:
+            raw = redis_db.redis_client.hgetall(self._state_key(company_name))
+            return {claim_id: json.loads(record) for claim_id, record in raw.items()}
+        except Exception as e:
+            logger.error(f"Не удалось прочитать журнал принятия заявок УК {company_name}: {e}")
+            return {}
+
+    def is_accepted(self, company_name: str | None, claim_id: str) -> bool:
+        """True, если «В работу» по заявке уже нажата, но заявка ещё не сохранена в базу"""
+        try:
+            raw = redis_db.redis_client.hget(self._state_key(company_name), str(claim_id))
+        except Exception:
+            return False
+        return bool(raw) and json.loads(raw).get("stage") in ACCEPTED_STAGES
+
+    def uncommitted(self, company_name: str | None) -> dict:
+        """
+        Принятые «В работу», но не сохранённые в базу заявки (после падения прошлого запуска)
+        в формате add_new_claims: {claim_id: {"appeal_date", ..., "company_name"}}.
+        """
+        claims = dict()
+        for claim_id, record in self.get_state(company_name).items():
+            if record.get("stage") not in ACCEPTED_STAGES:
+                continue
+            claim = self._claim_from_record(record)
+            if claim is not None:
+                claims[claim_id] = claim
+        return claims
+
+
+acceptance_journal = AcceptanceJournal()
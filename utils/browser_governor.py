@@ -0,0 +1,312 @@
+import os, sys
+
+project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(project_directory)
+
+import glob
+import json
+import shutil
+import tempfile
+import threading
+import time
+import psutil
+from create_bot import logger
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+# Максимальное количество одновременно запущенных браузеров
+MAX_BROWSERS = int(os.getenv("MAX_BROWSERS", os.getenv("SCRAP_WORKERS", 3)))
+# Сколько ждать свободного места под новый браузер, сек
+BROWSER_ACQUIRE_TIMEOUT = int(os.getenv("BROWSER_ACQUIRE_TIMEOUT", 300))
+# Порог памяти дерева процессов одного браузера (chromedriver + chrome), МБ
+BROWSER_MAX_RSS_MB = int(os.getenv("BROWSER_MAX_RSS_MB", 1500))
+# Процессы и профили моложе этого возраста не считаются осиротевшими (браузер может ещё запускаться), сек
+ORPHAN_GRACE_PERIOD = int(os.getenv("ORPHAN_GRACE_PERIOD", 120))
+
+PROFILE_PREFIX = "selenium_profile_"
+# Директория профилей браузеров этого бота: chrome с профилем в ней запущен только ботом
+BROWSER_PROFILE_ROOT = os.path.abspath(
+    os.getenv("BROWSER_PROFILE_ROOT", os.path.join(tempfile.gettempdir(), "raduga_browser_profiles"))
+)
+# Файл с процессами запущенных ботом браузеров — по нему после перезапуска бота находятся
+# процессы, оставшиеся от прошлого запуска
+BROWSER_PIDS_FILE = os.getenv("BROWSER_PIDS_FILE", os.path.join(BROWSER_PROFILE_ROOT, "browsers.json"))
+CHROME_PROCESS_NAMES = ("chrome", "chromium", "chrome_crashpad_handler")
+CHROMEDRIVER_PROCESS_NAMES = ("chromedriver",)
+
+
+class BrowserGovernor:
+    """
+    Следит за ресурсами, которые занимают браузеры:
+    - ограничивает количество одновременно живых драйверов (лишние запросы ждут в очереди);
+    - считает память дерева процессов каждого браузера и подсказывает, когда его пора пересоздать;
+    - убивает осиротевшие процессы chromedriver/chrome, запущенные этим ботом, и удаляет
+      брошенные профили selenium_profile_* из BROWSER_PROFILE_ROOT.
+
+    Чужие браузеры не трогаются: chromedriver считается своим, только если его pid и время
+    запуска записаны в BROWSER_PIDS_FILE, chrome — только если его профиль лежит в BROWSER_PROFILE_ROOT.
+
+    Args:
+        max_browsers: максимальное количество живых драйверов
+        max_rss_mb: порог памяти одного браузера, МБ
+    """
+
+    def __init__(self, max_browsers: int = MAX_BROWSERS, max_rss_mb: int = BROWSER_MAX_RSS_MB):
+        self.max_browsers = max_browsers
+        self.max_rss_mb = max_rss_mb
+        self._slots = threading.BoundedSemaphore(max_browsers)
+        # id(driver) -> {"driver", "pid", "browser_pids", "profile_dir", "created"}
+        self._drivers: dict[int, dict] = {}
+        self._lock = threading.Lock()
+        # Процессы chromedriver прошлого запуска бота: [{"pid", "create_time", "browser_pids", "profile_dir"}, ...]
+        self._previous_run = self._read_pids_file()
+        # Функция без аргументов, освобождающая простаивающий браузер; возвращает True, если что-то закрыто
+        self.release_idle = None
+
+    def acquire_slot(self, timeout: float = BROWSER_ACQUIRE_TIMEOUT):
+        """
+        Занимает место под новый браузер. Пока мест нет — ждёт в очереди,
+        периодически прося пул закрыть простаивающий браузер.
+        """
+        deadline = time.monotonic() + timeout
+        queued = False
+        while not self._slots.acquire(timeout=1):
+            if not queued:
+                logger.info(f"Запущено максимальное количество браузеров ({self.max_browsers}) — ожидаем освобождения")
+                queued = True
+            if self.release_idle is not None:
+                try:
+                    self.release_idle()
+                except Exception as e:
+                    logger.warning(f"Не удалось освободить простаивающий браузер: {e}")
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Не дождались свободного места под браузер за {timeout} сек")
+
+    def release_slot(self):
+        try:
+            self._slots.release()
+        except ValueError:
+            logger.warning("Попытка освободить лишнее место под браузер")
+
+    @staticmethod
+    def new_profile_dir() -> str:
+        """Создаёт директорию профиля нового браузера в BROWSER_PROFILE_ROOT"""
+        os.makedirs(BROWSER_PROFILE_ROOT, exist_ok=True)
+        return tempfile.mkdtemp(prefix=PROFILE_PREFIX, dir=BROWSER_PROFILE_ROOT)
+
+    def register(self, driver, profile_dir: str | None = None):
+        """Запоминает запущенный драйвер, процессы chromedriver и chrome и директорию профиля"""
+        try:
+            pid = driver.service.process.pid
+        except Exception:
+            pid = None
+        processes = self._process_tree(pid) if pid else []
+        with self._lock:
+            self._drivers[id(driver)] = {
+                "driver": driver,
+                "pid": pid,
+                "create_time": self._create_time(processes[0]) if processes else None,
+                "browser_pids": [process.pid for process in processes[1:]],
+                "profile_dir": os.path.abspath(profile_dir) if profile_dir else None,
+                "created": time.time(),
+            }
+            self._write_pids_file()
+
+    def unregister(self, driver) -> dict | None:
+        with self._lock:
+            info = self._drivers.pop(id(driver), None)
+            if info is not None:
+                self._write_pids_file()
+            return info
+
+    @staticmethod
+    def _create_time(process) -> float | None:
+        try:
+            return process.create_time()
+        except psutil.Error:
+            return None
+
+    def _read_pids_file(self) -> list[dict]:
+        try:
+            with open(BROWSER_PIDS_FILE, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _write_pids_file(self):
+        """Сохраняет процессы живых браузеров и ещё не убранных браузеров прошлого запуска (под self._lock)"""
+        records = list(self._previous_run) + [
+            {key: info[key] for key in ("pid", "create_time", "browser_pids", "profile_dir")}
+            for info in self._drivers.values() if info["pid"]
+        ]
+        try:
+            os.makedirs(os.path.dirname(BROWSER_PIDS_FILE) or ".", exist_ok=True)
+            with open(BROWSER_PIDS_FILE, "w", encoding="utf-8") as f:
+                json.dump(records, f)
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить процессы браузеров в {BROWSER_PIDS_FILE}: {e}")
+
+    def quit(self, driver):
+        """Закрывает драйвер, освобождает его место и удаляет профиль"""
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Ошибка при закрытии драйвера: {e}")
+        info = self.unregister(driver)
+        if info is None:
+            return
+        if info["pid"]:
+            # chrome иногда переживает driver.quit() — добиваем дерево процессов
+            self._kill_tree(info["pid"])
+        if info["profile_dir"]:
+            shutil.rmtree(info["profile_dir"], ignore_errors=True)
+        self.release_slot()
+
+    @staticmethod
+    def _process_tree(pid: int) -> list:
+        try:
+            root = psutil.Process(pid)
+            return [root] + root.children(recursive=True)
+        except psutil.Error:
+            return []
+
+    def _kill_tree(self, pid: int):
+        processes = self._process_tree(pid)
+        for process in processes:
+            try:
+                process.kill()
+            except psutil.Error:
+                pass
+        psutil.wait_procs(processes, timeout=5)
+
+    def driver_rss_mb(self, driver) -> float:
+        """Память всего дерева процессов браузера (chromedriver и все процессы chrome), МБ"""
+        with self._lock:
+            info = self._drivers.get(id(driver))
+        if info is None or not info["pid"]:
+            return 0.0
+        rss = 0
+        for process in self._process_tree(info["pid"]):
+            try:
+                rss += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return rss / (1024 * 1024)
+
+    def needs_recycle(self, driver) -> bool:
+        """True, если браузер занял больше памяти, чем BROWSER_MAX_RSS_MB"""
+        rss_mb = self.driver_rss_mb(driver)
+        if rss_mb > self.max_rss_mb:
+            logger.info(f"Браузер занимает {rss_mb:.0f} МБ (порог {self.max_rss_mb} МБ) — пересоздаём")
+            return True
+        return False
+
+    def _tracked_pids(self) -> set:
+        tracked = set()
+        with self._lock:
+            pids = [info["pid"] for info in self._drivers.values() if info["pid"]]
+        for pid in pids:
+            tracked.update(process.pid for process in self._process_tree(pid))
+        return tracked
+
+    def _is_own_process(self, process, record: dict) -> bool:
+        """Процесс — тот самый, что записан в record (pid мог достаться другому процессу)"""
+        create_time = self._create_time(process)
+        return create_time is not None and record.get("create_time") is not None \
+            and abs(create_time - record["create_time"]) < 1
+
+    def _tracked_profiles(self) -> set:
+        with self._lock:
+            return {os.path.abspath(info["profile_dir"]) for info in self._drivers.values() if info["profile_dir"]}
+
+    def reap_orphans(self) -> int:
+        """
+        Убивает процессы chromedriver/chrome этого бота, не принадлежащие ни одному живому драйверу:
+        chromedriver и chrome, записанные в BROWSER_PIDS_FILE прошлым запуском бота, дочерние
+        chromedriver самого бота и chrome с профилем в BROWSER_PROFILE_ROOT.
+
+        Returns:
+            int: количество завершённых процессов
+        """
+        tracked = self._tracked_pids()
+        own_pid = os.getpid()
+        now = time.time()
+        orphans = []
+
+        # Браузеры прошлого запуска: pid сверяется со временем запуска, чтобы не убить чужой процесс
+        with self._lock:
+            previous_run, self._previous_run = self._previous_run, []
+            self._write_pids_file()
+        for record in previous_run:
+            try:
+                process = psutil.Process(record["pid"])
+                if process.pid not in tracked and self._is_own_process(process, record):
+                    orphans.extend(self._process_tree(process.pid))
+            except (psutil.Error, KeyError, TypeError):
+                pass
+            # chrome переживает свой chromedriver — проверяем, что процесс всё ещё с профилем этого браузера
+            for browser_pid in record.get("browser_pids") or []:
+                try:
+                    browser = psutil.Process(browser_pid)
+                    if record.get("profile_dir") and record["profile_dir"] in " ".join(browser.cmdline()):
+                        orphans.append(browser)
+                except psutil.Error:
+                    continue
+        orphan_pids = {process.pid for process in orphans}
+
+        for process in psutil.process_iter(["pid", "ppid", "name", "cmdline", "create_time"]):
+            info = process.info
+            if info["pid"] in tracked or info["pid"] in orphan_pids \
+                    or now - (info["create_time"] or now) < ORPHAN_GRACE_PERIOD:
+                continue
+            name = (info["name"] or "").lower()
+            cmdline = " ".join(info["cmdline"] or [])
+            if name.startswith(CHROMEDRIVER_PROCESS_NAMES) and info["ppid"] == own_pid:
+                orphans.append(process)
+            elif name.startswith(CHROME_PROCESS_NAMES) and os.path.join(BROWSER_PROFILE_ROOT, PROFILE_PREFIX) in cmdline:
+                orphans.append(process)
+
+        orphans = list({process.pid: process for process in orphans}.values())
+        for process in orphans:
+            try:
+                process.kill()
+            except psutil.Error:
+                pass
+        psutil.wait_procs(orphans, timeout=5)
+        if orphans:
+            logger.warning(f"Завершено осиротевших процессов браузера: {len(orphans)}")
+        return len(orphans)
+
+    def cleanup_stale_profiles(self) -> int:
+        """Удаляет директории selenium_profile_* в BROWSER_PROFILE_ROOT, не принадлежащие живым драйверам"""
+        tracked = self._tracked_profiles()
+        now = time.time()
+        removed = 0
+        for profile_dir in glob.glob(os.path.join(BROWSER_PROFILE_ROOT, f"{PROFILE_PREFIX}*")):
+            profile_dir = os.path.abspath(profile_dir)
+            if profile_dir in tracked:
+                continue
+            try:
+                if now - os.path.getmtime(profile_dir) < ORPHAN_GRACE_PERIOD:
+                    continue
+            except OSError:
+                continue
+            shutil.rmtree(profile_dir, ignore_errors=True)
+            removed += 1
+        if removed:
+            logger.info(f"Удалено брошенных профилей браузера: {removed}")
+        return removed
+
+    def maintenance(self):
+        """Периодическое обслуживание: уборка осиротевших процессов и профилей, статистика памяти"""
+        self.reap_orphans()
+        self.cleanup_stale_profiles()
+        with self._lock:
+            drivers = [info["driver"] for info in self._drivers.values()]
+        total_mb = sum(self.driver_rss_mb(driver) for driver in drivers)
+        logger.info(f"Браузеров запущено: {len(drivers)} из {self.max_browsers}, память: {total_mb:.0f} МБ")
+
+
+browser_governor = BrowserGovernor()
@@ -0,0 +1,235 @@
+import os, sys
+
+project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(project_directory)
+
+import asyncio
+import aiohttp
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from create_bot import logger
+from utils.claims_xhr import parse_claims_list_json
+from utils.rate_limiter import site_rate_limiter
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+# Получать статусы заявок через HTTP‑клиент вместо загрузки страниц в браузере
+CLAIMS_API_MODE = os.getenv("CLAIMS_API_MODE", "1") == "1"
+# Максимальное количество одновременных запросов к API
+CLAIMS_API_CONCURRENCY = int(os.getenv("CLAIMS_API_CONCURRENCY", 10))
+# Таймаут одного запроса, сек
+CLAIMS_API_TIMEOUT = int(os.getenv("CLAIMS_API_TIMEOUT", 20))
+
+CLAIM_API_URL = "https://eds.mosreg.ru/api/claim/{claim_id}"
+
+# Выгружать историю заявок постранично через API списка вместо «Показать еще» в браузере
+CLAIMS_API_BACKFILL = os.getenv("CLAIMS_API_BACKFILL", "1") == "1"
+# Размер страницы при выгрузке через API
+CLAIMS_BACKFILL_PAGE_SIZE = int(os.getenv("CLAIMS_BACKFILL_PAGE_SIZE", 100))
+# Защита от бесконечной выгрузки
+CLAIMS_BACKFILL_MAX_PAGES = int(os.getenv("CLAIMS_BACKFILL_MAX_PAGES", 1000))
+
+# Параметры постраничной выдачи, которые может использовать API списка заявок
+PAGE_NUMBER_PARAMS = ("page", "pagenumber", "pageindex", "pagenum")
+OFFSET_PARAMS = ("offset", "skip", "start", "from")
+PAGE_SIZE_PARAMS = ("size", "pagesize", "limit", "take", "perpage", "per_page", "count")
+
+
+def parse_claim_json(data: dict) -> tuple:
+    """
+    Извлекает из ответа /api/claim/{id} кортеж (claim_id, статус, срок, срочность).
+
+    Args:
+        data (dict): JSON‑ответ API по заявке
+
+    Returns:
+        tuple: (claim_id, status_name, deadline, description)
+    """
+    value_data = data.get("value", {}) or {}
+    claim_data = value_data.get("claim", {}) or {}
+
+    claim_id_val = claim_data.get("id", None)
+    status_name = claim_data.get("statusName", None)
+    deadline = claim_data.get("deadline", None)
+    type_data = claim_data.get("type", {})
+    description = type_data.get("description", None) if type_data else None
+
+    return (claim_id_val, status_name, deadline, description)
+
+
+async def _fetch_claim(http: aiohttp.ClientSession, semaphore: asyncio.Semaphore, claim_id, retries: int = 2):
+    """Загружает JSON одной заявки. Возвращает (http_status, кортеж | None)"""
+    url = CLAIM_API_URL.format(claim_id=claim_id)
+    for attempt in range(1, retries + 1):
+        try:
+            async with semaphore:
+                async with http.get(url) as response:
+                    if response.status in (401, 403):
+                        return response.status, None
+                    if response.status != 200:
+                        logger.warning(f"API вернул статус {response.status} для заявки {claim_id}")
+                        return response.status, None
+                    data = await response.json(content_type=None)
+                    return response.status, parse_claim_json(data)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Попытка {attempt}: ошибка запроса заявки {claim_id}: {e}")
+        except ValueError as e:
+            logger.error(f"Ответ по заявке {claim_id} не является валидным JSON: {e}")
+            return None, None
+    return None, None
+
+
+async def fetch_claims_json(auth: dict, claim_ids: list, concurrency: int = CLAIMS_API_CONCURRENCY) -> list | None:
+    """
+    Получает актуальные данные по заявкам через API сайта, используя
+    cookies и заголовки авторизованной сессии Selenium.
+
+    Запросы выполняются через одно HTTP‑соединение с keep-alive и ограничением
+    количества одновременных запросов.
+
+    Args:
+        auth (dict): {"cookies": {...}, "headers": {...}} — результат export_session_auth
+        claim_ids (list): номера заявок
+        concurrency (int): максимальное количество одновременных запросов
+
+    Returns:
+        list | None: список кортежей (claim_id, status_name, deadline, description)
+            в формате get_jsond_data_by_claim; None, если сайт отклонил авторизацию
+    """
+    if not claim_ids:
+        return []
+
+    connector = aiohttp.TCPConnector(limit=concurrency, keepalive_timeout=60)
+    timeout = aiohttp.ClientTimeout(total=CLAIMS_API_TIMEOUT)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with aiohttp.ClientSession(
+        cookies=auth.get("cookies", {}),
+        headers=auth.get("headers", {}),
+        connector=connector,
+        timeout=timeout
+    ) as http:
+        responses = await asyncio.gather(
+            *[_fetch_claim(http, semaphore, claim_id) for claim_id in claim_ids]
+        )
+
+    unauthorized = sum(1 for status, _ in responses if status in (401, 403))
+    if unauthorized:
+        logger.warning(f"API отклонил авторизацию для {unauthorized} из {len(claim_ids)} заявок")
+        return None
+
+    claims_actual_info = [claim for _, claim in responses if claim is not None]
+    logger.info(f"Через API получены данные по {len(claims_actual_info)} из {len(claim_ids)} заявок")
+    return claims_actual_info
+
+
+def build_list_page_url(list_url: str, page_index: int, offset: int, page_size: int) -> str | None:
+    """
+    Адрес страницы page_index (с нуля) списка заявок по адресу, перехваченному в браузере.
+    Номер страницы (или смещение offset — сколько заявок уже получено) и размер страницы подставляются
+    в найденные параметры запроса, остальные параметры сохраняются.
+    Нумерация страниц продолжается от значения в исходном адресе (0 или 1).
+
+    Returns:
+        str | None: адрес страницы; None, если в адресе нет параметров постраничной выдачи
+    """
+    parts = urlsplit(list_url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    names = {name.lower(): name for name, _ in query}
+
+    page_name = next((names[name] for name in PAGE_NUMBER_PARAMS if name in names), None)
+    offset_name = next((names[name] for name in OFFSET_PARAMS if name in names), None)
+    size_name = next((names[name] for name in PAGE_SIZE_PARAMS if name in names), None)
+    if page_name is None and offset_name is None:
+        return None
+
+    values = dict(query)
+    if page_name is not None:
+        first_page = 1 if values[page_name] == "1" else 0
+        values[page_name] = str(first_page + page_index)
+    else:
+        values[offset_name] = str(offset)
+    if size_name is not None:
+        values[size_name] = str(page_size)
+
+    new_query = urlencode([(name, values[name]) for name, _ in query])
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, new_query, parts.fragment))
+
+
+async def backfill_claims_via_api(auth: dict, list_url: str, on_page, rate_limit_key: str = "default",
+                                  page_size: int = CLAIMS_BACKFILL_PAGE_SIZE,
+                                  max_pages: int = CLAIMS_BACKFILL_MAX_PAGES) -> int | None:
+    """
+    Выгружает весь список заявок постранично через API сайта с cookies авторизованной сессии Selenium.
+    Каждая страница сразу передаётся в on_page — браузер во время выгрузки не используется.
+
+    Args:
+        auth (dict): {"cookies": {...}, "headers": {...}} — результат export_session_auth
+        list_url (str): адрес запроса списка заявок, перехваченный в браузере
+        on_page: корутина on_page(claims: list[dict]) — заявки страницы в формате parse_claim_from_html
+        rate_limit_key (str): ключ ограничителя частоты запросов (управляющая компания)
+        page_size (int): размер страницы
+        max_pages (int): максимальное количество страниц
+
+    Returns:
+        int | None: количество выгруженных заявок; None, если выгрузка через API невозможна
+            или прервалась (нет параметров страниц в адресе, сайт отклонил авторизацию, ответ не разобран,
+            ошибка на очередной странице) — тогда нужно выгружать через таблицу
+    """
+    if build_list_page_url(list_url, 0, 0, page_size) is None:
+        logger.warning(f"В адресе списка заявок нет параметров постраничной выдачи: {list_url}")
+        return None
+
+    timeout = aiohttp.ClientTimeout(total=CLAIMS_API_TIMEOUT)
+    seen = set()
+    total = 0
+    # Смещение растёт на количество реально полученных заявок: сайт может урезать размер страницы
+    offset = 0
+    first_page_size = 0
+
+    async with aiohttp.ClientSession(
+        cookies=auth.get("cookies", {}),
+        headers=auth.get("headers", {}),
+        timeout=timeout
+    ) as http:
+        for page_index in range(max_pages):
+            url = build_list_page_url(list_url, page_index, offset, page_size)
+            await site_rate_limiter.wait_async(rate_limit_key)
+            try:
+                async with http.get(url) as response:
+                    if response.status in (401, 403):
+                        logger.warning(f"API списка заявок отклонил авторизацию (статус {response.status})")
+                        return None
+                    if response.status != 200:
+                        logger.warning(
+                            f"API списка заявок вернул статус {response.status}: {url} "
+                            f"(выгрузка прервана, получено {total} заявок)"
+                        )
+                        return None
+                    body = await response.text()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Ошибка запроса страницы {page_index} списка заявок: {e} (выгрузка прервана, получено {total} заявок)")
+                return None
+
+            page_claims = parse_claims_list_json(body)
+            offset += len(page_claims)
+            claims = [claim for claim in page_claims if claim["claim_id"] not in seen]
+            if not claims:
+                # Пустая страница или повтор уже полученной — список закончился
+                if page_index == 0:
+                    logger.warning("Первая страница списка заявок не содержит заявок")
+                    return None
+                break
+
+            seen.update(claim["claim_id"] for claim in claims)
+            total += len(claims)
+            await on_page(claims)
+            logger.info(f"Страница {page_index} списка заявок: {len(claims)} заявок, всего {total}")
+            # Сайт может ограничить размер страницы сам — ориентируемся на размер первой страницы
+            if page_index == 0:
+                first_page_size = len(claims)
+            elif len(claims) < first_page_size:
+                break
+
+    return total
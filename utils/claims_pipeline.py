@@ -0,0 +1,104 @@
+import os, sys
+
+project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(project_directory)
+
+import asyncio
+import time
+from create_bot import logger
+from db_handler.base import BACKFILL_BATCH_SIZE
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+# Сколько порций заявок может ждать записи в базу; при заполнении очереди сборщик ждёт писателя
+CLAIMS_PIPELINE_QUEUE_SIZE = int(os.getenv("CLAIMS_PIPELINE_QUEUE_SIZE", 20))
+
+_STOP = object()
+
+
+class ClaimsPipeline:
+    """
+    Конвейер «сборщик → запись в базу».
+
+    Сборщик (браузер в пуле потоков или запросы к API) кладёт порции заявок в ограниченную
+    очередь asyncio через put() / put_threadsafe(), а писатель в цикле событий бота
+    одновременно забирает их и записывает пакетами до batch_size заявок: всё, что накопилось
+    в очереди, уходит одним вызовом write_batch. Запись в базу идёт параллельно со сбором,
+    а в памяти хранится не больше queue_size порций.
+
+    Пример:
+        async with ClaimsPipeline(write_batch, name="УК Радуга") as pipeline:
+            await run_in_scraper(collect_rows, company_name, pipeline.put_threadsafe)
+        print(pipeline.written)
+    """
+
+    def __init__(self, write_batch, batch_size: int = BACKFILL_BATCH_SIZE,
+                 queue_size: int = CLAIMS_PIPELINE_QUEUE_SIZE, name: str = ""):
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.name = name
+        self.written = 0
+        self.failed = 0
+        self.loop = None
+        self._queue = None
+        self._writer_task = None
+
+    async def __aenter__(self):
+        self.loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._writer_task = asyncio.create_task(self._write_loop())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        # Дописываем всё, что успел собрать сборщик, даже если он завершился ошибкой
+        await self._queue.put(_STOP)
+        await self._writer_task
+        return False
+
+    async def put(self, items: list):
+        """Кладёт порцию заявок в очередь (из цикла событий); ждёт, если очередь заполнена"""
+        if items:
+            await self._queue.put(list(items))
+
+    def put_threadsafe(self, items: list):
+        """
+        Кладёт порцию заявок из потока браузера; блокирует поток, пока в очереди нет места.
+        Нельзя вызывать из цикла событий — используйте put().
+        """
+        if items:
+            asyncio.run_coroutine_threadsafe(self.put(items), self.loop).result()
+
+    async def _write_loop(self):
+        started = time.perf_counter()
+        stopped = False
+        while not stopped:
+            items = await self._queue.get()
+            if items is _STOP:
+                break
+            batch = list(items)
+            # Забираем всё, что уже ждёт в очереди, но не больше размера пакета
+            while len(batch) < self.batch_size and not self._queue.empty():
+                items = self._queue.get_nowait()
+                if items is _STOP:
+                    stopped = True
+                    break
+                batch.extend(items)
+            await self._write(batch)
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Конвейер записи заявок {self.name}: записано {self.written}, с ошибкой {self.failed} "
+            f"за {elapsed:.1f} сек ({self.written / elapsed if elapsed else 0:.1f} заявок/сек)"
+        )
+
+    async def _write(self, batch: list):
+        try:
+            await self.write_batch(batch)
+            self.written += len(batch)
+        except Exception as e:
+            # Ошибка записи не должна останавливать сборщик, ожидающий места в очереди
+            self.failed += len(batch)
+            logger.error(f"Конвейер записи заявок {self.name}: не удалось записать {len(batch)} заявок: {e}")
@@ -0,0 +1,227 @@
+import os, sys
+
+project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(project_directory)
+
+import json
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from create_bot import logger
+from redis_db import redis_db
+from utils.network_tracker import get_network_tracker
+from utils.waits import count_rows, wait_until
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+# Брать данные таблицы заявок из перехваченных XHR‑ответов, а не из отрисованной таблицы
+CLAIMS_XHR_MODE = os.getenv("CLAIMS_XHR_MODE", "1") == "1"
+# Шаблон URL запроса списка заявок (регулярное выражение). Запрос одной заявки /api/claim/{id} не совпадает
+CLAIMS_LIST_URL_PATTERN = os.getenv(
+    "CLAIMS_LIST_URL_PATTERN",
+    r"/api/claims?(/(list|search|filter|page|table))?/?(\?|$)"
+)
+
+# Адрес запроса полного списка заявок для выгрузки через API, общий для всех компаний
+# (только если в нём нет параметров компании). Если не задан — берётся перехваченный
+# при загрузке главной страницы этой же компании и сохранённый в Redis
+CLAIMS_LIST_URL = os.getenv("CLAIMS_LIST_URL", "")
+
+# Строки таблицы заявок
+CLAIM_ROWS_CSS = "tbody[role='rowgroup'] tr[role='row']"
+
+# Часовой пояс, в котором сайт показывает даты в таблице
+SITE_TIMEZONE = os.getenv("SITE_TIMEZONE", "Europe/Moscow")
+try:
+    site_timezone = ZoneInfo(SITE_TIMEZONE)
+except ZoneInfoNotFoundError:
+    # Нет базы часовых поясов (например, Windows без tzdata) — Москва без перехода на летнее время
+    site_timezone = timezone(timedelta(hours=3))
+
+MONTHS_GENITIVE = [
+    "января", "февраля", "марта", "апреля", "мая", "июня",
+    "июля", "августа", "сентября", "октября", "ноября", "декабря"
+]
+
+# Ключи, под которыми API может вернуть список заявок
+LIST_KEYS = ("items", "content", "claims", "rows", "data", "list", "result", "records", "value")
+
+
+def format_site_date(value) -> str:
+    """
+    Приводит дату из API к виду, в котором её показывает таблица: '23 февраля 2026 14:21'.
+    Даты с часовым поясом (например, UTC с 'Z') переводятся в часовой пояс сайта,
+    даты без пояса считаются уже местными. Уже отформатированные строки возвращает без изменений.
+    """
+    if not value:
+        return ""
+    if not isinstance(value, str):
+        return str(value)
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return value.strip()
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(site_timezone)
+    return f"{parsed.day:02d} {MONTHS_GENITIVE[parsed.month - 1]} {parsed.year} {parsed:%H:%M}"
+
+
+def _nested(data: dict, *keys):
+    """Безопасно достаёт вложенное значение: _nested(claim, 'address', 'address')"""
+    for key in keys:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def _find_claims_list(data) -> list | None:
+    """Ищет в ответе API список заявок — список словарей с полем id"""
+    if isinstance(data, list):
+        if data and all(isinstance(item, dict) and "id" in item for item in data):
+            return data
+        return None
+    if isinstance(data, dict):
+        for key in LIST_KEYS:
+            if key in data:
+                found = _find_claims_list(data[key])
+                if found is not None:
+                    return found
+    return None
+
+
+def parse_claim_list_item(item: dict) -> dict:
+    """Заявка из списка API в формате parse_claim_from_html"""
+    category = item.get("category")
+    urgency = item.get("type")
+    address = item.get("address")
+    return {
+        "claim_id": str(item.get("id", "")),
+        "company_name": "",
+        "appeal_date": format_site_date(item.get("created")),
+        "description": (category.get("name") if isinstance(category, dict) else category) or "",
+        "address": (address.get("address") if isinstance(address, dict) else address) or "",
+        "urgency": (urgency.get("description") if isinstance(urgency, dict) else urgency) or "",
+        "due_date": format_site_date(item.get("deadline")),
+        "status": item.get("statusName") or _nested(item, "status", "name") or "",
+    }
+
+
+def parse_claims_list_json(data) -> list[dict]:
+    """
+    Разбирает ответ API со списком заявок.
+
+    Args:
+        data: JSON‑ответ (dict или list) или его текст
+
+    Returns:
+        list[dict]: заявки в формате parse_claim_from_html; пустой список, если список заявок не найден
+    """
+    if isinstance(data, (str, bytes)):
+        try:
+            data = json.loads(data)
+        except ValueError:
+            return []
+    items = _find_claims_list(data)
+    if not items:
+        return []
+    return [parse_claim_list_item(item) for item in items]
+
+
+def start_claims_capture(driver):
+    """Включает перехват ответов со списком заявок для драйвера"""
+    if CLAIMS_XHR_MODE:
+        get_network_tracker(driver).capture(CLAIMS_LIST_URL_PATTERN)
+
+
+def discard_captured_claims(driver):
+    """Забывает перехваченные ранее ответы (перед действием, чей ответ нужно получить)"""
+    get_network_tracker(driver).take_captured()
+
+
+def get_claims_list_url(company_name: str) -> str | None:
+    """Адрес запроса полного списка заявок компании: из CLAIMS_LIST_URL или запомненный в Redis"""
+    return CLAIMS_LIST_URL or redis_db.get_claims_list_url(company_name)
+
+
+def learn_claims_list_url(company_name: str, url: str):
+    """Запоминает адрес первой страницы полного списка заявок компании"""
+    if CLAIMS_LIST_URL or not url or redis_db.get_claims_list_url(company_name) == url:
+        return
+    if redis_db.set_claims_list_url(company_name, url):
+        logger.info(f"Запомнен адрес списка заявок УК {company_name} для выгрузки через API: {url}")
+
+
+def learn_claims_list_url_from_page(driver, company_name: str, timeout: float = 5):
+    """
+    Запоминает адрес списка заявок по запросу, который главная страница делает сама
+    при загрузке (после входа или проверки сессии), — выгрузка через API работает
+    с первого запуска, без полной выгрузки через таблицу. Перехваченные ответы
+    остаются в буфере.
+    """
+    if not CLAIMS_XHR_MODE or CLAIMS_LIST_URL:
+        return
+    tracker = get_network_tracker(driver)
+    wait_until(driver, lambda d: tracker.is_idle(0.3) and len(tracker.captured) > 0, timeout, "ответ со списком заявок")
+    # Первый ответ после загрузки главной страницы — первая страница полного списка
+    for response in tracker.peek_captured():
+        if response["status"] == 200 and parse_claims_list_json(response["body"]):
+            learn_claims_list_url(company_name, response["url"])
+            return
+
+
+def take_captured_claims(driver, latest_only: bool = False, learn_url_for: str | None = None) -> list[dict]:
+    """
+    Возвращает заявки из перехваченных с прошлого вызова ответов.
+
+    Args:
+        driver: экземпляр WebDriver
+        latest_only: взять только последний ответ (текущее состояние таблицы),
+            иначе объединить все ответы (страницы «Показать еще»)
+        learn_url_for: компания, для которой запомнить адрес первого ответа со списком
+            (только для полного, неотфильтрованного списка)
+
+    Returns:
+        list[dict]: заявки в формате parse_claim_from_html без повторов, в порядке получения
+    """
+    responses = [
+        response for response in get_network_tracker(driver).take_captured()
+        if response["status"] == 200
+    ]
+    if latest_only:
+        responses = responses[-1:]
+
+    claims = dict()
+    for response in responses:
+        page_claims = parse_claims_list_json(response["body"])
+        if learn_url_for and page_claims and not claims:
+            learn_claims_list_url(learn_url_for, response["url"])
+        for claim in page_claims:
+            if claim["claim_id"]:
+                claims[claim["claim_id"]] = claim
+    return list(claims.values())
+
+
+def collect_claims_from_xhr(driver, latest_only: bool = True, timeout: float = 5,
+                            learn_url_for: str | None = None) -> list[dict] | None:
+    """
+    Заявки таблицы из перехваченного XHR. Результат сверяется с количеством строк
+    в таблице: если ответ не соответствует отрисованной таблице, возвращается None
+    и вызывающий код должен прочитать таблицу из DOM.
+    """
+    if not CLAIMS_XHR_MODE:
+        return None
+    tracker = get_network_tracker(driver)
+    # Ответ мог ещё не попасть в performance‑лог — ждём, пока трекер его заберёт
+    wait_until(driver, lambda d: tracker.is_idle(0.3) and len(tracker.captured) > 0, timeout, "ответ со списком заявок")
+
+    claims = take_captured_claims(driver, latest_only=latest_only, learn_url_for=learn_url_for)
+    rows_count = count_rows(driver, CLAIM_ROWS_CSS)
+    # Последний ответ должен в точности соответствовать таблице, объединение страниц — покрывать её
+    matches = len(claims) == rows_count if latest_only else len(claims) >= rows_count
+    if not claims or not matches:
+        logger.info(f"XHR со списком заявок не перехвачен или неполон ({len(claims)} из {rows_count}) — читаем таблицу")
+        return None
+    logger.info(f"Данные {len(claims)} заявок получены из XHR без обхода таблицы")
+    return claims
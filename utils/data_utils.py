@@ -4,7 +4,9 @@ project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."
 sys.path.append(project_directory)
 
 import re
-from bs4 import BeautifulSoup
+import asyncio
+import functools
+from lxml import etree, html as lxml_html
 import importlib
 
 from db_handler.base import get_all_not_closed_claims, get_deadline_exceeded_claims, update_claim_in_db
@@ -14,6 +16,8 @@ from typing import Dict, List, Tuple
 from db_handler.models import Claim
 from pprint import pprint
 from redis_db import redis_db
+from utils.claims_api import CLAIMS_API_MODE, fetch_claims_json
+from utils.scrap_executor import run_for_companies, run_in_scraper
 #from utils.scrap_utils_new import get_jsond_data_by_claim
 import time
 from dotenv import load_dotenv
@@ -74,7 +78,7 @@ async def get_info_from_site_to_compare():
         if not check_new_claims_flag:
             break
         print("Ждем 5 секунд и проверяем завершение процесса поиска новых заявок")
-        time.sleep(5) 
+        await asyncio.sleep(5)
     
     redis_db.add_new_process("check_statuses")
 
@@ -84,14 +88,27 @@ async def get_info_from_site_to_compare():
         start_time = time.time()
         not_closed_dict = dict()
         not_closed_dict = await get_chanded_info()
-        claim_info_from_site = {key : [] for key in list(not_closed_dict.keys())}
         scrap_utils = importlib.import_module('utils.scrap_utils_new')
-        for company, info in not_closed_dict.items():
-            all_claim_ids = list(map(lambda x: x[0], info))
+
+        async def get_company_claims_from_site(company):
+            all_claim_ids = list(map(lambda x: x[0], not_closed_dict[company]))
             print(f'{company=}\n{all_claim_ids[-10:]}')
-            claims_by_company = scrap_utils.get_jsond_data_by_claim(company, all_claim_ids)
+            claims_by_company = None
+            if CLAIMS_API_MODE:
+                # Один вход через Selenium, затем запросы к API без загрузки страниц
+                auth = await run_in_scraper(scrap_utils.get_company_session_auth, company)
+                if auth:
+                    claims_by_company = await fetch_claims_json(auth, all_claim_ids)
+                if claims_by_company is None:
+                    logger.warning(f"Не удалось получить статусы через API для УК {company} — используем браузер")
+            if claims_by_company is None:
+                claims_by_company = await run_in_scraper(scrap_utils.get_jsond_data_by_claim, company, all_claim_ids)
             print(f"{company=}\n{claims_by_company=}")
-            claim_info_from_site.update({company : claims_by_company})
+            return claims_by_company or []
+
+        # Компании обрабатываются параллельно, каждая в своём браузере
+        claim_info_from_site = await run_for_companies(list(not_closed_dict.keys()), get_company_claims_from_site)
+        claim_info_from_site = {company: claims or [] for company, claims in claim_info_from_site.items()}
         
         print(f"{'Работа функции завершена':.^40}")
         pprint(claim_info_from_site)
@@ -205,71 +222,123 @@ async def get_details_of_exceeded_claims():
 
 
 
-def find_company_in_html(html_content: str, company_names: list[str]) -> str | None:
+# Слово «Кому» должно стоять не дальше этого количества символов слева от названия компании
+ADDRESSEE_CONTEXT_CHARS = 80
+ADDRESSEE_PATTERN = re.compile(r'\bкому\b')
+CLAIM_BODY_XPATH = "//div[contains(concat(' ', normalize-space(@class), ' '), ' claim-view__body ')]"
+
+
+def extract_claim_body(html_content: str) -> str | None:
+    """
+    Возвращает разметку блока "claim-view__body" в нижнем регистре (lxml вместо BeautifulSoup).
+
+    Returns:
+        str | None: HTML блока или None, если блока на странице нет
+    """
+    try:
+        document = lxml_html.fromstring(html_content)
+    except (etree.ParserError, ValueError):
+        return None
+    bodies = document.xpath(CLAIM_BODY_XPATH)
+    if not bodies:
+        return None
+    return lxml_html.tostring(bodies[0], encoding="unicode", with_tail=False).lower()
+
+
+class CompanyMatcher:
+    """
+    Поиск названия управляющей компании в тексте заявки одним заранее скомпилированным регулярным выражением.
+
+    Название засчитывается, только если в пределах ADDRESSEE_CONTEXT_CHARS символов слева есть слово «Кому».
+    Если подходят несколько компаний, возвращается та, что раньше в списке company_names.
+
+    Args:
+        company_names (list[str]): названия компаний в порядке приоритета
+    """
+
+    def __init__(self, company_names: list[str]):
+        self.company_names = list(company_names)
+        # нижний регистр -> (приоритет, название в исходном виде)
+        self._by_lower = dict()
+        for priority, company in enumerate(self.company_names):
+            self._by_lower.setdefault(company.lower(), (priority, company))
+        names = sorted(self._by_lower, key=len, reverse=True)
+        # Если одно название входит в другое, совпадения одной альтернативы могут перекрываться —
+        # тогда ищем каждое название своим (тоже скомпилированным) выражением
+        self._nested = any(a != b and a in b for a in names for b in names)
+        if self._nested:
+            self._patterns = [
+                (re.compile(r'\b' + re.escape(name) + r'\b'), self._by_lower[name])
+                for name in sorted(self._by_lower, key=lambda name: self._by_lower[name][0])
+            ]
+        else:
+            self._pattern = re.compile(r'\b(?:' + '|'.join(re.escape(name) for name in names) + r')\b') if names else None
+
+    def _has_addressee(self, text: str, start: int) -> bool:
+        context = text[max(0, start - ADDRESSEE_CONTEXT_CHARS):start]
+        return ADDRESSEE_PATTERN.search(context) is not None
+
+    def find(self, text_lower: str) -> str | None:
+        """Ищет компанию в тексте, уже приведённом к нижнему регистру"""
+        if self._nested:
+            for pattern, (_, company) in self._patterns:
+                for match in pattern.finditer(text_lower):
+                    if self._has_addressee(text_lower, match.start()):
+                        return company
+            return None
+
+        if self._pattern is None:
+            return None
+        best = None
+        for match in self._pattern.finditer(text_lower):
+            priority, company = self._by_lower[match.group(0)]
+            if best is not None and priority >= best[0]:
+                continue
+            if self._has_addressee(text_lower, match.start()):
+                best = (priority, company)
+                if priority == 0:
+                    break
+        return best[1] if best else None
+
+
+company_matcher = CompanyMatcher([value[0] for value in company_access.values()])
+
+
+@functools.lru_cache(maxsize=16)
+def _get_company_matcher(company_names: tuple) -> CompanyMatcher:
+    return CompanyMatcher(list(company_names))
+
+
+def find_company_in_html(html_content: str, company_names: list[str] | None = None) -> str | None:
     """
     Ищет название управляющей компании в HTML‑контенте с учётом условий.
 
     Args:
         html_content (str): HTML‑контент страницы.
-        company_names (list[str]): список названий управляющих компаний для поиска.
+        company_names (list[str] | None): список названий управляющих компаний для поиска
+            (по умолчанию — компании из COMPANY_ACCESS).
 
     Returns:
         str | None: найденное название компании или None, если не найдено.
     """
-    # Парсим HTML
-    soup = BeautifulSoup(html_content, 'html.parser')
-
     # Находим блок с классом "claim-view__body"
-    claim_body = soup.find('div', class_='claim-view__body')
-    if not claim_body:
+    body_text_lower = extract_claim_body(html_content)
+    if not body_text_lower:
         return None
 
-    # Получаем текст из блока (сохраняем структуру для анализа позиций)
-    body_text = str(claim_body)
-
-    # Приводим к нижнему регистру для регистронезависимого поиска
-    body_text_lower = body_text.lower()
-
-    # Ищем все совпадения названий компаний в блоке
-    matches = []
-    for company in company_names:
-        company_lower = company.lower()
-        # Используем регулярное выражение для поиска точного совпадения слова
-        pattern = r'\b' + re.escape(company_lower) + r'\b'
-        for match in re.finditer(pattern, body_text_lower):
-            matches.append({
-                'company': company,
-                'start': match.start(),
-                'end': match.end()
-            })
-
-    # Фильтруем совпадения: проверяем условие с «Кому» в пределах 80 символов слева
-    valid_matches = []
-    for match in matches:
-        start_pos = match['start']
-        # Берём фрагмент текста в пределах 80 символов слева от совпадения
-        left_context_start = max(0, start_pos - 80)
-        context = body_text_lower[left_context_start:start_pos]
-        # Проверяем, есть ли слово «Кому» (в любом регистре) в контексте
-        if re.search(r'\bкому\b', context, re.IGNORECASE):
-            valid_matches.append(match)
-
-    # Если есть валидные совпадения, возвращаем первое найденное название компании
-    if valid_matches:
-        return valid_matches[0]['company']
-
-    return None
+    matcher = company_matcher if company_names is None else _get_company_matcher(tuple(company_names))
+    return matcher.find(body_text_lower)
 
 # тестовый вариант функции поиска названия управляющей компании среди HTML контента
 
 
-def find_company_in_html_from_file(filename: str, company_names: list[str]) -> str | None:
+def find_company_in_html_from_file(filename: str, company_names: list[str] | None = None) -> str | None:
     """
     Ищет название управляющей компании в HTML‑файле с учётом условий.
 
     Args:
         filename (str): путь к файлу с HTML‑контентом.
-        company_names (list[str]): список названий управляющих компаний для поиска.
+        company_names (list[str] | None): список названий управляющих компаний для поиска.
 
     Returns:
         str | None: найденное название компании или None, если не найдено.
@@ -291,45 +360,7 @@ def find_company_in_html_from_file(filename: str, company_names: list[str]) -> s
         print(f"Неожиданная ошибка при чтении файла '{filename}': {e}")
         return None
 
-    # Парсим HTML
-    soup = BeautifulSoup(html_content, 'html.parser')
-
-    # Находим блок с классом "claim-view__body"
-    claim_body = soup.find('div', class_='claim-view__body')
-    if not claim_body:
-        return None
-
-    # Получаем текст из блока
-    body_text = str(claim_body)
-    body_text_lower = body_text.lower()
-
-    # Ищем все совпадения названий компаний в блоке
-    matches = []
-    for company in company_names:
-        company_lower = company.lower()
-        pattern = r'\b' + re.escape(company_lower) + r'\b'
-        for match in re.finditer(pattern, body_text_lower):
-            matches.append({
-                'company': company,
-                'start': match.start(),
-                'end': match.end()
-            })
-
-    # Фильтруем совпадения: проверяем условие с «Кому» в пределах 80 символов слева
-    valid_matches = []
-    for match in matches:
-        start_pos = match['start']
-        left_context_start = max(0, start_pos - 80)
-        context = body_text_lower[left_context_start:start_pos]
-        # Используем флаг re.IGNORECASE для регистронезависимого поиска
-        if re.search(r'\bкому\b', context, re.IGNORECASE):
-            valid_matches.append(match)
-
-    # Если есть валидные совпадения, возвращаем первое найденное название компании
-    if valid_matches:
-        return valid_matches[0]['company']
-
-    return None
+    return find_company_in_html(html_content, company_names)
 
 
 def update_claims_with_company_names(all_claim_info: list[dict], new_claims_data: dict) -> dict:
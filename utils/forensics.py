@@ -0,0 +1,151 @@
+import os, sys
+
+project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(project_directory)
+
+import json
+import threading
+import time
+import weakref
+from collections import deque
+from datetime import datetime
+from create_bot import logger
+from utils.page_archive import page_archive
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+LEVEL_OFF = "off"
+LEVEL_ON_FAILURE = "on-failure"
+LEVEL_ALWAYS = "always"
+
+# off — ничего не сохраняем; on-failure — снимки страниц в памяти, на диск только при ошибке;
+# always — дополнительно каждый снимок уходит в архив страниц
+FORENSICS_LEVEL = os.getenv("FORENSICS_LEVEL", LEVEL_ON_FAILURE)
+# Сколько последних снимков страниц хранится в памяти для каждого браузера
+FORENSICS_RING_SIZE = int(os.getenv("FORENSICS_RING_SIZE", 5))
+FORENSICS_DIR = os.getenv("FORENSICS_DIR", "work_parsed_pages/failures")
+
+
+class ForensicRecorder:
+    """
+    Сбор материалов для разбора ошибок сценариев.
+
+    На обычных шагах snapshot() только запоминает HTML страницы в кольцевом буфере
+    (последние FORENSICS_RING_SIZE снимков на браузер) — без записи на диск.
+    При ошибке capture_failure() сохраняет буфер, текущую страницу, скриншот, логи браузера
+    и описание ошибки в отдельную папку work_parsed_pages/failures/<время>_<компания>_<шаг>.
+    """
+
+    def __init__(self, level: str = FORENSICS_LEVEL, ring_size: int = FORENSICS_RING_SIZE,
+                 directory: str = FORENSICS_DIR):
+        if level not in (LEVEL_OFF, LEVEL_ON_FAILURE, LEVEL_ALWAYS):
+            logger.warning(f"Неизвестный FORENSICS_LEVEL={level!r}, используется {LEVEL_ON_FAILURE}")
+            level = LEVEL_ON_FAILURE
+        self.level = level
+        self.ring_size = ring_size
+        self.directory = directory
+        self._rings = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.level != LEVEL_OFF
+
+    def _ring(self, driver) -> deque:
+        with self._lock:
+            ring = self._rings.get(driver)
+            if ring is None:
+                ring = deque(maxlen=self.ring_size)
+                self._rings[driver] = ring
+            return ring
+
+    def snapshot(self, driver, step: str, company_name: str | None = None):
+        """Запоминает текущую страницу как результат шага step"""
+        if not self.enabled:
+            return
+        try:
+            html = driver.page_source
+            url = driver.current_url
+        except Exception as e:
+            logger.debug(f"Не удалось снять страницу для шага {step}: {e}")
+            return
+        self._ring(driver).append({"step": step, "url": url, "html": html, "ts": time.time()})
+        if self.level == LEVEL_ALWAYS:
+            page_archive.save(html, name=step, company_name=company_name, url=url)
+
+    def capture_failure(self, driver, step: str, error: BaseException | None = None,
+                        company_name: str | None = None, diagnostics=None) -> str | None:
+        """
+        Сохраняет материалы по ошибке на шаге step.
+
+        Args:
+            driver: экземпляр WebDriver (может быть уже неработоспособен)
+            step: название шага сценария
+            error: исключение, если есть
+            company_name: управляющая компания
+            diagnostics: функция (driver) -> dict с дополнительной (дорогой) диагностикой
+
+        Returns:
+            str | None: путь к папке с материалами или None, если сбор отключён
+        """
+        if not self.enabled or driver is None:
+            return None
+
+        folder_name = "_".join(
+            part for part in (datetime.now().strftime("%Y%m%d_%H%M%S_%f"), company_name, step) if part
+        )
+        folder = os.path.join(self.directory, folder_name)
+        os.makedirs(folder, exist_ok=True)
+
+        meta = {
+            "step": step,
+            "company_name": company_name,
+            "error": f"{type(error).__name__}: {error}" if error else None,
+            "time": datetime.now().isoformat(),
+        }
+
+        # Последние снимки страниц до ошибки
+        with self._lock:
+            ring = self._rings.get(driver)
+            snapshots = list(ring) if ring else []
+            if ring:
+                ring.clear()
+        for number, snapshot in enumerate(snapshots, 1):
+            self._write(folder, f"{number:02d}_{snapshot['step']}.html", snapshot["html"])
+        meta["snapshots"] = [
+            {"step": snapshot["step"], "url": snapshot["url"], "ts": snapshot["ts"]} for snapshot in snapshots
+        ]
+
+        # Состояние браузера в момент ошибки
+        try:
+            meta["url"] = driver.current_url
+            self._write(folder, "failure_page.html", driver.page_source)
+        except Exception as e:
+            meta["page_error"] = str(e)
+        try:
+            driver.save_screenshot(os.path.join(folder, "failure_screenshot.png"))
+        except Exception as e:
+            meta["screenshot_error"] = str(e)
+        try:
+            self._write(folder, "browser_log.json", json.dumps(driver.get_log("browser"), ensure_ascii=False, indent=2))
+        except Exception as e:
+            meta["browser_log_error"] = str(e)
+        if diagnostics is not None:
+            try:
+                meta["diagnostics"] = diagnostics(driver)
+            except Exception as e:
+                meta["diagnostics_error"] = str(e)
+
+        self._write(folder, "meta.json", json.dumps(meta, ensure_ascii=False, indent=2))
+        logger.error(f"Материалы по ошибке на шаге «{step}» сохранены: {folder}")
+        return folder
+
+    @staticmethod
+    def _write(folder: str, filename: str, content: str):
+        with open(os.path.join(folder, filename), "w", encoding="utf-8") as f:
+            f.write(content)
+
+
+forensics = ForensicRecorder()
@@ -0,0 +1,72 @@
+import os, sys
+
+project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(project_directory)
+
+from create_bot import logger
+from db_handler.base import get_accepted_claim_ids
+from redis_db import redis_db
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+# Как часто множество известных заявок пересобирается из таблицы claims, сек
+KNOWN_CLAIMS_REFRESH = int(os.getenv("KNOWN_CLAIMS_REFRESH", 6 * 60 * 60))
+
+# Статус заявки, ещё не принятой в работу: такие заявки не пропускаются
+NEW_CLAIM_STATUS = "Новая"
+# Статус заявки, принятой в работу (значение по умолчанию в таблице claims)
+ACCEPTED_CLAIM_STATUS = "В работе"
+
+
+async def warm_known_claims(force: bool = False):
+    """Заполняет множество известных заявок номерами принятых заявок из базы, если оно пустое или устарело"""
+    if not force and redis_db.is_known_claims_warmed():
+        return
+    claim_ids = await get_accepted_claim_ids(NEW_CLAIM_STATUS)
+    if redis_db.replace_known_claims(claim_ids, ttl=KNOWN_CLAIMS_REFRESH):
+        logger.info(f"Множество известных заявок прогрето из базы: {len(claim_ids)} заявок")
+
+
+def skip_known_claims(new_claims_data: dict) -> tuple[dict, int]:
+    """
+    Убирает из новых заявок те, что уже приняты в работу и сохранены в базе.
+
+    Returns:
+        tuple: (новые заявки без известных, количество пропущенных)
+    """
+    if not new_claims_data:
+        return new_claims_data, 0
+    known = redis_db.get_known_claims(list(new_claims_data))
+    if not known:
+        return new_claims_data, 0
+    logger.info(f"Пропускаем уже сохранённые в базе заявки ({len(known)}): {sorted(known)}")
+    return {claim_id: info for claim_id, info in new_claims_data.items() if claim_id not in known}, len(known)
+
+
+def remember_claims(claim_ids):
+    """
+    Отмечает заявки как известные после записи в базу. Передавать только принятые
+    в работу заявки — известные заявки больше не открываются и не принимаются.
+    """
+    redis_db.add_known_claims(list(claim_ids or []))
+
+
+def forget_claims(claim_ids):
+    """
+    Убирает из известных заявки, которые не приняты в работу, — на следующей проверке
+    они снова будут открыты и приняты.
+    """
+    claim_ids = list(claim_ids or [])
+    removed = redis_db.remove_known_claims(claim_ids)
+    if removed:
+        logger.warning(f"Среди непринятых заявок {sorted(claim_ids)} известными были отмечены {removed}, отметка снята")
+
+
+def remember_accepted_rows(claims: list[dict]):
+    """Отмечает как известные заявки из таблицы/API, которые уже не в статусе «Новая»"""
+    remember_claims([
+        claim["claim_id"] for claim in claims
+        if claim.get("claim_id") and claim.get("status") and claim["status"] != NEW_CLAIM_STATUS
+    ])
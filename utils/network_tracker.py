@@ -0,0 +1,173 @@
+import os, sys
+
+project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(project_directory)
+
+import base64
+import json
+import re
+import threading
+import time
+import weakref
+from collections import deque
+from create_bot import logger
+
+
+# Типы запросов, по которым определяется активность Angular‑приложения
+TRACKED_RESOURCE_TYPES = {"XHR", "Fetch", "Document"}
+# Запрос, висящий дольше этого времени (long polling, websocket), не считается активным, сек
+STALE_REQUEST_AGE = 30
+# Сколько перехваченных ответов хранится в памяти на один драйвер
+MAX_CAPTURED_RESPONSES = 500
+
+
+class NetworkTracker:
+    """
+    Отслеживает сетевые запросы браузера по событиям CDP из performance‑лога
+    (capability goog:loggingPrefs {'performance': 'ALL'}).
+
+    Лог вычитывается драйвером целиком, поэтому на каждый драйвер должен быть
+    один трекер — его возвращает get_network_tracker().
+
+    Кроме учёта активности, трекер может сохранять тела ответов, URL которых
+    совпадает с шаблонами, зарегистрированными через capture().
+    """
+
+    def __init__(self, driver):
+        # Слабая ссылка: трекер хранится в WeakKeyDictionary по драйверу и не должен удерживать его
+        self._driver_ref = weakref.ref(driver)
+        # requestId -> {"url", "type", "started"}
+        self.inflight: dict[str, dict] = {}
+        self.last_activity = time.monotonic()
+        self._lock = threading.Lock()
+        self._capture_patterns: list[re.Pattern] = []
+        # requestId -> {"url", "status"} для ответов, тело которых нужно забрать
+        self._pending_bodies: dict[str, dict] = {}
+        self.captured: deque = deque(maxlen=MAX_CAPTURED_RESPONSES)
+        # Сколько ответов перехвачено за всё время (не сбрасывается take_captured)
+        self.captured_total = 0
+
+    @property
+    def driver(self):
+        return self._driver_ref()
+
+    def capture(self, pattern: str):
+        """Начинает сохранять тела ответов, URL которых совпадает с регулярным выражением pattern"""
+        with self._lock:
+            if any(compiled.pattern == pattern for compiled in self._capture_patterns):
+                return
+            try:
+                # Network.getResponseBody работает только при включённом домене Network
+                self.driver.execute_cdp_cmd("Network.enable", {})
+            except Exception as e:
+                logger.warning(f"Не удалось включить домен Network для перехвата ответов: {e}")
+            self._capture_patterns.append(re.compile(pattern))
+
+    def _fetch_body(self, request_id: str, info: dict):
+        """Забирает тело завершённого ответа из буфера браузера"""
+        try:
+            result = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        except Exception as e:
+            logger.debug(f"Не удалось получить тело ответа {info['url']}: {e}")
+            return
+        body = result.get("body", "")
+        if result.get("base64Encoded"):
+            body = base64.b64decode(body).decode("utf-8", errors="replace")
+        self.captured.append({
+            "url": info["url"],
+            "status": info["status"],
+            "body": body,
+            "received": time.monotonic(),
+        })
+        self.captured_total += 1
+
+    def _handle_event(self, method: str, params: dict):
+        request_id = params.get("requestId")
+        if method == "Network.requestWillBeSent":
+            if params.get("type") in TRACKED_RESOURCE_TYPES:
+                self.inflight[request_id] = {
+                    "url": params.get("request", {}).get("url"),
+                    "type": params.get("type"),
+                    "started": time.monotonic(),
+                }
+                self.last_activity = time.monotonic()
+        elif method == "Network.responseReceived":
+            response = params.get("response", {})
+            url = response.get("url", "")
+            if self._capture_patterns and any(pattern.search(url) for pattern in self._capture_patterns):
+                self._pending_bodies[request_id] = {"url": url, "status": response.get("status")}
+        elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+            if self.inflight.pop(request_id, None) is not None:
+                self.last_activity = time.monotonic()
+            info = self._pending_bodies.pop(request_id, None)
+            if info is not None and method == "Network.loadingFinished":
+                self._fetch_body(request_id, info)
+
+    def poll(self):
+        """Вычитывает накопившиеся события из performance‑лога браузера"""
+        with self._lock:
+            try:
+                entries = self.driver.get_log("performance")
+            except Exception as e:
+                logger.debug(f"Не удалось прочитать performance‑лог: {e}")
+                return
+            for entry in entries:
+                try:
+                    message = json.loads(entry["message"])["message"]
+                except (KeyError, ValueError):
+                    continue
+                self._handle_event(message.get("method", ""), message.get("params", {}))
+
+            # Забываем запросы, которые так и не завершились
+            now = time.monotonic()
+            for request_id in [rid for rid, info in self.inflight.items() if now - info["started"] > STALE_REQUEST_AGE]:
+                self.inflight.pop(request_id, None)
+
+    def take_captured(self) -> list[dict]:
+        """
+        Возвращает перехваченные с прошлого вызова ответы и очищает буфер.
+
+        Returns:
+            list[dict]: [{"url", "status", "body", "received"}, ...] в порядке получения
+        """
+        self.poll()
+        with self._lock:
+            responses = list(self.captured)
+            self.captured.clear()
+        return responses
+
+    def peek_captured(self) -> list[dict]:
+        """Возвращает перехваченные с прошлого take_captured() ответы, не очищая буфер"""
+        self.poll()
+        with self._lock:
+            return list(self.captured)
+
+    def pending(self) -> int:
+        """Количество незавершённых XHR/Fetch/Document запросов"""
+        self.poll()
+        return len(self.inflight)
+
+    def is_idle(self, idle_time: float = 0.5) -> bool:
+        """True, если нет активных запросов и сеть молчит не менее idle_time секунд"""
+        self.poll()
+        return not self.inflight and time.monotonic() - self.last_activity >= idle_time
+
+
+_trackers = weakref.WeakKeyDictionary()
+_trackers_lock = threading.Lock()
+
+
+def get_network_tracker(driver) -> NetworkTracker:
+    """Возвращает трекер сети, привязанный к драйверу"""
+    with _trackers_lock:
+        tracker = _trackers.get(driver)
+        if tracker is None:
+            tracker = NetworkTracker(driver)
+            _trackers[driver] = tracker
+        return tracker
+
+
+def drop_network_tracker(driver):
+    """Забывает трекер закрываемого драйвера вместе с перехваченными ответами"""
+    with _trackers_lock:
+        _trackers.pop(driver, None)
@@ -0,0 +1,233 @@
+import os, sys
+
+project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(project_directory)
+
+import hashlib
+import queue
+import sqlite3
+import threading
+import time
+import zstandard
+from create_bot import logger
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+# Сохранять страницы в архив (0 — старое поведение: HTML‑файлы в work_parsed_pages)
+PAGE_ARCHIVE_MODE = os.getenv("PAGE_ARCHIVE_MODE", "1") == "1"
+PAGE_ARCHIVE_DIR = os.getenv("PAGE_ARCHIVE_DIR", "work_parsed_pages/archive")
+# Сколько дней хранить страницы
+PAGE_ARCHIVE_RETENTION_DAYS = int(os.getenv("PAGE_ARCHIVE_RETENTION_DAYS", 30))
+# Уровень сжатия zstd (1–22)
+PAGE_ARCHIVE_ZSTD_LEVEL = int(os.getenv("PAGE_ARCHIVE_ZSTD_LEVEL", 6))
+# Максимум страниц в очереди на запись; при переполнении новые страницы не архивируются
+PAGE_ARCHIVE_QUEUE_SIZE = int(os.getenv("PAGE_ARCHIVE_QUEUE_SIZE", 1000))
+# Как часто удалять устаревшие страницы, сек
+PAGE_ARCHIVE_PRUNE_INTERVAL = 6 * 60 * 60
+
+_STOP = object()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sha256 TEXT NOT NULL,
+    name TEXT NOT NULL,
+    claim_id TEXT,
+    company_name TEXT,
+    url TEXT,
+    created_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    compressed_size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_pages_claim_id ON pages (claim_id);
+CREATE INDEX IF NOT EXISTS ix_pages_name_created ON pages (name, created_at);
+CREATE INDEX IF NOT EXISTS ix_pages_created ON pages (created_at);
+CREATE INDEX IF NOT EXISTS ix_pages_sha256 ON pages (sha256);
+"""
+
+
+class PageArchive:
+    """
+    Архив HTML‑страниц, сохраняемых при работе с сайтом.
+
+    Страницы сжимаются zstd и хранятся по хэшу содержимого (одинаковые страницы — один файл),
+    индекс по заявке, компании и времени ведётся в SQLite. Запись выполняет фоновый поток,
+    поэтому save() не блокирует поток, работающий с браузером. Страницы старше
+    retention_days удаляются.
+
+    Пример:
+        page_archive.save(driver.page_source, "claim_detail", claim_id="6180019")
+        html = page_archive.latest(claim_id="6180019", name="claim_detail")
+    """
+
+    def __init__(self, directory: str = PAGE_ARCHIVE_DIR, retention_days: int = PAGE_ARCHIVE_RETENTION_DAYS,
+                 level: int = PAGE_ARCHIVE_ZSTD_LEVEL, queue_size: int = PAGE_ARCHIVE_QUEUE_SIZE):
+        self.directory = directory
+        self.retention_days = retention_days
+        self.level = level
+        self.db_path = os.path.join(directory, "index.sqlite3")
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._writer = None
+        self._writer_lock = threading.Lock()
+
+    # ---------- запись ----------
+
+    def save(self, html: str, name: str, claim_id: str | None = None,
+             company_name: str | None = None, url: str | None = None):
+        """Ставит страницу в очередь на запись и сразу возвращает управление"""
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait({
+                "html": html,
+                "name": name,
+                "claim_id": str(claim_id) if claim_id is not None else None,
+                "company_name": company_name,
+                "url": url,
+                "created_at": time.time(),
+            })
+        except queue.Full:
+            logger.warning(f"Очередь архива страниц переполнена — страница {name} не сохранена")
+
+    def _ensure_writer(self):
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run_writer, name="page-archive", daemon=True)
+                self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(self.directory, exist_ok=True)
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+        return connection
+
+    def _blob_path(self, sha256: str) -> str:
+        return os.path.join(self.directory, "blobs", sha256[:2], f"{sha256}.html.zst")
+
+    def _run_writer(self):
+        connection = self._connect()
+        compressor = zstandard.ZstdCompressor(level=self.level)
+        next_prune = time.monotonic()
+        try:
+            while True:
+                if time.monotonic() >= next_prune:
+                    self._prune(connection)
+                    next_prune = time.monotonic() + PAGE_ARCHIVE_PRUNE_INTERVAL
+                try:
+                    item = self._queue.get(timeout=60)
+                except queue.Empty:
+                    continue
+                try:
+                    if item is _STOP:
+                        return
+                    self._write(connection, compressor, item)
+                except Exception as e:
+                    logger.error(f"Ошибка записи страницы {item['name']} в архив: {e}")
+                finally:
+                    self._queue.task_done()
+        finally:
+            connection.close()
+
+    def _write(self, connection: sqlite3.Connection, compressor, item: dict):
+        data = item["html"].encode("utf-8")
+        sha256 = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(sha256)
+        if os.path.exists(blob_path):
+            compressed_size = os.path.getsize(blob_path)
+        else:
+            compressed = compressor.compress(data)
+            compressed_size = len(compressed)
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            tmp_path = f"{blob_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_path, blob_path)
+        with connection:
+            connection.execute(
+                "INSERT INTO pages (sha256, name, claim_id, company_name, url, created_at, size, compressed_size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (sha256, item["name"], item["claim_id"], item["company_name"], item["url"],
+                 item["created_at"], len(data), compressed_size)
+            )
+        logger.debug(f"Страница {item['name']} сохранена в архив ({len(data)} -> {compressed_size} байт)")
+
+    def _prune(self, connection: sqlite3.Connection):
+        """Удаляет записи старше срока хранения и файлы, на которые больше нет ссылок"""
+        cutoff = time.time() - self.retention_days * 24 * 60 * 60
+        with connection:
+            stale = [row["sha256"] for row in connection.execute(
+                "SELECT DISTINCT sha256 FROM pages WHERE created_at < ?", (cutoff,)
+            )]
+            deleted = connection.execute("DELETE FROM pages WHERE created_at < ?", (cutoff,)).rowcount
+        removed_blobs = 0
+        for sha256 in stale:
+            if connection.execute("SELECT 1 FROM pages WHERE sha256 = ? LIMIT 1", (sha256,)).fetchone():
+                continue
+            try:
+                os.remove(self._blob_path(sha256))
+                removed_blobs += 1
+            except FileNotFoundError:
+                pass
+        if deleted:
+            logger.info(f"Архив страниц: удалено записей {deleted}, файлов {removed_blobs}")
+
+    def flush(self):
+        """Ждёт, пока все страницы из очереди будут записаны"""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.join()
+
+    def close(self, timeout: float = 30):
+        """Дописывает очередь и останавливает фоновый поток (при остановке бота)"""
+        if self._writer is None or not self._writer.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._writer.join(timeout)
+        logger.info("Архив страниц закрыт")
+
+    # ---------- чтение ----------
+
+    def find(self, claim_id: str | None = None, name: str | None = None, company_name: str | None = None,
+             since: float | None = None, limit: int = 50) -> list[dict]:
+        """
+        Ищет страницы в индексе, новые первыми.
+
+        Returns:
+            list[dict]: [{"id", "sha256", "name", "claim_id", "company_name", "url", "created_at", "size", "compressed_size"}, ...]
+        """
+        conditions, params = [], []
+        for column, value in (("claim_id", claim_id), ("name", name), ("company_name", company_name)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(str(value))
+        if since is not None:
+            conditions.append("created_at >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        if not os.path.exists(self.db_path):
+            return []
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                f"SELECT * FROM pages {where} ORDER BY created_at DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+        finally:
+            connection.close()
+        return [dict(row) for row in rows]
+
+    def read(self, sha256: str) -> str:
+        """Возвращает HTML страницы по хэшу содержимого"""
+        with open(self._blob_path(sha256), "rb") as f:
+            return zstandard.ZstdDecompressor().decompress(f.read()).decode("utf-8")
+
+    def latest(self, claim_id: str | None = None, name: str | None = None, company_name: str | None = None) -> str | None:
+        """HTML последней сохранённой страницы, подходящей под условия, или None"""
+        pages = self.find(claim_id=claim_id, name=name, company_name=company_name, limit=1)
+        if not pages:
+            return None
+        return self.read(pages[0]["sha256"])
+
+
+page_archive = PageArchive()
@@ -0,0 +1,65 @@
+import os, sys
+
+project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(project_directory)
+
+import random
+import threading
+import time
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+# Минимальный интервал между запросами к сайту с одного ключа (компании), сек. 0 — без паузы
+SITE_MIN_INTERVAL = float(os.getenv("SITE_MIN_INTERVAL", 1.0))
+# Случайная добавка к интервалу, сек
+SITE_INTERVAL_JITTER = float(os.getenv("SITE_INTERVAL_JITTER", 0.5))
+
+
+class RateLimiter:
+    """
+    Ограничитель частоты запросов: между двумя вызовами wait() с одним ключом проходит
+    не меньше min_interval (+ случайная добавка до jitter) секунд.
+
+    Пауза отсчитывается от предыдущего запроса, а не добавляется к нему: если страница
+    грузилась дольше интервала, wait() возвращается сразу. Потокобезопасен —
+    ключи разных компаний из пула потоков браузеров не мешают друг другу.
+    """
+
+    def __init__(self, min_interval: float = SITE_MIN_INTERVAL, jitter: float = SITE_INTERVAL_JITTER):
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self._next_allowed = dict()
+        self._lock = threading.Lock()
+
+    def _reserve(self, key: str) -> float:
+        """Занимает ближайший разрешённый момент для ключа, возвращает время ожидания"""
+        with self._lock:
+            now = time.monotonic()
+            allowed_at = max(now, self._next_allowed.get(key, now))
+            self._next_allowed[key] = allowed_at + self.min_interval + random.uniform(0, self.jitter)
+            return allowed_at - now
+
+    def wait(self, key: str = "default") -> float:
+        """Блокирует поток до разрешённого момента; возвращает фактическую паузу"""
+        if self.min_interval <= 0 and self.jitter <= 0:
+            return 0.0
+        delay = self._reserve(key)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def wait_async(self, key: str = "default") -> float:
+        """То же, что wait(), но не блокирует цикл событий"""
+        import asyncio
+
+        if self.min_interval <= 0 and self.jitter <= 0:
+            return 0.0
+        delay = self._reserve(key)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+site_rate_limiter = RateLimiter()
@@ -0,0 +1,66 @@
+import os, sys
+
+project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(project_directory)
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from create_bot import logger
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+# Количество потоков для работы с браузерами (Selenium блокирует поток на всё время запроса)
+SCRAP_WORKERS = int(os.getenv("SCRAP_WORKERS", 3))
+
+# Сколько управляющих компаний обрабатывается одновременно (общий лимит для всех задач бота)
+SCRAP_COMPANY_CONCURRENCY = int(os.getenv("SCRAP_COMPANY_CONCURRENCY", SCRAP_WORKERS))
+
+scrap_executor = ThreadPoolExecutor(max_workers=SCRAP_WORKERS, thread_name_prefix="scrap")
+company_semaphore = asyncio.Semaphore(SCRAP_COMPANY_CONCURRENCY)
+
+
+async def run_in_scraper(func, *args, **kwargs):
+    """
+    Выполняет блокирующую функцию работы с браузером в пуле потоков
+    и ожидает результат, не блокируя цикл событий бота.
+
+    Запись в БД и отправка сообщений в Telegram должны выполняться
+    в вызывающей корутине, а не внутри func.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(scrap_executor, functools.partial(func, *args, **kwargs))
+
+
+async def run_for_companies(companies: list, func) -> dict:
+    """
+    Параллельно выполняет корутину func(company) для каждой управляющей компании.
+
+    Одновременно обрабатывается не больше SCRAP_COMPANY_CONCURRENCY компаний —
+    лимит общий для задач по расписанию и ручных запусков из бота.
+
+    Returns:
+        dict: {company: результат func} в порядке списка companies;
+            для компаний, где произошла ошибка, значение None
+    """
+    async def _run(company):
+        async with company_semaphore:
+            return await func(company)
+
+    results = await asyncio.gather(*[_run(company) for company in companies], return_exceptions=True)
+
+    results_by_company = dict()
+    for company, result in zip(companies, results):
+        if isinstance(result, Exception):
+            logger.error(f"Ошибка при обработке УК {company}: {type(result).__name__}: {result}")
+            result = None
+        results_by_company[company] = result
+    return results_by_company
+
+
+def shutdown_scraper():
+    """Останавливает пул потоков при завершении работы бота"""
+    scrap_executor.shutdown(wait=False, cancel_futures=True)
+    logger.info("Пул потоков для работы с браузером остановлен")
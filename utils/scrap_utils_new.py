@@ -17,17 +17,29 @@ from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
 from selenium.common import NoSuchElementException, StaleElementReferenceException
 from bs4 import BeautifulSoup
+from lxml import html as lxml_html
 import logging
 import time
-from copy import deepcopy
 import json
-import random
 from create_bot import logger
-from db_handler.base import add_new_claim, add_new_claims
+from db_handler.base import add_new_claim, add_new_claims, upsert_claims
 from utils.data_utils import find_company_in_html, update_claims_with_company_names
 from dotenv import load_dotenv
 from redis_db import redis_db
-import tempfile
+from utils.session_pool import SessionPool
+from utils.page_archive import PAGE_ARCHIVE_MODE, page_archive
+from utils.browser_governor import browser_governor
+from utils.forensics import forensics
+from utils.claims_api import CLAIMS_API_BACKFILL, backfill_claims_via_api, parse_claim_json
+from utils.claims_xhr import collect_claims_from_xhr, discard_captured_claims, get_claims_list_url, learn_claims_list_url_from_page, start_claims_capture, take_captured_claims
+from utils.known_claims import ACCEPTED_CLAIM_STATUS, NEW_CLAIM_STATUS, forget_claims, remember_accepted_rows, remember_claims, skip_known_claims, warm_known_claims
+from utils.acceptance_journal import acceptance_journal
+from utils.claims_pipeline import ClaimsPipeline
+from utils.scrap_executor import run_for_companies, run_in_scraper
+from utils.selector_cache import SELECTOR_PROBE_TIMEOUT, find_element_by_strategies, strategy_registry
+from utils.network_tracker import drop_network_tracker, get_network_tracker
+from utils.rate_limiter import site_rate_limiter
+from utils.waits import POLL_FREQUENCY, WaitBudget, angular_is_stable, count_rows, wait_for_network_idle, wait_for_list_load, wait_for_page_ready, wait_for_url_matches, wait_until
 
 
 load_dotenv()
@@ -45,9 +57,9 @@ load_dotenv()
 
 
 def get_unique_profile():
-    """Создаёт уникальную временную директорию для профиля браузера"""
-    profile_dir = tempfile.mkdtemp(prefix="selenium_profile_")
-    # Регистрируем очистку при завершении процесса
+    """Создаёт уникальную временную директорию для профиля браузера (в директории профилей бота)"""
+    profile_dir = browser_governor.new_profile_dir()
+    # Регистрируем очистку при завершении процесса (при закрытии драйвера профиль удаляет browser_governor)
     import atexit
     atexit.register(lambda: cleanup_profile(profile_dir))
     return profile_dir
@@ -63,36 +75,123 @@ def cleanup_profile(profile_dir):
         logger.warning(f"Ошибка очистки профиля {profile_dir}: {e}")
 
 
-def create_chrome_options():
+# Облегчённый режим браузера: без картинок, шрифтов, медиа и счётчиков аналитики.
+# Для отладки (чтобы видеть страницу целиком) выставить BROWSER_LEAN_MODE=0
+BROWSER_LEAN_MODE = os.getenv("BROWSER_LEAN_MODE", "1") == "1"
+
+# Шаблоны URL, которые браузер не загружает в облегчённом режиме (Network.setBlockedURLs)
+LEAN_BLOCKED_URLS = [
+    # изображения
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+    # шрифты
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    # медиа
+    "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav",
+    # сторонние счётчики и трекеры
+    "*mc.yandex.ru*", "*yandex.ru/metrika*", "*google-analytics.com*",
+    "*googletagmanager.com*", "*top-fwz1.mail.ru*", "*vk.com/rtrg*",
+    "*sentry.io*", "*doubleclick.net*",
+] + [url.strip() for url in os.getenv("BROWSER_EXTRA_BLOCKED_URLS", "").split(",") if url.strip()]
+
+
+def create_chrome_options(lean=BROWSER_LEAN_MODE, profile_dir=None):
     options = webdriver.ChromeOptions()
     options.add_argument('--headless=new')
     options.add_argument('--no-sandbox')
     options.add_argument('--disable-dev-shm-usage')
     #options.add_argument('--remote-debugging-port=9222')
-    options.add_argument(f"--user-data-dir={get_unique_profile()}")
+    options.add_argument(f"--user-data-dir={profile_dir or get_unique_profile()}")
     options.add_argument('--window-size=1920,1080')
     options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36")
     options.add_argument("--accept-language=ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7")
-    # Включаем логирование браузера
-    options.set_capability('goog:loggingPrefs', {'browser': 'ALL'})
+    if lean:
+        # Не загружаем картинки и медиа на уровне настроек контента
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.media_stream": 2,
+            "profile.default_content_setting_values.notifications": 2,
+            "profile.default_content_setting_values.geolocation": 2,
+        })
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        # Флаги для снижения потребления памяти и фоновой активности
+        options.add_argument('--disable-extensions')
+        options.add_argument('--disable-gpu')
+        options.add_argument('--disable-background-networking')
+        options.add_argument('--disable-background-timer-throttling')
+        options.add_argument('--disable-component-update')
+        options.add_argument('--disable-default-apps')
+        options.add_argument('--disable-sync')
+        options.add_argument('--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication')
+        options.add_argument('--mute-audio')
+        options.add_argument('--no-first-run')
+        options.add_argument('--renderer-process-limit=2')
+        options.add_argument('--disk-cache-size=33554432')
+    # Включаем логирование браузера и сетевых событий CDP (для ожиданий по сети)
+    options.set_capability('goog:loggingPrefs', {'browser': 'ALL', 'performance': 'ALL'})
+    options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
     return options
 
-def create_driver():
-    """Создаёт экземпляр драйвера с автоматическим управлением ChromeDriver"""
+
+def block_heavy_resources(driver):
+    """Запрещает браузеру загружать тяжёлые ресурсы через CDP Network.setBlockedURLs"""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+        logger.info(f"Облегчённый режим: заблокировано шаблонов URL — {len(LEAN_BLOCKED_URLS)}")
+    except Exception as e:
+        logger.warning(f"Не удалось включить блокировку ресурсов через CDP: {e}")
+
+
+def create_driver(lean=BROWSER_LEAN_MODE):
+    """
+    Создаёт экземпляр драйвера с автоматическим управлением ChromeDriver.
+    Если запущено MAX_BROWSERS браузеров — ждёт, пока один из них не освободится.
+    Закрывать драйвер нужно через quit_driver().
+    """
+    browser_governor.acquire_slot()
+    profile_dir = None
     try:
         service = Service(ChromeDriverManager().install())
-        options = create_chrome_options()
+        profile_dir = get_unique_profile()
+        options = create_chrome_options(lean=lean, profile_dir=profile_dir)
         driver = webdriver.Chrome(service=service, options=options)
+        browser_governor.register(driver, profile_dir)
+        if lean:
+            block_heavy_resources(driver)
+        # Перехватываем ответы API со списком заявок (CLAIMS_XHR_MODE)
+        start_claims_capture(driver)
         logger.info("ChromeDriver успешно инициализирован")
         return driver
     except Exception as e:
         logger.error(f"Ошибка при создании драйвера: {e}")
+        browser_governor.release_slot()
+        if profile_dir:
+            cleanup_profile(profile_dir)
         raise
 
-def save_page_html(driver, filename, directory="."):
-    """Сохраняет HTML-код текущей страницы"""
+
+def quit_driver(driver):
+    """Закрывает драйвер и освобождает его место, процессы и профиль"""
+    browser_governor.quit(driver)
+    drop_network_tracker(driver)
+
+def save_page_html(driver, filename, directory=".", claim_id=None, company_name=None):
+    """
+    Сохраняет HTML-код текущей страницы. В режиме PAGE_ARCHIVE_MODE страница уходит
+    в архив (utils/page_archive.py) под именем файла без расширения, запись выполняется в фоне.
+    """
+    filepath = os.path.join(directory, filename)
     try:
-        filepath = os.path.join(directory, filename)
+        if PAGE_ARCHIVE_MODE:
+            page_archive.save(
+                driver.page_source,
+                name=os.path.splitext(filename)[0],
+                claim_id=claim_id,
+                company_name=company_name,
+                url=driver.current_url
+            )
+            logger.info(f"HTML поставлен в очередь архива: {filename}")
+            return
         os.makedirs(directory, exist_ok=True)
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(driver.page_source)
@@ -174,69 +273,120 @@ def check_authorization_status(driver):
 
 
 
-def click_new_claims_by_icon(driver, wait):
+# Перед обработкой новых заявок проверять счётчик «Новые:» и завершать проверку, если он равен нулю
+NEW_CLAIMS_PROBE = os.getenv("NEW_CLAIMS_PROBE", "1") == "1"
+
+# Читает число из счётчика «Новые:» на главной странице; null — счётчик не найден
+NEW_CLAIMS_COUNTER_JS = """
+const label = Array.from(document.querySelectorAll('div.cup div'))
+    .find(element => element.textContent.trim() === 'Новые:');
+if (!label) {
+    return null;
+}
+const match = label.closest('.cup').innerText.match(/Новые:\\s*(\\d+)/);
+return match ? parseInt(match[1], 10) : null;
+"""
+
+
+def read_new_claims_counter(driver, timeout: float = 5) -> int | None:
+    """
+    Возвращает значение счётчика «Новые:» (тот же элемент, что подтверждает авторизацию
+    в check_authorization_status) одним вызовом execute_script.
+
+    Returns:
+        int | None: количество новых заявок или None, если счётчик прочитать не удалось
+    """
+    result = {}
+
+    def counter_ready(d):
+        result["count"] = d.execute_script(NEW_CLAIMS_COUNTER_JS)
+        return result["count"] is not None
+
+    try:
+        wait_until(driver, counter_ready, timeout, "счётчик «Новые:»")
+    except Exception as e:
+        logger.warning(f"Не удалось прочитать счётчик «Новые:»: {e}")
+        return None
+    return result.get("count")
+
+
+def new_claims_icon_diagnostics(driver) -> dict:
+    """Диагностика, если иконку «Новые» не удалось найти: img с plus.svg и Angular-элементы на странице"""
+    # Поиск всех img с plus.svg
+    all_imgs = driver.find_elements(By.XPATH, "//img[contains(@src, 'plus.svg')]")
+    logger.debug(f"Найдено img с 'plus.svg': {len(all_imgs)}")
+
+    parents = []
+    for idx, img in enumerate(all_imgs):
+        try:
+            parent = img.find_element(By.XPATH, "./ancestor::div[contains(@class, 'd-flex')][1]")
+            classes = parent.get_attribute('class')
+            ng_content = parent.get_attribute('_ngcontent-ng-c3750005855')
+            logger.debug(f"  Img {idx}: родительский класс='{classes}', _ngcontent='{ng_content}'")
+            parents.append({"class": classes, "_ngcontent": ng_content})
+        except Exception as e:
+            logger.debug(f"  Не удалось получить информацию о родителе img {idx}: {e}")
+
+    # Проверка наличия Angular-атрибутов на странице
+    angular_elements = driver.find_elements(
+        By.XPATH,
+        "//*[starts-with(name(), '_ngcontent')]"
+    )
+    logger.debug(f"На странице найдено Angular-элементов: {len(angular_elements)}")
+    return {"plus_images": len(all_imgs), "plus_image_parents": parents, "angular_elements": len(angular_elements)}
+
+
+def click_new_claims_by_icon(driver, wait_timeout=15):
     """
     Пытается найти и кликнуть по элементу с иконкой plus.svg (новые заявки).
+    wait_timeout — время ожидания элемента в секундах (по умолчанию 15 с).
     Возвращает: bool — True при успехе, False при провале всех попыток.
     """
     logger.info("Поиск элемента «НОВЫЕ» по иконке plus.svg...")
 
     search_strategies = [
         {
-            'type': 'xpath',
+            'by': By.XPATH,
             'locator': "//div[_ngcontent-ng-c3750005855][contains(@class, 'cup')]//img[@src='assets/images/statistic/plus.svg']/ancestor::div[1]",
-            'description': 'XPath: родительский div с классом cup и Angular-атрибутом, содержащий img[src=plus.svg]'
+            'desc': 'XPath: родительский div с классом cup и Angular-атрибутом, содержащий img[src=plus.svg]'
         },
         {
-            'type': 'css',
+            'by': By.CSS_SELECTOR,
             'locator': "div[_ngcontent-ng-c3750005855].d-flex.align-center.cup:has(img[src='assets/images/statistic/plus.svg'])",
-            'description': 'CSS: div с Angular-атрибутом и классами, содержащий img с src=plus.svg'
+            'desc': 'CSS: div с Angular-атрибутом и классами, содержащий img с src=plus.svg'
         },
         {
-            'type': 'xpath',
+            'by': By.XPATH,
             'locator': "//div[_ngcontent-ng-c3750005855 and contains(@class, 'd-flex') and contains(@class, 'align-center') and contains(@class, 'cup')]",
-            'description': 'XPath: div с полным набором классов и Angular-атрибутом'
+            'desc': 'XPath: div с полным набором классов и Angular-атрибутом',
+            # Подходит под любой такой блок статистики, не только «Новые»
+            'fallback': True
         },
         {
-            'type': 'css',
+            'by': By.CSS_SELECTOR,
             'locator': "div[_ngcontent-ng-c3750005855][position='top'].d-flex.cup",
-            'description': 'CSS: комбинация Angular-атрибута, атрибута position и классов'
+            'desc': 'CSS: комбинация Angular-атрибута, атрибута position и классов',
+            'fallback': True
         },
         {
-            'type': 'xpath',
+            'by': By.XPATH,
             'locator': "//div[contains(text(), 'Новые:')]/ancestor::div[contains(@class, 'd-flex')][1]",
-            'description': 'XPath: поиск по тексту «Новые:» и родительскому контейнеру'
+            'desc': 'XPath: поиск по тексту «Новые:» и родительскому контейнеру'
         }
     ]
 
-    for i, strategy in enumerate(search_strategies, 1):
-        try:
-            logger.info(f"Попытка {i}: {strategy['description']}")
-
-            if strategy['type'] == 'xpath':
-                element = wait.until(
-                    EC.element_to_be_clickable((By.XPATH, strategy['locator']))
-                )
-            else:  # css
-                element = wait.until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, strategy['locator']))
-                )
-
-            # Проверка видимости и возможности клика
-            if not element.is_displayed():
-                logger.warning(f"Элемент найден, но не виден: {strategy['description']}")
-                continue
-
-            if not element.is_enabled():
-                logger.warning(f"Элемент найден, но недоступен для клика: {strategy['description']}")
-                continue
+    # Точные стратегии (первой — сработавшая в прошлый раз) ждут весь таймаут, общие — только после них
+    element, strategy = find_element_by_strategies(
+        driver, "new_claims_icon", search_strategies, timeout=wait_timeout
+    )
 
-            # Прокрутка к элементу
+    if element is not None:
+        try:
+            # Прокрутка к элементу (мгновенная — не нужно ждать окончания анимации)
             driver.execute_script(
-                "arguments[0].scrollIntoView({block: 'center', behavior: 'smooth'});",
+                "arguments[0].scrollIntoView({block: 'center', behavior: 'instant'});",
                 element
             )
-            time.sleep(0.5)
 
             # Дополнительный клик через JavaScript на случай проблем с обычным кликом
             try:
@@ -245,46 +395,51 @@ def click_new_claims_by_icon(driver, wait):
                 logger.warning("Обычный клик не сработал, пробуем через JavaScript")
                 driver.execute_script("arguments[0].click();", element)
 
-            logger.info(f"✅ Элемент найден и клик выполнен (стратегия {i})")
+            logger.info(f"✅ Элемент найден и клик выполнен ({strategy['desc']})")
             return True
-
-        except TimeoutException:
-            logger.debug(f"Стратегия {i} не сработала: таймаут ожидания элемента")
-            continue
-        except NoSuchElementException:
-            logger.debug(f"Стратегия {i} не сработала: элемент не найден")
-            continue
         except Exception as e:
-            logger.warning(f"Ошибка в стратегии {i} ({strategy['description']}): {e}")
-            continue
+            logger.warning(f"Ошибка при клике ({strategy['desc']}): {e}")
 
-    # Финальная диагностика
-    try:
-        # Поиск всех img с plus.svg
-        all_imgs = driver.find_elements(By.XPATH, "//img[contains(@src, 'plus.svg')]")
-        logger.debug(f"Найдено img с 'plus.svg': {len(all_imgs)}")
-
-        for idx, img in enumerate(all_imgs):
-            try:
-                parent = img.find_element(By.XPATH, "./ancestor::div[contains(@class, 'd-flex')][1]")
-                classes = parent.get_attribute('class')
-                ng_content = parent.get_attribute('_ngcontent-ng-c3750005855')
-                logger.debug(f"  Img {idx}: родительский класс='{classes}', _ngcontent='{ng_content}'")
-            except Exception as e:
-                logger.debug(f"  Не удалось получить информацию о родителе img {idx}: {e}")
+    logger.error("❌ Не удалось найти и кликнуть по элементу ни одной стратегией")
+    # Диагностика по Angular-атрибутам дорогая — только вместе с сохранением материалов по ошибке
+    forensics.capture_failure(driver, "new_claims_icon", diagnostics=new_claims_icon_diagnostics)
+    return False
 
-        # Проверка наличия Angular-атрибутов на странице
-        angular_elements = driver.find_elements(
-            By.XPATH,
-            "//*[starts-with(name(), '_ngcontent')]"
-        )
-        logger.debug(f"На странице найдено Angular-элементов: {len(angular_elements)}")
 
-    except Exception as e:
-        logger.warning(f"Не удалось выполнить диагностику: {e}")
+# Сериализует все строки таблицы заявок в браузере — один запрос к WebDriver вместо ~12 на строку.
+# Отсутствующая ячейка возвращается как "N/A" (как при поиске ячеек через find_element)
+CLAIMS_TABLE_JS = """
+const cell = (row, selector) => {
+    const element = row.querySelector(selector);
+    return element ? element.innerText.trim() : "N/A";
+};
+const tbody = document.querySelector("tbody[role='rowgroup']");
+if (!tbody) {
+    return null;
+}
+return Array.from(tbody.querySelectorAll("tr[role='row']")).map(row => ({
+    claim_id: cell(row, "td.cdk-column-id span"),
+    appeal_date: cell(row, "td.cdk-column-created span"),
+    description: cell(row, "td.cdk-column-category-name span"),
+    address: cell(row, "td.cdk-column-address-address span"),
+    urgency: cell(row, "td.cdk-column-type-description div.claim-type span"),
+    due_date: cell(row, "td.cdk-column-deadline span"),
+    status: cell(row, "span.claim-status-name")
+}));
+"""
+
+
+def extract_claims_table(driver) -> list[dict]:
+    """
+    Возвращает все строки таблицы заявок за один вызов execute_script.
 
-    logger.error("❌ Не удалось найти и кликнуть по элементу ни одной стратегией")
-    return False
+    Returns:
+        list[dict]: [{"claim_id", "appeal_date", "description", "address", "urgency", "due_date", "status"}, ...]
+    """
+    rows = driver.execute_script(CLAIMS_TABLE_JS)
+    if rows is None:
+        raise NoSuchElementException("Таблица заявок (tbody[role='rowgroup']) не найдена")
+    return rows
 
 
 def collect_new_claims_data(driver):
@@ -306,82 +461,33 @@ def collect_new_claims_data(driver):
             ...
         }
     """
-    # Находим tbody с role="rowgroup"
-    tbody = driver.find_element(By.XPATH, "//tbody[@role='rowgroup']")
+    # Если удалось перехватить ответ API со списком — таблицу не обходим
+    xhr_claims = collect_claims_from_xhr(driver)
+    if xhr_claims is not None:
+        return {
+            claim["claim_id"]: {
+                "appeal_date": claim["appeal_date"],
+                "description": claim["description"],
+                "address": claim["address"],
+                "urgency": claim["urgency"],
+                "due_date": claim["due_date"]
+            }
+            for claim in xhr_claims
+        }
 
-    # Находим все строки tr с role="row" внутри tbody
-    rows = tbody.find_elements(By.XPATH, ".//tr[@role='row']")
+    # Одним вызовом execute_script получаем все строки таблицы
+    rows = extract_claims_table(driver)
 
     claims_data = {}
 
     for row in rows:
-        # Извлекаем номер заявки (из первого td > span)
-        try:
-            id_element = row.find_element(
-                By.XPATH,
-                ".//td[contains(@class, 'cdk-column-id')]//span"
-            )
-            claim_id = id_element.text.strip()
-        except Exception:
-            claim_id = "N/A"
-
-        # Дата обращения (второй td > span)
-        try:
-            date_element = row.find_element(
-                By.XPATH,
-                ".//td[contains(@class, 'cdk-column-created')]//span"
-            )
-            date_text = date_element.text.strip()
-        except Exception:
-            date_text = "N/A"
-
-        # Категория (третий td > span)
-        try:
-            category_element = row.find_element(
-                By.XPATH,
-                ".//td[contains(@class, 'cdk-column-category-name')]//span"
-            )
-            category_text = category_element.text.strip()
-        except Exception:
-            category_text = "N/A"
-
-        # Адрес (четвёртый td > span)
-        try:
-            address_element = row.find_element(
-                By.XPATH,
-                ".//td[contains(@class, 'cdk-column-address-address')]//span"
-            )
-            address_text = address_element.text.strip()
-        except Exception:
-            address_text = "N/A"
-
-        # Срочность (пятый td > div > span)
-        try:
-            urgency_element = row.find_element(
-                By.XPATH,
-                ".//td[contains(@class, 'cdk-column-type-description')]//div[@class='claim-type']//span"
-            )
-            urgency_text = urgency_element.text.strip()
-        except Exception:
-            urgency_text = "N/A"
-
-        # Срок (шестой td > span)
-        try:
-            deadline_element = row.find_element(
-                By.XPATH,
-                ".//td[contains(@class, 'cdk-column-deadline')]//span"
-            )
-            deadline_text = deadline_element.text.strip()
-        except Exception:
-            deadline_text = "N/A"
-
         # Добавляем данные в словарь
-        claims_data[claim_id] = {
-            "appeal_date": date_text,
-            "description": category_text,
-            "address": address_text,
-            "urgency": urgency_text,
-            "due_date": deadline_text
+        claims_data[row["claim_id"]] = {
+            "appeal_date": row["appeal_date"],
+            "description": row["description"],
+            "address": row["address"],
+            "urgency": row["urgency"],
+            "due_date": row["due_date"]
         }
 
     return claims_data
@@ -444,63 +550,42 @@ def click_work_button(driver, wait_timeout=10):
     """
     print("click_work_button: Стартовал метод поиска кнопки В РАБОТУ")
 
-    wait = WebDriverWait(driver, wait_timeout)
-    button = None
-
-    try:
+    strategies = [
         # Стратегия 1: поиск по классу кнопки и тексту внутри span
-        print("Стратегия 1: поиск по классу 'lib-button green' и тексту ' В работу '")
-        button = wait.until(
-            EC.element_to_be_clickable((
-                By.XPATH,
-                "//button[@class='lib-button green' and .//span[text()=' В работу ']"
-            )))
-    except Exception as e1:
-        print(f"Стратегия 1 не сработала: {e1}")
-        try:
-            # Стратегия 2: поиск по роли и классу кнопки (более общий)
-            print("Стратегия 2: поиск по role='button' и классу 'lib-button'")
-            button = wait.until(
-                EC.element_to_be_clickable((
-                    By.XPATH,
-                    "//button[@class='lib-button green']//span[contains(text(), 'В работу')]"
-                )))
-        except Exception as e2:
-            print(f"Стратегия 2 не сработала: {e2}")
-            try:
-                # Стратегия 3: поиск по тексту внутри кнопки (игнорируя структуру)
-                print("Стратегия 3: поиск по содержанию текста 'В работу' в span")
-                button = wait.until(
-                    EC.element_to_be_clickable((
-                        By.XPATH,
-                        "//button[.//span[contains(text(), 'В работу')]]"
-                    )))
-            except Exception as e3:
-                print(f"Стратегия 3 не сработала: {e3}")
-                try:
-                  # Стратегия 4: поиск по комбинации атрибутов
-                    print("Стратегия 4: поиск по комбинации role, type, class, tabindex")
-                    button = wait.until(
-                        EC.element_to_be_clickable((
-                            By.XPATH,
-                            "//button[@role='button' and @type='button' and contains(@class, 'lib-button') and @tabindex='0']"
-                        )))
-                except Exception as e4:
-                    print(f"Стратегия 4 не сработала: {e4}")
-                    try:
-                        # Дополнительная стратегия: поиск любого кликабельного элемента с текстом «В работу»
-                        print("Дополнительная стратегия: поиск любого кликабельного элемента с текстом 'В работу'")
-                        button = wait.until(
-                        EC.element_to_be_clickable((
-                            By.XPATH,
-                            "//*[contains(text(), 'В работу') and (self::button or ancestor::button)]"
-                        )))
-                    except Exception as e5:
-                        print(f"Дополнительная стратегия не сработала: {e5}")
-                        logger.warning("Не удалось найти кнопку «В работу» ни по одному из селекторов")
-                        return False
+        {
+            'by': By.XPATH,
+            'locator': "//button[@class='lib-button green' and .//span[text()=' В работу ']]",
+            'desc': "поиск по классу 'lib-button green' и тексту ' В работу '"
+        },
+        # Стратегия 2: поиск по классу кнопки (более общий)
+        {
+            'by': By.XPATH,
+            'locator': "//button[@class='lib-button green']//span[contains(text(), 'В работу')]",
+            'desc': "поиск по классу 'lib-button green' и span с текстом 'В работу'"
+        },
+        # Стратегия 3: поиск по тексту внутри кнопки (игнорируя структуру)
+        {
+            'by': By.XPATH,
+            'locator': "//button[.//span[contains(text(), 'В работу')]]",
+            'desc': "поиск по содержанию текста 'В работу' в span"
+        },
+        # Стратегия 4: поиск по комбинации атрибутов (текст «В работу» обязателен — на карточке есть и другие кнопки)
+        {
+            'by': By.XPATH,
+            'locator': "//button[@role='button' and @type='button' and contains(@class, 'lib-button') and @tabindex='0' and .//span[contains(text(), 'В работу')]]",
+            'desc': "поиск по комбинации role, type, class, tabindex и тексту 'В работу'"
+        },
+        # Дополнительная стратегия: поиск любого кликабельного элемента с текстом «В работу»
+        {
+            'by': By.XPATH,
+            'locator': "//*[contains(text(), 'В работу') and (self::button or ancestor::button)]",
+            'desc': "поиск любого кликабельного элемента с текстом 'В работу'"
+        }
+    ]
 
+    button, strategy = find_element_by_strategies(driver, "work_button", strategies, timeout=wait_timeout)
     if button is not None:
+        print(f"Кнопка найдена: {strategy['desc']}")
         # Прокручиваем к элементу, чтобы он был виден на экране
         driver.execute_script(
             "arguments[0].scrollIntoView({block: 'center', behavior: 'smooth'});",
@@ -531,24 +616,281 @@ def click_work_button(driver, wait_timeout=10):
         return False
 
 
-def wait_for_page_load(driver, timeout=30):
-    """Ждёт полной загрузки страницы"""
+def wait_for_page_load(driver, timeout=30, ready=False):
+    """Ждёт полной загрузки страницы.
+    ready=True — дополнительно ждёт, пока Angular отрисует данные и завершатся XHR‑запросы
+    (до 10 с): нужно перед чтением таблицы, а не для проверки авторизации"""
     WebDriverWait(driver, timeout).until(
         lambda driver: driver.execute_script("return document.readyState") == "complete"
     )
-    time.sleep(1)  # Небольшая пауза для стабилизации
+    if ready:
+        wait_for_page_ready(driver, timeout=10)
 
 # ------- логика поиска кликабельных элементов для нажатия на НОВАЯ ЗАЯВКА и получения более подробной информации по ней с целью последующего принятия в работу -------
 
 
-def click_all_claim_details_and_save(driver, new_claims_data:dict, wait_timeout=10):
+# Общий бюджет времени на обработку одной новой заявки (открытие, сохранение, «В работу»), сек
+CLAIM_STEP_BUDGET = int(os.getenv("CLAIM_STEP_BUDGET", 60))
+
+# Открывать карточки новых заявок прямым переходом по адресу, а не кликом по строке списка
+CLAIM_DIRECT_URL_MODE = os.getenv("CLAIM_DIRECT_URL_MODE", "1") == "1"
+# Адрес карточки заявки, например https://eds.mosreg.ru/claims/{claim_id}.
+# Если не задан — запоминается по адресу первой карточки, открытой кликом по строке
+CLAIM_DETAIL_URL_TEMPLATE = os.getenv("CLAIM_DETAIL_URL_TEMPLATE", "")
+_learned_claim_url_template = None
+# Сколько вкладок одного браузера параллельно открывают карточки новых заявок (1 — по одной)
+CLAIM_DETAIL_TABS = int(os.getenv("CLAIM_DETAIL_TABS", 3))
+
+# Карточка заявки отрисована: документ загружен и на странице есть тело карточки или кнопки действий
+CLAIM_DETAIL_READY_JS = """
+return document.readyState === 'complete'
+    && !!document.querySelector('.claim-view__body, button.lib-button');
+"""
+# Кнопка «В работу» ещё на странице (после принятия заявки сайт её убирает)
+WORK_BUTTON_PRESENT_JS = """
+return Array.from(document.querySelectorAll('button')).some(b => b.innerText.includes('В работу'));
+"""
+
+
+def claim_acceptance_confirmed(driver) -> bool:
+    """Сайт обработал принятие заявки: кнопка «В работу» пропала и Angular завершил запросы"""
+    return not driver.execute_script(WORK_BUTTON_PRESENT_JS) and angular_is_stable(driver)
+
+
+def confirm_claim_accepted(driver, timeout: float = 10) -> bool:
+    """
+    Ждёт подтверждения принятия заявки после нажатия «В работу». Успешный клик ещё не значит,
+    что заявка принята, — принятой считается только заявка, с карточки которой пропала кнопка.
+    При timeout=0 проверяет один раз без ожидания.
+
+    Returns:
+        bool: True, если принятие подтверждено
+    """
+    return wait_until(driver, claim_acceptance_confirmed, timeout, "подтверждение принятия заявки")
+
+
+def learn_claim_detail_url(page_url: str, claim_id: str):
+    """Запоминает шаблон адреса карточки по адресу открытой заявки"""
+    global _learned_claim_url_template
+    if CLAIM_DETAIL_URL_TEMPLATE or _learned_claim_url_template or not claim_id:
+        return
+    page_url = page_url.split("?")[0].rstrip("/")
+    if page_url.endswith(f"/{claim_id}"):
+        _learned_claim_url_template = page_url[:-len(claim_id)] + "{claim_id}"
+        logger.info(f"Запомнен адрес карточки заявки: {_learned_claim_url_template}")
+
+
+def get_claim_detail_url(claim_id: str) -> str | None:
+    """Адрес карточки заявки или None, если шаблон адреса пока неизвестен"""
+    template = CLAIM_DETAIL_URL_TEMPLATE or _learned_claim_url_template
+    if not template:
+        return None
+    return template.format(claim_id=claim_id)
+
+
+def process_claim_by_url(driver, claim_id: str, company_name: str | None = None,
+                         claim_data: dict | None = None) -> tuple[dict | None, dict | None]:
+    """
+    Открывает карточку заявки по прямому адресу, сохраняет её и принимает заявку в работу.
+    Каждый шаг сразу записывается в журнал принятия заявок.
+
+    Returns:
+        tuple: (информация о карточке, информация после принятия «В работу») — None, если шаг не удался
+    """
+    budget = WaitBudget(CLAIM_STEP_BUDGET, f"заявка {claim_id}")
+    acceptance_journal.intent(company_name, claim_id, claim_data)
+    driver.get(get_claim_detail_url(claim_id))
+    # Ждём карточку: номер заявки в адресе и завершение запросов
+    wait_for_url_matches(driver, rf"/{claim_id}/?$", timeout=budget.timeout(15))
+    wait_for_page_ready(driver, timeout=budget.timeout(10))
+
+    claim_info = save_claim_details(driver, claim_id=claim_id)
+    if not claim_info:
+        print(f"Не удалось сохранить информацию о заявке {claim_id}")
+        return None, None
+
+    approve_info = None
+    # click_work_button сама ждёт появления кнопки «В работу»
+    clicked = click_work_button(driver, wait_timeout=budget.timeout(10))
+    # Ждём, пока сайт обработает принятие заявки и уберёт кнопку
+    accepted = clicked and confirm_claim_accepted(driver, timeout=budget.timeout(10))
+    if clicked and not accepted:
+        print(f"Принятие заявки {claim_id} не подтверждено: кнопка «В работу» не пропала")
+    acceptance_journal.clicked(company_name, claim_id, accepted)
+    if accepted:
+        approve_info = save_claim_details(driver, approve_flag=True)
+        if approve_info:
+            acceptance_journal.saved(company_name, claim_id, approve_info)
+    return claim_info, approve_info
+
+
+def process_claims_by_url(driver, new_claims_data: dict, company_name: str | None = None) -> list | None:
+    """
+    Обрабатывает новые заявки переходом по адресу каждой карточки — без повторного поиска строк,
+    прокрутки и закрытия всплывающих окон.
+
+    Returns:
+        list | None: информация о принятых заявках (как у click_all_claim_details_and_save);
+            None, если адрес карточки неизвестен и нужно открывать заявки кликом
+    """
+    claim_ids = [claim_id for claim_id in new_claims_data if str(claim_id).isdigit()]
+    if not claim_ids or get_claim_detail_url(claim_ids[0]) is None:
+        return None
+
+    # Заявки, принятые «В работу» в прерванном запуске, повторно не открываем
+    accepted = [claim_id for claim_id in claim_ids if acceptance_journal.is_accepted(company_name, claim_id)]
+    if accepted:
+        print(f"Уже приняты «В работу» в прошлом запуске: {accepted}")
+        claim_ids = [claim_id for claim_id in claim_ids if claim_id not in accepted]
+
+    # Несколько заявок сразу (например, после ночного простоя) — обрабатываем в нескольких вкладках
+    if CLAIM_DETAIL_TABS > 1 and len(claim_ids) > 1:
+        return process_claims_in_tabs(
+            driver, claim_ids, tabs=CLAIM_DETAIL_TABS, company_name=company_name, new_claims_data=new_claims_data
+        )
+
+    all_claims_approve_info = []
+    for number, claim_id in enumerate(claim_ids, 1):
+        print(f"\n--- Заявка {claim_id} ({number} из {len(claim_ids)}) — переход по адресу ---")
+        try:
+            claim_info, approve_info = process_claim_by_url(
+                driver, claim_id, company_name=company_name, claim_data=new_claims_data.get(claim_id)
+            )
+            if approve_info:
+                all_claims_approve_info.append(approve_info)
+        except Exception as e:
+            print(f"Ошибка при обработке заявки {claim_id}: {e}")
+    print(f"\n--- Завершено: обработано {len(all_claims_approve_info)} заявок из {len(claim_ids)} ---")
+    return all_claims_approve_info
+
+
+def _claim_tab_ready(driver, claim_id: str) -> bool:
+    """Карточка заявки claim_id в текущей вкладке загружена и Angular завершил отрисовку"""
+    current_url = driver.current_url.split("?")[0].rstrip("/")
+    return (
+        current_url.endswith(f"/{claim_id}")
+        and driver.execute_script(CLAIM_DETAIL_READY_JS)
+        and angular_is_stable(driver)
+    )
+
+
+def process_claims_in_tabs(driver, claim_ids: list, tabs: int = CLAIM_DETAIL_TABS,
+                           company_name: str | None = None, new_claims_data: dict | None = None) -> list:
+    """
+    Обрабатывает карточки новых заявок в нескольких вкладках одного авторизованного браузера.
+
+    Навигация запускается через location.href и не блокирует WebDriver, поэтому пока одна вкладка
+    ждёт ответа сайта, остальные сохраняются и принимаются «В работу». Вкладки опрашиваются по кругу,
+    каждая заявка ограничена бюджетом CLAIM_STEP_BUDGET.
+
+    Returns:
+        list: информация о принятых заявках (как у click_all_claim_details_and_save)
+    """
+    main_handle = driver.current_window_handle
+    queue = list(claim_ids)
+    all_claims_approve_info = []
+
+    # Вкладка: {"handle", "claim_id", "stage": None | "loading" | "accepting", "budget", "claim_info"}
+    workers = [{"handle": main_handle, "claim_id": None, "stage": None}]
+    try:
+        for _ in range(min(tabs, len(claim_ids)) - 1):
+            driver.switch_to.new_window('tab')
+            workers.append({"handle": driver.current_window_handle, "claim_id": None, "stage": None})
+        print(f"Обработка {len(claim_ids)} заявок в {len(workers)} вкладках")
+
+        while queue or any(worker["stage"] for worker in workers):
+            progress = False
+            for worker in workers:
+                driver.switch_to.window(worker["handle"])
+                claim_id = worker["claim_id"]
+                try:
+                    if worker["stage"] is None:
+                        if not queue:
+                            continue
+                        # Свободная вкладка — запускаем загрузку следующей карточки, не дожидаясь её
+                        claim_id = queue.pop(0)
+                        worker.update(
+                            claim_id=claim_id, stage="loading", claim_info=None,
+                            budget=WaitBudget(CLAIM_STEP_BUDGET, f"заявка {claim_id}")
+                        )
+                        acceptance_journal.intent(company_name, claim_id, (new_claims_data or {}).get(claim_id))
+                        driver.execute_script("window.location.href = arguments[0];", get_claim_detail_url(claim_id))
+                        progress = True
+
+                    elif worker["stage"] == "loading":
+                        if not _claim_tab_ready(driver, claim_id):
+                            if worker["budget"].expired:
+                                print(f"Карточка заявки {claim_id} не загрузилась за {CLAIM_STEP_BUDGET} сек")
+                                worker["stage"] = None
+                            continue
+                        claim_info = save_claim_details(driver, claim_id=claim_id)
+                        if not claim_info:
+                            print(f"Не удалось сохранить информацию о заявке {claim_id}")
+                            worker["stage"] = None
+                            continue
+                        worker["claim_info"] = claim_info
+                        # Страница уже отрисована — кнопке хватает короткого ожидания
+                        clicked = click_work_button(driver, wait_timeout=2)
+                        if not clicked:
+                            acceptance_journal.clicked(company_name, claim_id, False)
+                        # Принятой заявка считается только после подтверждения на этапе accepting
+                        worker["stage"] = "accepting" if clicked else None
+                        progress = True
+
+                    elif worker["stage"] == "accepting":
+                        # Ждём, пока сайт обработает принятие заявки и уберёт кнопку
+                        accepted = confirm_claim_accepted(driver, timeout=0)
+                        if not (accepted or worker["budget"].expired):
+                            continue
+                        acceptance_journal.clicked(company_name, claim_id, accepted)
+                        if not accepted:
+                            # Кнопка «В работу» так и не пропала — принятие не подтверждено
+                            print(f"Принятие заявки {claim_id} не подтверждено за {CLAIM_STEP_BUDGET} сек")
+                            worker["stage"] = None
+                            progress = True
+                            continue
+                        approve_info = save_claim_details(driver, approve_flag=True)
+                        if approve_info:
+                            acceptance_journal.saved(company_name, claim_id, approve_info)
+                            all_claims_approve_info.append(approve_info)
+                        print(f"Заявка {claim_id} принята в работу")
+                        worker["stage"] = None
+                        progress = True
+
+                except Exception as e:
+                    print(f"Ошибка при обработке заявки {claim_id} во вкладке: {e}")
+                    worker["stage"] = None
+
+            if not progress:
+                time.sleep(POLL_FREQUENCY)
+    finally:
+        # Закрываем дополнительные вкладки, основная остаётся для следующих запусков
+        for worker in workers[1:]:
+            try:
+                driver.switch_to.window(worker["handle"])
+                driver.close()
+            except Exception as e:
+                logger.warning(f"Не удалось закрыть вкладку: {e}")
+        driver.switch_to.window(main_handle)
+
+    print(f"\n--- Завершено: обработано {len(all_claims_approve_info)} заявок из {len(claim_ids)} ---")
+    return all_claims_approve_info
+
+
+def click_all_claim_details_and_save(driver, new_claims_data:dict, wait_timeout=10, company_name=None):
     """
         Ищет элементы с классом 'claim-status', находит кликабельные элементы рядом с ними,
         кликает на каждый и сохраняет информацию о страницах с деталями заявок.
     """
     
     print(f"click_all_claim_details_and_save: Стартовал\n{new_claims_data}")
-    
+
+    # Если адрес карточки известен — открываем заявки напрямую, без клика по строкам
+    if CLAIM_DIRECT_URL_MODE and new_claims_data:
+        approve_info = process_claims_by_url(driver, new_claims_data, company_name=company_name)
+        if approve_info is not None:
+            return approve_info
+
     wait = WebDriverWait(driver, wait_timeout)
     all_claims_info = []
     all_claims_approve_info = []
@@ -569,10 +911,12 @@ def click_all_claim_details_and_save(driver, new_claims_data:dict, wait_timeout=
             print(f"\n--- Обработка элемента #{i + 1} из {len(status_elements)} ---")
             claim_info = None
             clicked = False
+            budget = WaitBudget(CLAIM_STEP_BUDGET, f"элемент #{i + 1}")
             # Перезагружаем страницу перед обработкой каждого элемента
             # driver.get(base_url)
             # wait.until(EC.url_contains(base_url))
-            time.sleep(2)
+            # Ждём, пока список успокоится после закрытия предыдущей заявки
+            wait_for_page_ready(driver, timeout=budget.timeout(5))
             # Снова находим все элементы claim-status после перезагрузки
             status_elements_refreshed = wait.until(
                 EC.presence_of_all_elements_located((By.CLASS_NAME, "claim-status"))
@@ -588,59 +932,82 @@ def click_all_claim_details_and_save(driver, new_claims_data:dict, wait_timeout=
             except Exception:
                 print("Не удалось найти строку таблицы для текущего элемента claim-status")
                 continue
+            # Заявки, уже сохранённые в базе, убраны из new_claims_data — их строки не открываем
+            if new_claims_data:
+                try:
+                    row_claim_id = row_element.find_element(By.CSS_SELECTOR, "td.cdk-column-id span").text.strip()
+                except Exception:
+                    row_claim_id = None
+                if row_claim_id and row_claim_id not in new_claims_data:
+                    print(f"Заявка {row_claim_id} уже есть в базе — пропускаем")
+                    continue
+                if row_claim_id and acceptance_journal.is_accepted(company_name, row_claim_id):
+                    print(f"Заявка {row_claim_id} уже принята «В работу» в прошлом запуске — пропускаем")
+                    continue
             strategies = [
                 # 1. Сама строка таблицы
                 {
                    'locator': f"//tr[@role='row'][{i + 1}]",
-                   'type': By.XPATH,
+                   'by': By.XPATH,
                    'desc': 'Сама строка таблицы (tr[role="row"])'
                 },
                 # 2. Номер заявки в текущей строке
                 {
                     'locator': f"//tr[@role='row'][{i + 1}]//td[contains(@class, 'cdk-column-id')]//span",
-                    'type': By.XPATH,
+                    'by': By.XPATH,
                     'desc': 'Номер заявки в текущей строке'
                 },
                 # 3. Статус в текущей строке
                 {
                     'locator': f"//tr[@role='row'][{i + 1}]//span[@class='claim-status-name']",
-                    'type': By.XPATH,
+                    'by': By.XPATH,
                     'desc': 'Статус заявки в текущей строке'
                 }
             ]
-            for strategy in strategies:
+            # Строки уже отрисованы, поэтому каждой стратегии хватает короткой пробы;
+            # первой пробуем ту, что открыла заявку в прошлый раз
+            for strategy in strategy_registry.ordered("claim_row_click", strategies):
                 try:
                     print(f"Пробуем стратегию: {strategy['desc']}")
-                    clickable_element = wait.until(
-                        EC.element_to_be_clickable((strategy['type'], strategy['locator']))
+                    clickable_element = WebDriverWait(driver, SELECTOR_PROBE_TIMEOUT).until(
+                        EC.element_to_be_clickable((strategy['by'], strategy['locator']))
                     )
                     # Прокрутка к элементу
                     driver.execute_script(
-                        "arguments[0].scrollIntoView({block: 'center', behavior: 'smooth'});",
+                        "arguments[0].scrollIntoView({block: 'center', behavior: 'instant'});",
                         clickable_element
                     )
-                    time.sleep(0.5)
                     # Пытаемся кликнуть
                     try:
                         clickable_element.click()
                     except Exception:
                         driver.execute_script("arguments[0].click();", clickable_element)
-                    # Ждём загрузки деталей заявки
-                    time.sleep(2)
+                    # Ждём загрузки деталей заявки: номер заявки в адресе и завершение запросов
+                    wait_for_url_matches(driver, r"/\d+/?$", timeout=budget.timeout(10))
+                    wait_for_page_ready(driver, timeout=budget.timeout(10))
                     # Сохраняем информацию о текущей странице
                     claim_info = save_claim_details(driver, claim_id=f"claim_{i + 1}")
                     if claim_info:
                         print("Информация о заявке успешно сохранена")
+                        strategy_registry.record_winner("claim_row_click", strategy)
+                        learn_claim_detail_url(claim_info['url'], claim_info['claim_id'])
                         claim_info['claim_number'] = i + 1
                         all_claims_info.append(claim_info)
                         clicked = True
+                        acceptance_journal.intent(
+                            company_name, claim_info['claim_id'], (new_claims_data or {}).get(claim_info['claim_id'])
+                        )
                         # Принимаем заявку в работу - пока без реализации
                         click_result = click_work_button(driver)
-                        print("Получилось нажать кнопку ПРИНЯТЬ В РАБОТУ, сохраняем контент страницы")
-                        if click_result:
-                            time.sleep(2.5)
+                        # Ждём, пока сайт обработает принятие заявки и уберёт кнопку
+                        accepted = click_result and confirm_claim_accepted(driver, timeout=budget.timeout(10))
+                        acceptance_journal.clicked(company_name, claim_info['claim_id'], accepted)
+                        if accepted:
+                            print("Получилось нажать кнопку ПРИНЯТЬ В РАБОТУ, сохраняем контент страницы")
                             current_approve_detail = save_claim_details(driver, approve_flag=True)
-                            all_claims_approve_info.append(current_approve_detail)
+                            if current_approve_detail:
+                                acceptance_journal.saved(company_name, claim_info['claim_id'], current_approve_detail)
+                                all_claims_approve_info.append(current_approve_detail)
                             
                         # Закрываем окно
                         close_popup_if_exists(driver)
@@ -662,47 +1029,60 @@ def click_all_claim_details_and_save(driver, new_claims_data:dict, wait_timeout=
         return all_claims_approve_info
 
 
-def get_info_of_table_with_claims(driver, wait_timeout=10):
+# Возвращает строки таблицы, начиная с индекса arguments[0], — только добавленные после прошлого вызова.
+# Если строк стало меньше (таблица перерисована), отдаёт все строки заново
+HARVEST_ROWS_JS = """
+const rows = document.querySelectorAll("tr.cdk-row");
+const start = arguments[0] <= rows.length ? arguments[0] : 0;
+return {
+    total: rows.length,
+    rows: Array.from(rows).slice(start).map(row => {
+        const idCell = row.querySelector("td.cdk-column-id");
+        return {claim_id: idCell ? idCell.innerText.trim() : "", html: row.outerHTML};
+    })
+};
+"""
+
+
+class ClaimRowHarvester:
     """
-        Ищет элементы с классом 'claim-status' - все строки таблицы с заявками и сохраняем последние 10 из них.
+    Инкрементальный сбор строк таблицы заявок при подгрузке кнопкой «Показать еще».
+
+    Запоминает индекс последней обработанной строки и номера уже собранных заявок:
+    каждый вызов harvest() забирает одним execute_script только добавленные строки,
+    поэтому каждая строка передаётся из браузера один раз и попадает в результат без дублей.
+    Если задан on_rows, новые строки передаются в него и не накапливаются в rows.
     """
-    wait = WebDriverWait(driver, wait_timeout)
-    all_claims_by_row = []
-    try:
-        # Ждём появления элементов с классом claim-status
-        status_elements = wait.until(
-            EC.presence_of_all_elements_located((By.CLASS_NAME, "claim-status"))
-        )
-        if not status_elements:
-            print("Не найдено элементов с классом 'claim-status'")
-            return all_claims_by_row
-        print(f"Найдено элементов с классом 'claim-status': {len(status_elements)}")
 
-        # приступаем к поиску элементов с аттрибутом role ='row'
-        try:
-            row_elements = wait.until(
-            EC.presence_of_all_elements_located((By.CLASS_NAME, "cdk-row"))
-            )
-            print(f"Найдено элементов с классом class='cdk-row': {len(row_elements)}")
-        except Exception:
-            print("Не удалось найти строки таблицы с классом class='cdk-row'")
-            return all_claims_by_row
-        
-        if len(status_elements) == len(row_elements):
-            print("Количество строк таблицы равно количеству заявок")
+    def __init__(self, on_rows=None):
+        self.on_rows = on_rows
+        self.next_index = 0
+        self.seen = set()
+        self.rows = []
 
-        if len(row_elements) >= -10:
-            for element in row_elements[-10:]:
-                all_claims_by_row.append(element.get_attribute("outerHTML"))
+    def harvest(self, driver) -> int:
+        """Забирает новые строки таблицы, возвращает количество добавленных"""
+        try:
+            result = driver.execute_script(HARVEST_ROWS_JS, self.next_index)
+        except WebDriverException as e:
+            logger.warning(f"Не удалось получить строки таблицы с заявками: {e}")
+            return 0
+        if not result:
+            return 0
+        new_rows = []
+        for row in result["rows"]:
+            key = row["claim_id"] or row["html"]
+            if key in self.seen:
+                continue
+            self.seen.add(key)
+            new_rows.append(row["html"])
+        self.next_index = result["total"]
+        if self.on_rows is not None:
+            if new_rows:
+                self.on_rows(new_rows)
         else:
-            for element in row_elements:
-                all_claims_by_row.append(element.get_attribute("outerHTML"))
-        
-        print(f"Информация по первому элементу-строке:\n{all_claims_by_row[0]}")
-        return all_claims_by_row
-    
-    except Exception as e:
-        print(f"get_info_of_table_with_claims: При получении информации о строках таблицы с заявками произошла ошибка  {e}")
+            self.rows.extend(new_rows)
+        return len(new_rows)
 
 
 def parse_claim_from_html(html_string):
@@ -754,6 +1134,61 @@ def parse_claim_from_html(html_string):
     }
 
 
+def _cell_text(cell) -> str:
+    """Текст ячейки как у BeautifulSoup get_text(strip=True): фрагменты без пробелов по краям, склеенные"""
+    return "".join(text.strip() for text in cell.xpath(".//text()"))
+
+
+def parse_claims_from_html(html_rows: list[str] | str) -> list[dict]:
+    """
+    Извлекает заявки из многих строк таблицы за один разбор lxml.
+
+    Args:
+        html_rows (list[str] | str): HTML строк таблицы (outerHTML <tr>) или HTML всей таблицы
+
+    Returns:
+        list[dict]: заявки в формате parse_claim_from_html, в порядке строк
+    """
+    if isinstance(html_rows, str):
+        html_content = html_rows
+    else:
+        if not html_rows:
+            return []
+        html_content = "<table>" + "".join(html_rows) + "</table>"
+    if not html_content.strip():
+        return []
+
+    document = lxml_html.document_fromstring(html_content)
+    claims = []
+    for row in document.iter("tr"):
+        cells = row.xpath(".//td")
+        if not cells:
+            continue
+
+        urgency = ""
+        if len(cells) > 4:
+            urgency_span = cells[4].xpath("(.//span)[1]")
+            if urgency_span:
+                urgency = _cell_text(urgency_span[0])
+
+        status = ""
+        if len(cells) > 6:
+            status_span = cells[6].xpath(".//span[contains(concat(' ', normalize-space(@class), ' '), ' claim-status-name ')]")
+            if status_span:
+                status = _cell_text(status_span[0])
+
+        claims.append({
+            "claim_id": _cell_text(cells[0]),
+            "company_name": "",  # В HTML нет данных о компании
+            "appeal_date": _cell_text(cells[1]) if len(cells) > 1 else "",
+            "description": _cell_text(cells[2]) if len(cells) > 2 else "",
+            "address": _cell_text(cells[3]) if len(cells) > 3 else "",
+            "urgency": urgency,
+            "due_date": _cell_text(cells[5]) if len(cells) > 5 else "",
+            "status": status
+        })
+    return claims
+
 
 def save_claim_details(driver, claim_id="unknown", approve_flag=False) -> dict:
     """
@@ -767,14 +1202,28 @@ def save_claim_details(driver, claim_id="unknown", approve_flag=False) -> dict:
         if not claim_id.isdigit():
             return None
         page_source = driver.page_source
+        # пытаемся найти название управляющей компании, для которой предназначена заявка
+        # (до сохранения — компания нужна в индексе архива страниц)
+        company_name = find_company_in_html(page_source)
         # Сохраняем HTML-код страницы
         filename = ''
         if not approve_flag:
             filename = f"work_parsed_pages/claim_detail_{claim_id}.html"
         else:
             filename = f"work_parsed_pages/claim_approve_{claim_id}.html"
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(page_source)
+        if PAGE_ARCHIVE_MODE:
+            # Запись в фоне, страницу можно перечитать через page_archive.latest(claim_id=...)
+            page_archive.save(
+                page_source,
+                name="claim_approve" if approve_flag else "claim_detail",
+                claim_id=claim_id,
+                company_name=company_name,
+                url=page_url
+            )
+            filename = f"archive:{claim_id}"
+        else:
+            with open(filename, "w", encoding="utf-8") as f:
+                f.write(page_source)
         logging.info(f"HTML сохранён: {filename}")
         # Ищем заголовок или ключевые данные на странице деталей
         try:
@@ -785,10 +1234,6 @@ def save_claim_details(driver, claim_id="unknown", approve_flag=False) -> dict:
             title = title_element.text.strip()
         except Exception:
             title = "Заголовок не найден"
-        
-        # пытаемся найти название управляющей компании, для которой предназначена заявка
-        
-        company_name = find_company_in_html(page_source, ["Дивное", "Радуга", "Радэкс"])
 
         claim_info = {
             "url": page_url,
@@ -908,7 +1353,7 @@ def is_element_clickable(element):
 
 
 def scroll_to_bottom(driver, max_scrolls=5, delay=1):
-    """Многократно скроллит до низа с задержкой между скроллами"""
+    """Многократно скроллит до низа, пока подгружается новый контент (не дольше delay на скролл)"""
     last_height = driver.execute_script("return document.body.scrollHeight")
 
     for i in range(max_scrolls):
@@ -916,8 +1361,13 @@ def scroll_to_bottom(driver, max_scrolls=5, delay=1):
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
         print(f"Скролл #{i+1} до низа выполнен")
 
-        # Ждём загрузки нового контента
-        time.sleep(delay)
+        # Ждём загрузки нового контента: роста высоты страницы, но не дольше delay
+        wait_until(
+            driver,
+            lambda d: d.execute_script("return document.body.scrollHeight") != last_height,
+            delay,
+            "рост высоты страницы"
+        )
 
         # Получаем новую высоту страницы
         new_height = driver.execute_script("return document.body.scrollHeight")
@@ -930,106 +1380,116 @@ def scroll_to_bottom(driver, max_scrolls=5, delay=1):
         last_height = new_height
 
 
-def scroll_and_click_show_more(driver, max_attempts=300, wait_timeout=10):
+SHOW_MORE_BUTTON_XPATH = "//button//span[contains(text(), 'Показать еще')]/ancestor::button"
+# Сколько ждать новых строк после клика «Показать еще», сек
+SHOW_MORE_LOAD_TIMEOUT = float(os.getenv("SHOW_MORE_LOAD_TIMEOUT", 30))
+# Сколько кликов подряд без новых строк допускается до остановки
+SHOW_MORE_MAX_STALLS = int(os.getenv("SHOW_MORE_MAX_STALLS", 3))
+
+
+def scroll_and_click_show_more(driver, max_attempts=300, wait_timeout=10, rate_limit_key="default", on_rows=None):
     """
-        Скроллит страницу вниз, ищет кнопку «Показать еще» и нажимает на неё до тех пор,
-        пока кнопка не перестанет быть доступной.
+        Нажимает кнопку «Показать еще» до тех пор, пока она не пропадёт.
+        После клика ждёт появления новых строк таблицы (или окончания запроса списка),
+        а не фиксированное время; паузу между кликами задаёт site_rate_limiter.
 
         Args:
             driver: экземпляр WebDriver
             max_attempts: максимальное количество попыток (защита от бесконечного цикла)
             wait_timeout: время ожидания элемента в секундах
+            rate_limit_key: ключ ограничителя частоты запросов (управляющая компания)
+            on_rows: callback(list[str]) для HTML строк по мере подгрузки (тогда строки не накапливаются)
 
         Returns:
-            int: количество успешно выполненных кликов по кнопке «Показать еще»
+            tuple: (количество кликов по кнопке «Показать еще», HTML всех строк таблицы или [] при on_rows)
     """
     click_count = 0
     attempt = 1
 
-    html_info_of_all_claims = []
+    harvester = ClaimRowHarvester(on_rows=on_rows)
 
-    #iter_claims_info = get_info_of_table_with_claims(driver)
+    # Ждём первые строки таблицы
+    try:
+        WebDriverWait(driver, wait_timeout).until(
+            EC.presence_of_element_located((By.CLASS_NAME, "cdk-row"))
+        )
+    except TimeoutException:
+        print("Не удалось найти строки таблицы с классом class='cdk-row'")
 
-    #html_info_of_all_claims.extend(deepcopy(iter_claims_info))
+    stalls = 0
 
     print("scroll_and_click_show_more: Старт поиска и нажатия кнопки «Показать еще»")
     while attempt <= max_attempts:
         print(f"\n--- Попытка #{attempt} из {max_attempts} ---")
+        attempt += 1
 
-        # Скроллим в самый низ страницы
-        #driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        scroll_to_bottom(driver)
-        print("Страница прокручена в самый низ")
-        time.sleep(3)  # ждём 3 секунды
-        print("Подождали 2 секунды после скролла для загрузки контента")
-
-        
-        current_iter_claims_info = get_info_of_table_with_claims(driver)
-        html_info_of_all_claims.extend(deepcopy(current_iter_claims_info))
-
-        wait = WebDriverWait(driver, wait_timeout)
-        button = None
+        # Забираем только строки, добавленные после прошлого клика
+        added = harvester.harvest(driver)
+        print(f"Новых строк таблицы: {added}, всего собрано: {len(harvester.seen)}")
 
+        # Кнопки нет в DOM — список загружен полностью, ждать её появления не нужно
         try:
-            # Поиск кнопки по тексту внутри span
-            button = wait.until(
-                EC.element_to_be_clickable((
-                    By.XPATH,
-                    "//button//span[contains(text(), 'Показать еще')]/ancestor::button"
-                )))
-
-            print("Кнопка «Показать еще» найдена, выполняется клик")
+            buttons = driver.find_elements(By.XPATH, SHOW_MORE_BUTTON_XPATH)
+            button_visible = bool(buttons) and buttons[0].is_displayed()
+        except StaleElementReferenceException:
+            continue
+        if not button_visible:
+            print("Кнопка «Показать еще» больше не найдена — достигнут конец списка")
+            break
 
-            # Прокрутка к элементу для надёжности
-            driver.execute_script(
-                "arguments[0].scrollIntoView({block: 'center', behavior: 'smooth'});",
-                button
+        try:
+            button = WebDriverWait(driver, wait_timeout, poll_frequency=POLL_FREQUENCY).until(
+                EC.element_to_be_clickable((By.XPATH, SHOW_MORE_BUTTON_XPATH))
             )
+        except TimeoutException:
+            print("Кнопка «Показать еще» не стала доступной — достигнут конец списка")
+            break
+        except StaleElementReferenceException:
+            continue
 
-            # Кликаем по кнопке
-            try:
-                button.click()
-                logger.info(f"Кнопка «Показать еще» успешно нажата (клик #{click_count + 1})")
-                print(f"Кнопка «Показать еще» успешно нажата (клик #{click_count + 1})")
+        print("Кнопка «Показать еще» найдена, выполняется клик")
+        driver.execute_script(
+            "arguments[0].scrollIntoView({block: 'center', behavior: 'instant'});",
+            button
+        )
 
-                # Увеличиваем счётчик кликов
-                click_count += 1
+        # Пауза вежливости отсчитывается от прошлого клика, а не добавляется к загрузке
+        site_rate_limiter.wait(rate_limit_key)
+        rows_before = count_rows(driver)
+        # Учитываем ответы, полученные до клика, чтобы не принять их за подгрузку
+        get_network_tracker(driver).poll()
+        try:
+            button.click()
+        except StaleElementReferenceException:
+            continue
+        except Exception as click_error:
+            logger.warning(f"Не удалось нажать кнопку «Показать еще»: {click_error}")
+            print(f"Ошибка при клике: {click_error}")
+            break  # Выходим из цикла при ошибке клика
+
+        click_count += 1
+        logger.info(f"Кнопка «Показать еще» успешно нажата (клик #{click_count})")
+
+        # Ждём появления новых строк или окончания запроса списка
+        rows_after = wait_for_list_load(driver, rows_before, timeout=SHOW_MORE_LOAD_TIMEOUT)
+        if rows_after > rows_before:
+            stalls = 0
+            print(f"Подгружено строк: {rows_after - rows_before}")
+            continue
 
-                # Ждём случайное время от 5 до 10 секунд
-                wait_time = random.uniform(5, 10)
-                print(f"Ожидание {wait_time:.1f} секунд перед следующей попыткой")
-                time.sleep(wait_time)
+        stalls += 1
+        logger.warning(f"После клика #{click_count} новые строки не появились ({stalls} из {SHOW_MORE_MAX_STALLS})")
+        if stalls >= SHOW_MORE_MAX_STALLS:
+            print("Новые строки перестали подгружаться — завершаем работу")
+            break
 
-                # Обновляем страницу или ждём загрузки нового контента
-                # (можно добавить проверку загрузки контента при необходимости)
-
-            except Exception as click_error:
-                logger.warning(f"Не удалось нажать кнопку «Показать еще»: {click_error}")
-                print(f"Ошибка при клике: {click_error}")
-                break  # Выходим из цикла при ошибке клика
-
-        except Exception as e:
-            # Элемент не найден — это ожидаемое завершение цикла
-            if "TimeoutException" in str(type(e)) or "NoSuchElementException" in str(type(e)):
-                print("Кнопка «Показать еще» больше не найдена — достигнут конец списка")
-                break
-            else:
-                # Другие ошибки — продолжаем попытки
-                print(f"Неожиданная ошибка при поиске кнопки: {e}")
-                attempt += 1
-                continue
-        finally:        
-            attempt += 1
-
-            # Дополнительная проверка: если после клика кнопка всё ещё видна, продолжаем
-            # В противном случае — завершаем цикл
-            if button and not button.is_displayed():
-                print("Кнопка больше не отображается после клика — завершаем работу")
-                break
+    # Строки, подгруженные последним кликом
+    wait_for_network_idle(driver, timeout=3)
+    harvester.harvest(driver)
 
     print(f"\n--- Завершено: выполнено {click_count} кликов по кнопке «Показать еще» ---")
-    print(f"Собрана информация о  {len(html_info_of_all_claims)} заявках")
-    return click_count, html_info_of_all_claims
+    print(f"Собрана информация о  {len(harvester.seen)} заявках")
+    return click_count, harvester.rows
 
 
 
@@ -1040,6 +1500,13 @@ def scroll_and_click_show_more(driver, max_attempts=300, wait_timeout=10):
 
 COMPANY_ACCESS = os.getenv('COMPANY_ACCESS')
 company_access = json.loads(COMPANY_ACCESS)
+
+SITE_URL = "https://eds.mosreg.ru/"
+
+# Сохранять авторизацию (cookies + localStorage) в Redis и восстанавливать её без формы входа
+AUTH_SESSION_STORE_ENABLED = os.getenv("AUTH_SESSION_STORE_ENABLED", "1") == "1"
+# Время жизни сохранённой авторизации, сек
+AUTH_SESSION_TTL = int(os.getenv("AUTH_SESSION_TTL", 12 * 60 * 60))
 # company_name = ''
 # for key, value in company_access.items():
 #     if value[1] == login:
@@ -1062,7 +1529,6 @@ def scroll_and_click_login_link(driver, timeout=45):
     try:
         # 1. Гарантированный скролл наверх
         driver.execute_script("window.scrollTo(0, 0);")
-        time.sleep(0.5)  # небольшая пауза после скролла
 
         # 2. Ожидание появления кликабельного элемента
         wait = WebDriverWait(driver, timeout)
@@ -1099,133 +1565,108 @@ def scroll_and_click_login_link(driver, timeout=45):
 
 
 
+def collect_all_claim_rows(company_name:str, on_claims=None) -> list[dict]:
+    """Собирает все заявки из таблицы управляющей компании в формате parse_claim_from_html
+    (блокирующая работа с браузером, выполняется в пуле потоков).
+    Если задан on_claims, заявки передаются в него после каждой подгрузки и не накапливаются"""
+    with session_pool.session(company_name) as session:
+        driver = session.driver
+        # 12. Комплексная проверка авторизации
+        if session.authorized:
+            logger.info("✅ Авторизация успешна: все проверки пройдены")
+
+        # Перезагружаем список, чтобы перехватить все его страницы с первой
+        discard_captured_claims(driver)
+        driver.refresh()
+        wait_for_page_load(driver, ready=True)
+
+        if on_claims:
+            first_page = True
+
+            def on_rows(html_rows):
+                # Каждую подгрузку передаём один раз: ответ XHR, если он покрывает новые строки
+                # таблицы, иначе сами строки. Ответы забираются сразу и не копятся в трекере
+                nonlocal first_page
+                xhr_claims = take_captured_claims(driver, learn_url_for=company_name if first_page else None)
+                first_page = False
+                row_claims = parse_claims_from_html(html_rows)
+                xhr_ids = {claim["claim_id"] for claim in xhr_claims}
+                covered = bool(xhr_claims) and all(claim["claim_id"] in xhr_ids for claim in row_claims)
+                on_claims(xhr_claims if covered else row_claims)
+
+            # 13. Пытаемся нажать по кнопке ПОКАЗАТЬ ЕЩЁ
+            scroll_and_click_show_more(driver, rate_limit_key=company_name, on_rows=on_rows)
+            # Ответы без новых строк таблицы повторяют уже переданные заявки
+            discard_captured_claims(driver)
+            return []
+
+        # 13. Пытаемся нажать по кнопке ПОКАЗАТЬ ЕЩЁ
+        claims_row_info = scroll_and_click_show_more(driver, rate_limit_key=company_name)
+
+        # Страницы списка, перехваченные из XHR, точнее и не зависят от вёрстки таблицы
+        # Адрес полного списка запоминается для следующих выгрузок через API
+        xhr_claims = collect_claims_from_xhr(driver, latest_only=False, learn_url_for=company_name)
+        if xhr_claims is not None:
+            return xhr_claims
+        return parse_claims_from_html(claims_row_info[1])
+
+
 async def filled_claims_to_base(login:str, password:str, company_name:str):
     """Отвечает за наполнение базы данных информацией обо всех имеющихся заявказ
     по всем управляющим компаниям"""
-    claims_row_info = None
     logger.info(f"Приступили к обновлению базы данных по всем заявкам для УК {company_name}")
     print(f"Приступили к обновлению базы данных по всем заявкам для УК {company_name}")
 
-    driver = None
+    started = time.perf_counter()
     try:
-        driver = create_driver()
-        wait = WebDriverWait(driver, 15)
-
-        # 1. Загрузка страницы
-        driver.get("https://eds.mosreg.ru/")
-        logger.info(f"Страница загружена: {driver.current_url}")
-        save_page_html(driver, 'login_page.html', 'work_parsed_pages')
-
-        
-        scroll_and_click_login_link(driver)
-        
-        # 2. Удаление оверлея
-        remove_overlay(driver)
-
-        # 3. Поиск контейнера формы
-        logger.info("Ожидание видимости контейнера формы...")
-        form_container = wait.until(
-            EC.visibility_of_element_located((By.CSS_SELECTOR, '.login-form'))
-        )
-        if form_container:
-            logger.info("Контейнер формы найден - выделяем его...")
-            driver.execute_script("arguments[0].style.border='3px solid red'", form_container)
-
-        # 4. Поле email
-        logger.info("Поиск поля email...")
-        email_field = wait.until(
-            EC.element_to_be_clickable((
-                By.CSS_SELECTOR,
-                'dd-lib-input[formcontrolname="login-form-email"] input'
-            ))
-        )
-        if email_field:
-            logger.info("Поле email найдено - выделяем его...")
-            driver.execute_script("arguments[0].style.background='yellow'", email_field)
-        email_field.clear()
-        email_field.send_keys(login)
-        print("Email введен")
-        logger.info(f"Email введён: {email_field.get_attribute('value')}")
-
-        # 5. Поле пароля
-        password_field = wait.until(
-            EC.element_to_be_clickable((
-                By.XPATH,
-                "//input[@placeholder='Пароль' and @type='password']"
-            ))
+        async def write_batch(claims: list[dict]):
+            await save_backfill_claims(claims, company_name)
+
+        # Сбор и запись в базу идут одновременно: сборщик кладёт заявки в очередь, писатель записывает пакетами
+        async with ClaimsPipeline(write_batch, name=f"наполнение базы УК {company_name}") as pipeline:
+            # Постраничная выгрузка через API: браузер нужен только для cookies сессии
+            loaded_count = await backfill_claims_by_api(company_name, pipeline)
+            if loaded_count is None:
+                # 14. Заявки из таблицы передаются на запись после каждого «Показать еще»
+                await run_in_scraper(collect_all_claim_rows, company_name, pipeline.put_threadsafe)
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"База заявок УК {company_name} наполнена: {pipeline.written} заявок за {elapsed:.1f} сек "
+            f"({pipeline.written / elapsed if elapsed else 0:.1f} заявок/сек)"
         )
-        logger.info("Поле пароля найдено")
-        password_field.clear()
-        
-        password_field.send_keys(password)
-        print("Пароль введен введен")
-        logger.info(f"Пароль введён: {len(password_field.get_attribute('value'))} символов")
-
-        # 6. Кнопка «Авторизоваться»
-        submit_button = wait.until(
-    EC.element_to_be_clickable((
-        By.XPATH,
-        "//button[contains(@class, 'lib-button') and contains(@class, 'green') and @type='submit']"
-    ))
-)
-        logger.info("Кнопка «Авторизоваться» найдена")
-
-        # 7. Проверка состояния кнопки ДО клика
-        is_disabled = submit_button.get_attribute("disabled")
-        logger.info(f"Кнопка заблокирована (disabled): {is_disabled}")
-
-        if is_disabled:
-            logger.error("Кнопка 'Авторизоваться' заблокирована. Пытаемся разблокировать через JS...")
-            try:
-                driver.execute_script("arguments[0].removeAttribute('disabled');", submit_button)
-                time.sleep(1)
-                is_disabled_after = submit_button.get_attribute("disabled")
-                logger.info(f"Состояние кнопки после разблокировки: disabled={is_disabled_after}")
-            except Exception as e:
-                logger.error(f"Не удалось разблокировать кнопку: {e}")
-                return
-
-        # 8. Клик по кнопке (с повторами)
-        if click_with_retries(submit_button, driver):
-            logger.info("Авторизация инициирована (клик).")
-        else:
-            # Если клики не сработали — пробуем Enter
-            logger.warning("Клик не сработал. Пробуем отправить Enter на кнопку.")
-            submit_button.send_keys(Keys.ENTER)
-            logger.info("Отправлен Enter на кнопку «Авторизоваться».")
+    except Exception as e:
+        logger.error(f"Произошла ошибка: {e=}")
 
-        # 9. Ждём полной загрузки страницы после авторизации
-        logger.info("Ожидание загрузки страницы после авторизации...")
-        wait_for_page_load(driver, timeout=30)
 
-        # 10. Собираем JS‑ошибки после действия
-        get_browser_logs(driver)
+async def save_backfill_claims(claims_rows: list[dict], company_name: str) -> int:
+    """Записывает в базу заявки, полученные при наполнении базы (пакетный upsert)"""
+    for current_claim_info in claims_rows:
+        current_claim_info.update(company_name=company_name)
+    written_count = await upsert_claims(claims_rows)
+    # Заявки в статусе «Новая» не пропускаются проверкой новых заявок — их ещё нужно принять
+    remember_accepted_rows(claims_rows)
+    return written_count
 
-        # 11. Сохранение финальной страницы
-        save_page_html(driver, 'main_company.html', 'work_parsed_pages')
 
-        
-        # 12. Комплексная проверка авторизации
-        if check_authorization_status(driver):
-            logger.info("✅ Авторизация успешна: все проверки пройдены")
+async def backfill_claims_by_api(company_name: str, pipeline: ClaimsPipeline) -> int | None:
+    """
+    Наполняет базу заявками компании через API списка заявок, страница за страницей:
+    каждая страница сразу уходит в конвейер записи pipeline.
 
+    Returns:
+        int | None: количество выгруженных заявок; None, если нужно выгружать через таблицу
+            (режим выключен, адрес списка не перехвачен или API недоступно)
+    """
+    if not CLAIMS_API_BACKFILL:
+        return None
+    # Выдача сессии из пула запоминает адрес списка по запросу главной страницы — берём адрес после неё
+    auth = await run_in_scraper(get_company_session_auth, company_name)
+    list_url = get_claims_list_url(company_name)
+    if not auth or not list_url:
+        return None
 
-        # 13. Пытаемся нажать по кнопке ПОКАЗАТЬ ЕЩЁ
-        claims_row_info = scroll_and_click_show_more(driver) 
-        
-        # 14. Добавляем информацию в базу данных по каждой заявке
-        for row_info in claims_row_info[1]:
-            current_claim_info = dict()
-            current_claim_info = parse_claim_from_html(row_info)
-            current_claim_info.update(company_name=company_name)
-            new_claim = await add_new_claim(claim_info=current_claim_info)
-    except Exception as e:
-        logger.error(f"Произошла ошибка: {e=}")
-    finally:
-        scroll_and_click_header_then_logout(driver)
-        if driver:
-            driver.quit()
-            logger.info("Драйвер закрыт")
+    return await backfill_claims_via_api(auth, list_url, pipeline.put, rate_limit_key=company_name)
 
 
 
@@ -1243,12 +1684,13 @@ def scroll_and_click_header_then_logout(driver, timeout=20):
         bool: True, если все действия выполнены успешно, False — в случае ошибки
     """
     try:
+        budget = WaitBudget(timeout, "выход из аккаунта")
+
         # 1. Гарантированный скролл наверх
         driver.execute_script("window.scrollTo(0, 0);")
-        time.sleep(0.5)
 
         # 2. Поиск и клик по элементу header-login__link
-        wait = WebDriverWait(driver, timeout)
+        wait = WebDriverWait(driver, budget.timeout(timeout))
         header_element = wait.until(
             EC.element_to_be_clickable((
                 By.XPATH,
@@ -1267,11 +1709,8 @@ def scroll_and_click_header_then_logout(driver, timeout=20):
             print("❌ Элемент header-login__link найден, но не кликаем/не виден")
             return False
 
-        # Небольшая пауза для появления всплывающего контента
-        time.sleep(1)
-
-        # 3. Поиск кнопки «Выйти» во всплывающем контенте
-        logout_element = wait.until(
+        # 3. Поиск кнопки «Выйти» во всплывающем контенте (ожидание появления вместо паузы)
+        logout_element = WebDriverWait(driver, budget.timeout(timeout)).until(
             EC.element_to_be_clickable((
                 By.XPATH,
                 "//*[contains(text(), 'Выйти')]"
@@ -1282,7 +1721,8 @@ def scroll_and_click_header_then_logout(driver, timeout=20):
             try:
                 logout_element.click()
                 print("✅ Кнопка «Выйти» успешно найдена и нажата")
-                time.sleep(5)
+                # Ждём завершения запроса на выход
+                wait_for_network_idle(driver, timeout=budget.timeout(5))
                 return True
             except ElementClickInterceptedException:
                 driver.execute_script("arguments[0].click();", logout_element)
@@ -1303,195 +1743,318 @@ def scroll_and_click_header_then_logout(driver, timeout=20):
         return False
 
 
+def get_company_credentials(company_name: str) -> tuple[str, str]:
+    """Возвращает логин и пароль управляющей компании из COMPANY_ACCESS"""
+    return [ (value[1], value[2]) for key, value in company_access.items() if value[0].lower() == company_name.lower()][0]
 
 
+def login_to_site(driver, login: str, password: str, timeout=15) -> bool:
+    """
+    Выполняет вход на сайт через форму авторизации.
 
-async def filled_base_of_all_companyes():
-    login = ''
-    password = ''
-    company_name = ''
+    Args:
+        driver: экземпляр WebDriver
+        login: логин управляющей компании
+        password: пароль управляющей компании
+        timeout: время ожидания элементов формы в секундах
 
-    for key, value in company_access.items():
-        company_name = value[0]
-        login = value[1]
-        password = value[2]
-        await filled_claims_to_base(login, password, company_name) 
+    Returns:
+        bool: True, если авторизация подтверждена check_authorization_status
+    """
+    wait = WebDriverWait(driver, timeout)
 
-    logger.info(f"Наполнение базы данных по всем компаниям успешно проведено")
-    print(f"filled_base_of_all_companyes: Наполнение базы данных по всем компаниям успешно проведено")
+    # 1. Загрузка страницы
+    driver.get(SITE_URL)
+    logger.info(f"Страница загружена: {driver.current_url}")
+    forensics.snapshot(driver, 'login_page')
 
+    scroll_and_click_login_link(driver)
 
+    # 2. Удаление оверлея
+    remove_overlay(driver)
 
-def get_jsond_data_by_claim(company_name:str, claim_id:str | list) -> list:
-    """Возвращает json данные по заявке"""
-    login, password = [ (value[1], value[2]) for key, value in company_access.items() if value[0].lower() == company_name.lower()][0]
+    # 3. Поиск контейнера формы
+    logger.info("Ожидание видимости контейнера формы...")
+    form_container = wait.until(
+        EC.visibility_of_element_located((By.CSS_SELECTOR, '.login-form'))
+    )
+    if form_container:
+        logger.info("Контейнер формы найден - выделяем его...")
+        driver.execute_script("arguments[0].style.border='3px solid red'", form_container)
+
+    # 4. Поле email
+    logger.info("Поиск поля email...")
+    email_field = wait.until(
+        EC.element_to_be_clickable((
+            By.CSS_SELECTOR,
+            'dd-lib-input[formcontrolname="login-form-email"] input'
+        ))
+    )
+    if email_field:
+        logger.info("Поле email найдено - выделяем его...")
+        driver.execute_script("arguments[0].style.background='yellow'", email_field)
+    email_field.clear()
+    email_field.send_keys(login)
+    logger.info(f"Email введён: {email_field.get_attribute('value')}")
+
+    # 5. Поле пароля
+    password_field = wait.until(
+        EC.element_to_be_clickable((
+            By.XPATH,
+            "//input[@placeholder='Пароль' and @type='password']"
+        ))
+    )
+    logger.info("Поле пароля найдено")
+    password_field.clear()
 
-    logger.info(f"Приступили к поиску заявки с ID = {claim_id} для УК {company_name} с целью обновления её статуса")
-    print(f"Приступили к поиску заявки с ID = {claim_id} для УК {company_name} с целью обновления её статуса")
+    password_field.send_keys(password)
+    logger.info(f"Пароль введён: {len(password_field.get_attribute('value'))} символов")
 
-    driver = None
-    try:
-        driver = create_driver()
-        wait = WebDriverWait(driver, 20)
+    # 6. Кнопка «Авторизоваться»
+    submit_button = wait.until(
+        EC.element_to_be_clickable((
+            By.XPATH,
+            "//button[contains(@class, 'lib-button') and contains(@class, 'green') and @type='submit']"
+        ))
+    )
+    logger.info("Кнопка «Авторизоваться» найдена")
 
-        # 1. Загрузка страницы
-        driver.get("https://eds.mosreg.ru/")
-        logger.info(f"Страница загружена: {driver.current_url}")
-        save_page_html(driver, 'login_page.html', 'work_parsed_pages')
+    # 7. Проверка состояния кнопки ДО клика
+    is_disabled = submit_button.get_attribute("disabled")
+    logger.info(f"Кнопка заблокирована (disabled): {is_disabled}")
 
-        
-        scroll_and_click_login_link(driver)
-        
-        # 2. Удаление оверлея
-        remove_overlay(driver)
+    if is_disabled:
+        logger.error("Кнопка 'Авторизоваться' заблокирована. Пытаемся разблокировать через JS...")
+        try:
+            driver.execute_script("arguments[0].removeAttribute('disabled');", submit_button)
+            time.sleep(1)
+            is_disabled_after = submit_button.get_attribute("disabled")
+            logger.info(f"Состояние кнопки после разблокировки: disabled={is_disabled_after}")
+        except Exception as e:
+            logger.error(f"Не удалось разблокировать кнопку: {e}")
+            return False
 
-        # 3. Поиск контейнера формы
-        logger.info("Ожидание видимости контейнера формы...")
-        form_container = wait.until(
-            EC.visibility_of_element_located((By.CSS_SELECTOR, '.login-form'))
-        )
-        if form_container:
-            logger.info("Контейнер формы найден - выделяем его...")
-            driver.execute_script("arguments[0].style.border='3px solid red'", form_container)
+    # 8. Клик по кнопке (с повторами)
+    if click_with_retries(submit_button, driver):
+        logger.info("Авторизация инициирована (клик).")
+    else:
+        # Если клики не сработали — пробуем Enter
+        logger.warning("Клик не сработал. Пробуем отправить Enter на кнопку.")
+        submit_button.send_keys(Keys.ENTER)
+        logger.info("Отправлен Enter на кнопку «Авторизоваться».")
 
-        # 4. Поле email
-        logger.info("Поиск поля email...")
-        email_field = wait.until(
-            EC.element_to_be_clickable((
-                By.CSS_SELECTOR,
-                'dd-lib-input[formcontrolname="login-form-email"] input'
-            ))
-        )
-        if email_field:
-            logger.info("Поле email найдено - выделяем его...")
-            driver.execute_script("arguments[0].style.background='yellow'", email_field)
-        email_field.clear()
-        email_field.send_keys(login)
-        print("Email введен")
-        logger.info(f"Email введён: {email_field.get_attribute('value')}")
-
-        # 5. Поле пароля
-        password_field = wait.until(
-            EC.element_to_be_clickable((
-                By.XPATH,
-                "//input[@placeholder='Пароль' and @type='password']"
-            ))
-        )
-        logger.info("Поле пароля найдено")
-        password_field.clear()
-        
-        password_field.send_keys(password)
-        print("Пароль введен введен")
-        logger.info(f"Пароль введён: {len(password_field.get_attribute('value'))} символов")
+    # 9. Ждём полной загрузки страницы после авторизации
+    logger.info("Ожидание загрузки страницы после авторизации...")
+    wait_for_page_load(driver, timeout=30)
 
-        # 6. Кнопка «Авторизоваться»
-        submit_button = wait.until(
-    EC.element_to_be_clickable((
-        By.XPATH,
-        "//button[contains(@class, 'lib-button') and contains(@class, 'green') and @type='submit']"
-    ))
-)
-        logger.info("Кнопка «Авторизоваться» найдена")
+    # 10. Собираем JS‑ошибки после действия
+    get_browser_logs(driver)
+
+    # 11. Снимок финальной страницы (на диск — только при ошибке)
+    forensics.snapshot(driver, 'main_company')
+
+    # 12. Комплексная проверка авторизации
+    return check_authorization_status(driver)
+
+
+def export_browser_state(driver) -> dict:
+    """Выгружает cookies и содержимое localStorage текущего домена"""
+    local_storage = driver.execute_script("""
+        const items = {};
+        for (let i = 0; i < window.localStorage.length; i++) {
+            const key = window.localStorage.key(i);
+            items[key] = window.localStorage.getItem(key);
+        }
+        return items;
+    """)
+    return {"cookies": driver.get_cookies(), "local_storage": local_storage or {}}
 
-        # 7. Проверка состояния кнопки ДО клика
-        is_disabled = submit_button.get_attribute("disabled")
-        logger.info(f"Кнопка заблокирована (disabled): {is_disabled}")
 
-        if is_disabled:
-            logger.error("Кнопка 'Авторизоваться' заблокирована. Пытаемся разблокировать через JS...")
+def restore_browser_state(driver, auth_state: dict) -> bool:
+    """
+    Подставляет в новый браузер сохранённые cookies и localStorage
+    и проверяет, что сайт принял сессию.
+
+    Returns:
+        bool: True, если авторизация подтверждена без формы входа
+    """
+    # cookies можно добавить только находясь на странице домена
+    driver.get(SITE_URL)
+    for cookie in auth_state.get("cookies", []):
+        try:
+            driver.add_cookie(cookie)
+        except Exception as e:
+            logger.warning(f"Не удалось восстановить cookie {cookie.get('name')}: {e}")
+    driver.execute_script(
+        "for (const [key, value] of Object.entries(arguments[0])) { window.localStorage.setItem(key, value); }",
+        auth_state.get("local_storage", {})
+    )
+    driver.get(SITE_URL)
+    wait_for_page_load(driver, timeout=30)
+    return check_authorization_status(driver)
+
+
+def authorize_company(driver, company_name: str) -> bool:
+    """
+    Выполняет вход на сайт под учётной записью управляющей компании.
+
+    Сначала пробует восстановить сохранённую в Redis сессию, при неудаче
+    заполняет форму входа и сохраняет новую сессию.
+    """
+    if AUTH_SESSION_STORE_ENABLED:
+        auth_state = redis_db.get_auth_session(company_name)
+        if auth_state:
             try:
-                driver.execute_script("arguments[0].removeAttribute('disabled');", submit_button)
-                time.sleep(1)
-                is_disabled_after = submit_button.get_attribute("disabled")
-                logger.info(f"Состояние кнопки после разблокировки: disabled={is_disabled_after}")
+                if restore_browser_state(driver, auth_state):
+                    logger.info(f"Авторизация УК {company_name} восстановлена из Redis без формы входа")
+                    return True
             except Exception as e:
-                logger.error(f"Не удалось разблокировать кнопку: {e}")
-                return
+                logger.warning(f"Ошибка восстановления сессии УК {company_name}: {e}")
+            logger.info(f"Сохранённая сессия УК {company_name} недействительна — выполняем вход через форму")
+            redis_db.delete_auth_session(company_name)
+            driver.delete_all_cookies()
 
-        # 8. Клик по кнопке (с повторами)
-        if click_with_retries(submit_button, driver):
-            logger.info("Авторизация инициирована (клик).")
-        else:
-            # Если клики не сработали — пробуем Enter
-            logger.warning("Клик не сработал. Пробуем отправить Enter на кнопку.")
-            submit_button.send_keys(Keys.ENTER)
-            logger.info("Отправлен Enter на кнопку «Авторизоваться».")
+    login, password = get_company_credentials(company_name)
+    try:
+        authorized = login_to_site(driver, login, password)
+    except TimeoutException as e:
+        logger.error(f"Таймаут при авторизации УК {company_name}: {e}")
+        return False
+
+    if authorized and AUTH_SESSION_STORE_ENABLED:
+        redis_db.save_auth_session(company_name, export_browser_state(driver), AUTH_SESSION_TTL)
+    return authorized
 
-        # 9. Ждём полной загрузки страницы после авторизации
-        logger.info("Ожидание загрузки страницы после авторизации...")
+
+def is_session_authorized(driver) -> bool:
+    """Открывает главную страницу и проверяет, что сессия на сайте ещё активна"""
+    try:
+        # Ответы прошлых запусков не нужны: по запросам главной страницы запоминается адрес списка заявок
+        discard_captured_claims(driver)
+        driver.get(SITE_URL)
         wait_for_page_load(driver, timeout=30)
+        return check_authorization_status(driver)
+    except Exception as e:
+        logger.warning(f"Не удалось проверить активность сессии: {e}")
+        return False
 
-        # 10. Собираем JS‑ошибки после действия
-        get_browser_logs(driver)
 
-        # 11. Сохранение финальной страницы
-        save_page_html(driver, 'main_company.html', 'work_parsed_pages')
+def export_session_auth(driver) -> dict:
+    """
+    Выгружает из авторизованного браузера cookies и заголовки,
+    необходимые для запросов к API сайта без Selenium.
 
-        
-        # 12. Комплексная проверка авторизации
-        if check_authorization_status(driver):
-            logger.info("✅ Авторизация успешна: все проверки пройдены")
-        
-        try:
-            claims_actual_info = []
-            if not isinstance(claim_id, list):
-                        
-                print(f"Пытаемся получить json данные по заявке c ID={claim_id}")
+    Returns:
+        dict: {"cookies": {имя: значение}, "headers": {...}}
+    """
+    cookies = {cookie["name"]: cookie["value"] for cookie in driver.get_cookies()}
+    headers = {
+        "User-Agent": driver.execute_script("return navigator.userAgent;"),
+        "Accept": "application/json, text/plain, */*",
+        "Accept-Language": "ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7",
+        "Referer": SITE_URL,
+    }
+    # Если приложение хранит токен в localStorage/sessionStorage — передаём его как Bearer
+    token = driver.execute_script("""
+        for (const storage of [window.localStorage, window.sessionStorage]) {
+            for (let i = 0; i < storage.length; i++) {
+                const key = storage.key(i);
+                if (/token/i.test(key)) { return storage.getItem(key); }
+            }
+        }
+        return null;
+    """)
+    if token:
+        token = token.strip('"')
+        headers["Authorization"] = f"Bearer {token}"
+    return {"cookies": cookies, "headers": headers}
 
-                try:
-                    # Открываем страницу
-                    driver.get(f"https://eds.mosreg.ru/api/claim/{claim_id}")
 
-                    # Ждём появления элемента <pre> с JSON (максимум 10 секунд)
-                    wait = WebDriverWait(driver, 10)
-                    json_element = wait.until(
-                        EC.presence_of_element_located((By.TAG_NAME, "pre"))
-                    )
-                    raw_json = json_element.text
+def get_company_session_auth(company_name: str) -> dict | None:
+    """Возвращает cookies и заголовки авторизованной сессии управляющей компании"""
+    try:
+        with session_pool.session(company_name) as session:
+            if not session.authorized:
+                logger.error(f"Не удалось авторизоваться для выгрузки сессии УК {company_name}")
+                return None
+            return export_session_auth(session.driver)
+    except Exception as e:
+        logger.error(f"Ошибка при выгрузке сессии УК {company_name}: {e}")
+        return None
 
-                    if not raw_json.strip():
-                        print(f"Получен пустой JSON для заявки {claim_id}")
-                        
-                    # Парсим JSON
-                    data = json.loads(raw_json)
-                    print(f"JSON успешно получен: {type(data)}")
 
-                    # Отладочная печать структуры
-                    print("Структура данных (первые уровни):")
-                    #print(json.dumps({k: data[k] for k in list(data.keys())[:3]}, indent=2, ensure_ascii=False))
+def close_driver(driver):
+    """Закрывает браузер. Выход из аккаунта выполняется, только если сессия не хранится в Redis"""
+    try:
+        # Выход из аккаунта сделал бы сохранённые в Redis cookies недействительными
+        if not AUTH_SESSION_STORE_ENABLED:
+            scroll_and_click_header_then_logout(driver)
+    finally:
+        quit_driver(driver)
+        logger.info("Драйвер закрыт")
+
+
+# Пул авторизованных браузеров по управляющим компаниям
+session_pool = SessionPool(
+    create_driver=create_driver,
+    authorize=authorize_company,
+    is_authorized=is_session_authorized,
+    close_driver=close_driver,
+    needs_recycle=browser_governor.needs_recycle,
+    # Главная страница после входа сама запрашивает список заявок — запоминаем его адрес для API
+    on_checkout=learn_claims_list_url_from_page
+)
+# Когда браузеров слишком много, новый запрос освобождает место, закрывая простаивающий браузер пула
+browser_governor.release_idle = session_pool.release_idle
 
 
-                    # Безопасное извлечение данных с учётом реальной структуры
-                    value_data = data.get("value", {})
-                    claim_data = value_data.get("claim", {})
+def browser_maintenance():
+    """Пересоздаёт тяжёлые простаивающие браузеры и убирает осиротевшие процессы и профили"""
+    recycled = session_pool.recycle_idle()
+    if recycled:
+        logger.info(f"Закрыто браузеров по превышению ресурсов: {recycled}")
+    browser_governor.maintenance()
 
-                    claim_id_val = claim_data.get("id", None)
-                    status_name = claim_data.get("statusName", None)
-                    deadline = claim_data.get("deadline", None)
-                    type_data = claim_data.get("type", {})
-                    description = type_data.get("description", None) if type_data else None
 
-                    claims_actual_info.append((claim_id_val, status_name, deadline, description))
-                    #print(f"claims_actual_info={claims_actual_info}")
-                    time.sleep(0.2)
 
-                except NoSuchElementException:
-                    print(f"Элемент <pre> не найден для заявки {claim_id}. Возможно, JSON не отображается или страница не загрузилась.")
-                except TimeoutException:
-                    print(f"Таймаут ожидания JSON для заявки {claim_id} (10 секунд).")
-                except json.JSONDecodeError as e:
-                    print(f"Ошибка парсинга JSON для заявки {claim_id}: {e}")
-                    print(f"Текст ответа (первые 500 символов): {raw_json[:500] if 'raw_json' in locals() else 'Недоступен'}")
-                except Exception as e:
-                    print(f"Неожиданная ошибка для заявки {claim_id}: {e}")
-            else:
-                
-                for item in claim_id:
-                    print(f"Пытаемся получить json данные по заявке c ID={item}")
+async def filled_base_of_all_companyes():
+    login = ''
+    password = ''
+    company_name = ''
+
+    for key, value in company_access.items():
+        company_name = value[0]
+        login = value[1]
+        password = value[2]
+        await filled_claims_to_base(login, password, company_name) 
+
+    logger.info(f"Наполнение базы данных по всем компаниям успешно проведено")
+    print(f"filled_base_of_all_companyes: Наполнение базы данных по всем компаниям успешно проведено")
+
+
+
+def get_jsond_data_by_claim(company_name:str, claim_id:str | list) -> list:
+    """Возвращает json данные по заявке"""
+
+    logger.info(f"Приступили к поиску заявки с ID = {claim_id} для УК {company_name} с целью обновления её статуса")
+    print(f"Приступили к поиску заявки с ID = {claim_id} для УК {company_name} с целью обновления её статуса")
+
+    try:
+        with session_pool.session(company_name) as session:
+            driver = session.driver
+            # 12. Комплексная проверка авторизации
+            if session.authorized:
+                logger.info("✅ Авторизация успешна: все проверки пройдены")
+
+            try:
+                claims_actual_info = []
+                if not isinstance(claim_id, list):
+                        
+                    print(f"Пытаемся получить json данные по заявке c ID={claim_id}")
 
                     try:
                         # Открываем страницу
-                        driver.get(f"https://eds.mosreg.ru/api/claim/{item}")
+                        driver.get(f"https://eds.mosreg.ru/api/claim/{claim_id}")
 
                         # Ждём появления элемента <pre> с JSON (максимум 10 секунд)
                         wait = WebDriverWait(driver, 10)
@@ -1501,61 +2064,86 @@ def get_jsond_data_by_claim(company_name:str, claim_id:str | list) -> list:
                         raw_json = json_element.text
 
                         if not raw_json.strip():
-                            print(f"Получен пустой JSON для заявки {item}")
-                            continue
-
+                            print(f"Получен пустой JSON для заявки {claim_id}")
+                        
                         # Парсим JSON
                         data = json.loads(raw_json)
                         print(f"JSON успешно получен: {type(data)}")
 
                         # Отладочная печать структуры
                         print("Структура данных (первые уровни):")
-                        print(json.dumps({k: data[k] for k in list(data.keys())[:3]}, indent=2, ensure_ascii=False))
+                        #print(json.dumps({k: data[k] for k in list(data.keys())[:3]}, indent=2, ensure_ascii=False))
 
 
                         # Безопасное извлечение данных с учётом реальной структуры
-                        value_data = data.get("value", {})
-                        claim_data = value_data.get("claim", {})
-
-                        claim_id_val = claim_data.get("id", None)
-                        status_name = claim_data.get("statusName", None)
-                        deadline = claim_data.get("deadline", None)
-                        type_data = claim_data.get("type", {})
-                        description = type_data.get("description", None) if type_data else None
-
-                        claims_actual_info.append((claim_id_val, status_name, deadline, description))
+                        claims_actual_info.append(parse_claim_json(data))
                         #print(f"claims_actual_info={claims_actual_info}")
+                        time.sleep(0.2)
 
                     except NoSuchElementException:
-                        print(f"Элемент <pre> не найден для заявки {item}. Возможно, JSON не отображается или страница не загрузилась.")
+                        print(f"Элемент <pre> не найден для заявки {claim_id}. Возможно, JSON не отображается или страница не загрузилась.")
                     except TimeoutException:
-                        print(f"Таймаут ожидания JSON для заявки {item} (10 секунд).")
+                        print(f"Таймаут ожидания JSON для заявки {claim_id} (10 секунд).")
                     except json.JSONDecodeError as e:
-                        print(f"Ошибка парсинга JSON для заявки {item}: {e}")
+                        print(f"Ошибка парсинга JSON для заявки {claim_id}: {e}")
                         print(f"Текст ответа (первые 500 символов): {raw_json[:500] if 'raw_json' in locals() else 'Недоступен'}")
                     except Exception as e:
-                        print(f"Неожиданная ошибка для заявки {item}: {e}")
+                        print(f"Неожиданная ошибка для заявки {claim_id}: {e}")
+                else:
+                
+                    for item in claim_id:
+                        print(f"Пытаемся получить json данные по заявке c ID={item}")
+
+                        try:
+                            # Открываем страницу
+                            driver.get(f"https://eds.mosreg.ru/api/claim/{item}")
+
+                            # Ждём появления элемента <pre> с JSON (максимум 10 секунд)
+                            wait = WebDriverWait(driver, 10)
+                            json_element = wait.until(
+                                EC.presence_of_element_located((By.TAG_NAME, "pre"))
+                            )
+                            raw_json = json_element.text
+
+                            if not raw_json.strip():
+                                print(f"Получен пустой JSON для заявки {item}")
+                                continue
+
+                            # Парсим JSON
+                            data = json.loads(raw_json)
+                            print(f"JSON успешно получен: {type(data)}")
+
+                            # Отладочная печать структуры
+                            print("Структура данных (первые уровни):")
+                            print(json.dumps({k: data[k] for k in list(data.keys())[:3]}, indent=2, ensure_ascii=False))
+
+
+                            # Безопасное извлечение данных с учётом реальной структуры
+                            claims_actual_info.append(parse_claim_json(data))
+                            #print(f"claims_actual_info={claims_actual_info}")
+
+                        except NoSuchElementException:
+                            print(f"Элемент <pre> не найден для заявки {item}. Возможно, JSON не отображается или страница не загрузилась.")
+                        except TimeoutException:
+                            print(f"Таймаут ожидания JSON для заявки {item} (10 секунд).")
+                        except json.JSONDecodeError as e:
+                            print(f"Ошибка парсинга JSON для заявки {item}: {e}")
+                            print(f"Текст ответа (первые 500 символов): {raw_json[:500] if 'raw_json' in locals() else 'Недоступен'}")
+                        except Exception as e:
+                            print(f"Неожиданная ошибка для заявки {item}: {e}")
 
                 
-                print("Обработка завершена. Итоговый список: (временно закоментирован)")
-                #print(claims_actual_info)
-                return claims_actual_info
+                    print("Обработка завершена. Итоговый список: (временно закоментирован)")
+                    #print(claims_actual_info)
+                    return claims_actual_info
             
 
-        except requests.exceptions.RequestException as e:
-            print(f"Ошибка запроса: {e}")
-        except json.JSONDecodeError as e:
-            print(f"Ответ не является валидным JSON: {e}")
+            except requests.exceptions.RequestException as e:
+                print(f"Ошибка запроса: {e}")
+            except json.JSONDecodeError as e:
+                print(f"Ответ не является валидным JSON: {e}")
     except Exception as e:
         logger.error(f"Произошла ошибка: {e}")
-    finally:
-        if driver:
-            driver.get("https://eds.mosreg.ru/")
-            time.sleep(3)
-            scroll_and_click_header_then_logout(driver)
-            driver.quit()
-            logger.info("Драйвер закрыт")
-    
 
 
 
@@ -1576,210 +2164,40 @@ def search_and_extract_data(company_name:str, search_text="6213774", timeout=10)
     """
     # ищем пароль и логин управляющей компании, для которой ищем заявку
     
-    login, password = [ (value[1], value[2]) for key, value in company_access.items() if value[0].lower() == company_name.lower()][0]
-
     logger.info(f"Приступили к поиску заявки с ID = {search_text} для УК {company_name} с целью обновления её статуса")
     print(f"Приступили к поиску заявки с ID = {search_text} для УК {company_name} с целью обновления её статуса")
 
-    driver = None
     try:
-        driver = create_driver()
-        wait = WebDriverWait(driver, 20)
-
-        # 1. Загрузка страницы
-        driver.get("https://eds.mosreg.ru/")
-        logger.info(f"Страница загружена: {driver.current_url}")
-        save_page_html(driver, 'login_page.html', 'work_parsed_pages')
+        with session_pool.session(company_name) as session:
+            driver = session.driver
+            # 12. Комплексная проверка авторизации
+            if session.authorized:
+                logger.info("✅ Авторизация успешна: все проверки пройдены")
 
-        
-        scroll_and_click_login_link(driver)
-        
-        # 2. Удаление оверлея
-        remove_overlay(driver)
-
-        # 3. Поиск контейнера формы
-        logger.info("Ожидание видимости контейнера формы...")
-        form_container = wait.until(
-            EC.visibility_of_element_located((By.CSS_SELECTOR, '.login-form'))
-        )
-        if form_container:
-            logger.info("Контейнер формы найден - выделяем его...")
-            driver.execute_script("arguments[0].style.border='3px solid red'", form_container)
-
-        # 4. Поле email
-        logger.info("Поиск поля email...")
-        email_field = wait.until(
-            EC.element_to_be_clickable((
-                By.CSS_SELECTOR,
-                'dd-lib-input[formcontrolname="login-form-email"] input'
-            ))
-        )
-        if email_field:
-            logger.info("Поле email найдено - выделяем его...")
-            driver.execute_script("arguments[0].style.background='yellow'", email_field)
-        email_field.clear()
-        email_field.send_keys(login)
-        print("Email введен")
-        logger.info(f"Email введён: {email_field.get_attribute('value')}")
-
-        # 5. Поле пароля
-        password_field = wait.until(
-            EC.element_to_be_clickable((
-                By.XPATH,
-                "//input[@placeholder='Пароль' and @type='password']"
-            ))
-        )
-        logger.info("Поле пароля найдено")
-        password_field.clear()
-        
-        password_field.send_keys(password)
-        print("Пароль введен введен")
-        logger.info(f"Пароль введён: {len(password_field.get_attribute('value'))} символов")
-
-        # 6. Кнопка «Авторизоваться»
-        submit_button = wait.until(
-    EC.element_to_be_clickable((
-        By.XPATH,
-        "//button[contains(@class, 'lib-button') and contains(@class, 'green') and @type='submit']"
-    ))
-)
-        logger.info("Кнопка «Авторизоваться» найдена")
-
-        # 7. Проверка состояния кнопки ДО клика
-        is_disabled = submit_button.get_attribute("disabled")
-        logger.info(f"Кнопка заблокирована (disabled): {is_disabled}")
-
-        if is_disabled:
-            logger.error("Кнопка 'Авторизоваться' заблокирована. Пытаемся разблокировать через JS...")
             try:
-                driver.execute_script("arguments[0].removeAttribute('disabled');", submit_button)
-                time.sleep(1)
-                is_disabled_after = submit_button.get_attribute("disabled")
-                logger.info(f"Состояние кнопки после разблокировки: disabled={is_disabled_after}")
-            except Exception as e:
-                logger.error(f"Не удалось разблокировать кнопку: {e}")
-                return
-
-        # 8. Клик по кнопке (с повторами)
-        if click_with_retries(submit_button, driver):
-            logger.info("Авторизация инициирована (клик).")
-        else:
-            # Если клики не сработали — пробуем Enter
-            logger.warning("Клик не сработал. Пробуем отправить Enter на кнопку.")
-            submit_button.send_keys(Keys.ENTER)
-            logger.info("Отправлен Enter на кнопку «Авторизоваться».")
-
-        # 9. Ждём полной загрузки страницы после авторизации
-        logger.info("Ожидание загрузки страницы после авторизации...")
-        wait_for_page_load(driver, timeout=30)
-
-        # 10. Собираем JS‑ошибки после действия
-        get_browser_logs(driver)
-
-        # 11. Сохранение финальной страницы
-        save_page_html(driver, 'main_company.html', 'work_parsed_pages')
-
-        
-        # 12. Комплексная проверка авторизации
-        if check_authorization_status(driver):
-            logger.info("✅ Авторизация успешна: все проверки пройдены")
-        
-        try:
                 
-            wait = WebDriverWait(driver, timeout)
+                wait = WebDriverWait(driver, timeout)
 
-            actual_status_info = None
+                actual_status_info = None
 
-            if not isinstance(search_text, list):
-                # Обработка одиночной заявки
-                print(f"🔎 Обработка одиночной заявки: {search_text}")
-
-                try:
-                    # 1. Поиск и ввод в поле поиска
-                    print("🔎 Ищем поле ввода...")
-                    input_field = wait.until(
-                        EC.presence_of_element_located((
-                            By.XPATH,
-                    "//input[contains(@class, 'search-input') and @type='text']"
-                ))
-                    )
-                    print("✅ Поле ввода найдено")
-
-                    input_field.clear()
-                    input_field.send_keys(search_text)
-                    print(f"📝 Текст '{search_text}' введён в поле поиска")
-
-                    # 2. Поиск и клик по кнопке поиска
-                    print("🔎 Ищем кнопку поиска...")
-                    search_button = wait.until(
-                        EC.element_to_be_clickable((
-                    By.XPATH,
-                    "//div[contains(@class, 'head-filter__search_event') and contains(text(), 'Искать по всем заявкам')]"
-                ))
-                    )
-                    search_button.click()
-                    print("✅ Кнопка «Искать по всем заявкам» нажата")
-
-                    # Ожидание стабилизации DOM
-                    time.sleep(2)
-                    wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
-
-                    # Ждём исчезновения спиннера загрузки (если есть)
-                    try:
-                        wait.until(EC.invisibility_of_element_located((By.ID, "loading-spinner")))
-                    except:
-                        pass
-
-                    # 3. Поиск статуса заявки с обработкой Stale Element
-                    print("🔎 Ищем статус заявки...")
-                    status_element = _find_element_with_retry(
-                        wait,
-                        By.XPATH,
-                        "//span[contains(@class, 'claim-status-name')]",
-                        max_attempts=3
-                    )
-                    claim_status = status_element.text.strip() if status_element else None
-                    print(f"✅ Найден статус заявки: '{claim_status}'")
-
-                    # 4. Поиск срока выполнения с обработкой Stale Element
-                    print("🔎 Ищем срок выполнения...")
-                    deadline_element = _find_element_with_retry(
-                        wait,
-                        By.XPATH,
-                        "//td[contains(@class, 'cdk-column-deadline')]//span",
-                        max_attempts=3
-                    )
-                    deadline = deadline_element.text.strip() if deadline_element else None
-                    print(f"✅ Найден срок выполнения: '{deadline}'")
-
-                    return (search_text, claim_status, deadline)
-
-                except Exception as e:
-                    print(f"❌ Ошибка при обработке заявки {search_text}: {e}")
-                    return (search_text, None, None)
-
-            else:
-                # Обработка нескольких заявок
-                print("Планируем актуализировать информацию по нескольким заявкам")
-                actual_status_info = list()
-
-                for claim_id in search_text:
-                    print(f"\n🔎 Обработка заявки: {claim_id}")
+                if not isinstance(search_text, list):
+                    # Обработка одиночной заявки
+                    print(f"🔎 Обработка одиночной заявки: {search_text}")
 
                     try:
                         # 1. Поиск и ввод в поле поиска
                         print("🔎 Ищем поле ввода...")
                         input_field = wait.until(
                             EC.presence_of_element_located((
-                        By.XPATH,
+                                By.XPATH,
                         "//input[contains(@class, 'search-input') and @type='text']"
                     ))
                         )
                         print("✅ Поле ввода найдено")
 
                         input_field.clear()
-                        input_field.send_keys(claim_id)
-                        print(f"📝 Текст '{claim_id}' введён в поле поиска")
+                        input_field.send_keys(search_text)
+                        print(f"📝 Текст '{search_text}' введён в поле поиска")
 
                         # 2. Поиск и клик по кнопке поиска
                         print("🔎 Ищем кнопку поиска...")
@@ -1792,45 +2210,112 @@ def search_and_extract_data(company_name:str, search_text="6213774", timeout=10)
                         search_button.click()
                         print("✅ Кнопка «Искать по всем заявкам» нажата")
 
-                        # Ожидание стабилизации DOM
-                        time.sleep(2)
+                        # Ожидание результатов поиска
+                        wait_for_network_idle(driver, timeout=5)
                         wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
 
-                        # Ждём исчезновения спиннера загрузки
+                        # Ждём исчезновения спиннера загрузки (если есть)
                         try:
                             wait.until(EC.invisibility_of_element_located((By.ID, "loading-spinner")))
                         except:
                             pass
 
-                        # 3. Поиск статуса заявки с повторными попытками
+                        # 3. Поиск статуса заявки с обработкой Stale Element
                         print("🔎 Ищем статус заявки...")
-                        status_element = _find_element_with_retry(wait, By.XPATH, "//span[contains(@class, 'claim-status-name')]", max_attempts=3)
+                        status_element = _find_element_with_retry(
+                            wait,
+                            By.XPATH,
+                            "//span[contains(@class, 'claim-status-name')]",
+                            max_attempts=3
+                        )
                         claim_status = status_element.text.strip() if status_element else None
                         print(f"✅ Найден статус заявки: '{claim_status}'")
 
-                        # 4. Поиск срока выполнения с повторными попытками
+                        # 4. Поиск срока выполнения с обработкой Stale Element
                         print("🔎 Ищем срок выполнения...")
-                        deadline_element = _find_element_with_retry(wait, By.XPATH, "//td[contains(@class, 'cdk-column-deadline')]//span", max_attempts=3)
+                        deadline_element = _find_element_with_retry(
+                            wait,
+                            By.XPATH,
+                            "//td[contains(@class, 'cdk-column-deadline')]//span",
+                            max_attempts=3
+                        )
                         deadline = deadline_element.text.strip() if deadline_element else None
                         print(f"✅ Найден срок выполнения: '{deadline}'")
 
-                        actual_status_info.append((claim_id, claim_status, deadline))
-
+                        return (search_text, claim_status, deadline)
 
                     except Exception as e:
-                        print(f"❌ Ошибка при обработке заявки {claim_id}: {e}")
-                        actual_status_info.append((claim_id, None, None))
+                        print(f"❌ Ошибка при обработке заявки {search_text}: {e}")
+                        return (search_text, None, None)
 
-                print(f"Актуальная информация по всем заявкам:\n{actual_status_info}")
-                return actual_status_info
+                else:
+                    # Обработка нескольких заявок
+                    print("Планируем актуализировать информацию по нескольким заявкам")
+                    actual_status_info = list()
 
-        except Exception as e:
-            print(f"❌ search_and_extract_data: Произошла ошибка: {e}")
-        finally:
-            if driver:
-                driver.quit()
-                print("search_and_extract_data: Драйвер закрыт")
-    
+                    for claim_id in search_text:
+                        print(f"\n🔎 Обработка заявки: {claim_id}")
+
+                        try:
+                            # 1. Поиск и ввод в поле поиска
+                            print("🔎 Ищем поле ввода...")
+                            input_field = wait.until(
+                                EC.presence_of_element_located((
+                            By.XPATH,
+                            "//input[contains(@class, 'search-input') and @type='text']"
+                        ))
+                            )
+                            print("✅ Поле ввода найдено")
+
+                            input_field.clear()
+                            input_field.send_keys(claim_id)
+                            print(f"📝 Текст '{claim_id}' введён в поле поиска")
+
+                            # 2. Поиск и клик по кнопке поиска
+                            print("🔎 Ищем кнопку поиска...")
+                            search_button = wait.until(
+                                EC.element_to_be_clickable((
+                            By.XPATH,
+                            "//div[contains(@class, 'head-filter__search_event') and contains(text(), 'Искать по всем заявкам')]"
+                        ))
+                            )
+                            search_button.click()
+                            print("✅ Кнопка «Искать по всем заявкам» нажата")
+
+                            # Ожидание результатов поиска
+                            wait_for_network_idle(driver, timeout=5)
+                            wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
+
+                            # Ждём исчезновения спиннера загрузки
+                            try:
+                                wait.until(EC.invisibility_of_element_located((By.ID, "loading-spinner")))
+                            except:
+                                pass
+
+                            # 3. Поиск статуса заявки с повторными попытками
+                            print("🔎 Ищем статус заявки...")
+                            status_element = _find_element_with_retry(wait, By.XPATH, "//span[contains(@class, 'claim-status-name')]", max_attempts=3)
+                            claim_status = status_element.text.strip() if status_element else None
+                            print(f"✅ Найден статус заявки: '{claim_status}'")
+
+                            # 4. Поиск срока выполнения с повторными попытками
+                            print("🔎 Ищем срок выполнения...")
+                            deadline_element = _find_element_with_retry(wait, By.XPATH, "//td[contains(@class, 'cdk-column-deadline')]//span", max_attempts=3)
+                            deadline = deadline_element.text.strip() if deadline_element else None
+                            print(f"✅ Найден срок выполнения: '{deadline}'")
+
+                            actual_status_info.append((claim_id, claim_status, deadline))
+
+
+                        except Exception as e:
+                            print(f"❌ Ошибка при обработке заявки {claim_id}: {e}")
+                            actual_status_info.append((claim_id, None, None))
+
+                    print(f"Актуальная информация по всем заявкам:\n{actual_status_info}")
+                    return actual_status_info
+
+            except Exception as e:
+                print(f"❌ search_and_extract_data: Произошла ошибка: {e}")
     except Exception as e:
         print(f"search_and_extract_data: Произошла ошибка: {e}")
         return None
@@ -1865,14 +2350,69 @@ async def find_info_of_new_claims() -> dict:
     
     # redis_db.add_new_process("check_new_claims")
     
-    new_claims_by_company = dict()
-
-    for value in list(company_access.values()):
-        print(f"Получаем информацию по новым заявкам для управляющей компании {value[0]}")
-        current_new_claims = find_info_of_new_claims_by_company(value[0])
-        await add_new_claims(current_new_claims)
-        
-        new_claims_by_company.update({f"{value[0]}" : current_new_claims})
+    async def process_company(company_name):
+        print(f"Получаем информацию по новым заявкам для управляющей компании {company_name}")
+        # Работа с браузером — в пуле потоков, запись в БД — в цикле событий бота
+        # Заявки, принятые «В работу» в прерванном прошлом запуске, но не сохранённые в базу
+        recovered_claims = acceptance_journal.uncommitted(company_name)
+        if recovered_claims:
+            logger.info(f"УК {company_name}: из журнала восстановлено принятых заявок — {len(recovered_claims)}")
+            for claim in recovered_claims.values():
+                claim["status"] = ACCEPTED_CLAIM_STATUS
+            await add_new_claims(recovered_claims)
+            acceptance_journal.committed(company_name, recovered_claims.keys())
+            remember_claims(recovered_claims.keys())
+
+        # Статус, с которым заявка записана в базу, — он же возвращается вызывающему
+        claim_statuses = dict()
+
+        async def write_batch(items: list[tuple]):
+            claims = dict(items)
+            # Этап в журнале проверяем до committed(), который удаляет записи заявок
+            accepted_ids = [claim_id for claim_id in claims if acceptance_journal.is_accepted(company_name, claim_id)]
+            pending_ids = [claim_id for claim_id in claims if claim_id not in accepted_ids]
+            for claim_id, claim in claims.items():
+                # «В работу» не нажата или не подтверждена — заявка остаётся новой и будет принята позже
+                claim["status"] = ACCEPTED_CLAIM_STATUS if claim_id in accepted_ids else NEW_CLAIM_STATUS
+                claim_statuses[claim_id] = claim["status"]
+            await add_new_claims(claims)
+            acceptance_journal.committed(company_name, claims.keys())
+            remember_claims(accepted_ids)
+            # Непринятая заявка не должна считаться известной, иначе её больше не откроют
+            forget_claims(pending_ids)
+
+        # Заявка уходит на запись в базу, как только сохранена её карточка, — не дожидаясь остальных
+        async with ClaimsPipeline(write_batch, name=f"новые заявки УК {company_name}") as pipeline:
+            streamed_ids = set()
+
+            def on_claim_saved(claim_id, claim):
+                streamed_ids.add(claim_id)
+                pipeline.put_threadsafe([(claim_id, claim)])
+
+            acceptance_journal.subscribe(company_name, on_claim_saved)
+            try:
+                current_new_claims = await run_in_scraper(find_info_of_new_claims_by_company, company_name)
+            finally:
+                acceptance_journal.unsubscribe(company_name)
+
+            # Заявки, не прошедшие через конвейер (например, без сохранённой карточки)
+            remaining_claims = [
+                (claim_id, claim) for claim_id, claim in (current_new_claims or {}).items()
+                if claim_id not in streamed_ids
+            ]
+            await pipeline.put(remaining_claims)
+        for claim_id, claim in (current_new_claims or {}).items():
+            claim["status"] = claim_statuses.get(claim_id, NEW_CLAIM_STATUS)
+        if recovered_claims:
+            return {**recovered_claims, **(current_new_claims or {})}
+        return current_new_claims
+
+    # Номера заявок из базы — чтобы не открывать повторно уже сохранённые
+    await warm_known_claims()
+
+    # Компании обрабатываются параллельно, каждая в своём браузере
+    all_companies = [value[0] for value in list(company_access.values())]
+    new_claims_by_company = await run_for_companies(all_companies, process_company)
     
     print(f'find_info_of_new_claims: {new_claims_by_company=}')
     logger.info(f"{new_claims_by_company=}")
@@ -1891,7 +2431,7 @@ def test_connection():
         # 1. Загрузка страницы
         driver.get("https://eds.mosreg.ru/")
         logger.info(f"Страница загружена: {driver.current_url}")
-        save_page_html(driver, 'login_page.html', 'work_parsed_pages')
+        forensics.snapshot(driver, 'login_page')
 
         
         scroll_and_click_login_link(driver)
@@ -1899,15 +2439,13 @@ def test_connection():
         remove_overlay(driver)
     except Exception as e:
         logger.error(f"Непредвиденная ошибка: {type(e).__name__}: {e}")
-        if driver:
-            save_page_html(driver, 'unexpected_error_page.html', 'work_parsed_pages')
-            driver.save_screenshot('unexpected_error_screenshot.png')
+        forensics.capture_failure(driver, 'test_connection', error=e)
     finally:
         if driver:
             logger.info("Браузер остаётся открытым. Нажмите Enter в консоли для закрытия...")
             input("Чтобы остановить скрипт, нажмите Enter")  # Ожидание ввода от пользователя
             scroll_and_click_header_then_logout(driver)
-            driver.quit()
+            quit_driver(driver)
             redis_db.remove_process("check_new_claims")
             logger.info("Драйвер закрыт")
 
@@ -1919,209 +2457,124 @@ def test_connection():
 
 def find_info_of_new_claims_by_company(company_name:str) -> dict | None:
     
-    login, password = [ (value[1], value[2]) for key, value in company_access.items() if value[0].lower() == company_name.lower()][0]
-    
-    driver = None
     try:
-        driver = create_driver()
-        wait = WebDriverWait(driver, 15)
-
-        # 1. Загрузка страницы
-        driver.get("https://eds.mosreg.ru/")
-        logger.info(f"Страница загружена: {driver.current_url}")
-        save_page_html(driver, 'login_page.html', 'work_parsed_pages')
-
-        
-        scroll_and_click_login_link(driver)
-        # 2. Удаление оверлея
-        remove_overlay(driver)
-
-        # 3. Поиск контейнера формы
-        logger.info("Ожидание видимости контейнера формы...")
-        form_container = wait.until(
-            EC.visibility_of_element_located((By.CSS_SELECTOR, '.login-form'))
-        )
-        if form_container:
-            logger.info("Контейнер формы найден - выделяем его...")
-            driver.execute_script("arguments[0].style.border='3px solid red'", form_container)
-
-        # 4. Поле email
-        logger.info("Поиск поля email...")
-        email_field = wait.until(
-            EC.element_to_be_clickable((
-                By.CSS_SELECTOR,
-                'dd-lib-input[formcontrolname="login-form-email"] input'
-            ))
-        )
-        if email_field:
-            logger.info("Поле email найдено - выделяем его...")
-            driver.execute_script("arguments[0].style.background='yellow'", email_field)
-        email_field.clear()
-        email_field.send_keys(login)
-        logger.info(f"Email введён: {email_field.get_attribute('value')}")
-
-        # 5. Поле пароля
-        password_field = wait.until(
-            EC.element_to_be_clickable((
-                By.XPATH,
-                "//input[@placeholder='Пароль' and @type='password']"
-            ))
-        )
-        logger.info("Поле пароля найдено")
-        password_field.clear()
-        
-        password_field.send_keys(password)
-        logger.info(f"Пароль введён: {str(len(password_field.get_attribute('value')))} символов")
-
-        # 6. Кнопка «Авторизоваться»
-        submit_button = wait.until(
-    EC.element_to_be_clickable((
-        By.XPATH,
-        "//button[contains(@class, 'lib-button') and contains(@class, 'green') and @type='submit']"
-    ))
-)
-        logger.info("Кнопка «Авторизоваться» найдена")
-
-        # 7. Проверка состояния кнопки ДО клика
-        is_disabled = submit_button.get_attribute("disabled")
-        logger.info(f"Кнопка заблокирована (disabled): {is_disabled}")
-
-        if is_disabled:
-            logger.error("Кнопка 'Авторизоваться' заблокирована. Пытаемся разблокировать через JS...")
+        with session_pool.session(company_name) as session:
+            driver = session.driver
             try:
-                driver.execute_script("arguments[0].removeAttribute('disabled');", submit_button)
-                time.sleep(1)
-                is_disabled_after = submit_button.get_attribute("disabled")
-                logger.info(f"Состояние кнопки после разблокировки: disabled={is_disabled_after}")
-            except Exception as e:
-                logger.error(f"Не удалось разблокировать кнопку: {e}")
-                return
-
-        # 8. Клик по кнопке (с повторами)
-        if click_with_retries(submit_button, driver):
-            logger.info("Авторизация инициирована (клик).")
-        else:
-            # Если клики не сработали — пробуем Enter
-            logger.warning("Клик не сработал. Пробуем отправить Enter на кнопку.")
-            submit_button.send_keys(Keys.ENTER)
-            logger.info("Отправлен Enter на кнопку «Авторизоваться».")
-
-        # 9. Ждём полной загрузки страницы после авторизации
-        logger.info("Ожидание загрузки страницы после авторизации...")
-        wait_for_page_load(driver, timeout=30)
-
-        # 10. Собираем JS‑ошибки после действия
-        get_browser_logs(driver)
-
-        # 11. Сохранение финальной страницы
-        save_page_html(driver, 'main_company.html', 'work_parsed_pages')
-
-        # 12. Комплексная проверка авторизации
-        if check_authorization_status(driver):
-            logger.info("✅ Авторизация успешна: все проверки пройдены")
+                # 12. Комплексная проверка авторизации
+                if session.authorized:
+                    logger.info("✅ Авторизация успешна: все проверки пройдены")
+
+                    # Быстрая проверка: если счётчик «Новые:» равен нулю — дальше не идём
+                    if NEW_CLAIMS_PROBE:
+                        new_claims_count = read_new_claims_counter(driver)
+                        redis_db.record_new_claims_probe(company_name, new_claims_count)
+                        logger.info(f"УК {company_name}: счётчик «Новые:» = {new_claims_count}")
+                        if new_claims_count == 0:
+                            print(f"Новых заявок для УК {company_name} нет")
+                            return {}
             
-            
-            # 13. Попытка взаимодействия с элементом «НОВЫЕ»
-            try:
-                # Пытаемся кликнуть по элементу «НОВЫЕ»
-                if click_new_claims_by_icon(driver, wait):
-                # Если клик удался, ждём загрузки и сохраняем страницу
-                    wait_for_page_load(driver, timeout=15)
-                    save_page_html(driver, 'new_claims.html', 'work_parsed_pages')
-                    logger.info("Страница с новыми заявками успешно сохранена")
-                else:
-                    logger.error("Не удалось перейти к новым заявкам")
+                    # 13. Попытка взаимодействия с элементом «НОВЫЕ»
+                    try:
+                        # Нужен только ответ API, который придёт после клика
+                        discard_captured_claims(driver)
+                        # Пытаемся кликнуть по элементу «НОВЫЕ»
+                        if click_new_claims_by_icon(driver, wait_timeout=15):
+                        # Если клик удался, ждём загрузки и запоминаем страницу
+                            wait_for_page_load(driver, timeout=15, ready=True)
+                            forensics.snapshot(driver, 'new_claims', company_name=company_name)
+                            logger.info("Страница с новыми заявками загружена")
+                        else:
+                            logger.error("Не удалось перейти к новым заявкам")
 
-            except TimeoutException:
-                logger.warning("Элемент «НОВЫЕ» не найден или не кликаем в отведённое время")
-            except Exception as e:
-                logger.error(f"Ошибка при работе с элементом «НОВЫЕ»: {e}")
+                    except TimeoutException:
+                        logger.warning("Элемент «НОВЫЕ» не найден или не кликаем в отведённое время")
+                    except Exception as e:
+                        logger.error(f"Ошибка при работе с элементом «НОВЫЕ»: {e}")
             
-            # 14.Собираем информацию по новым заявкам в виде словаря
-            try:
-                new_claims_data = collect_new_claims_data(driver)
-                print(f"Information of new claims: {new_claims_data=}")
-                logger.info(f"Information of new claims: {new_claims_data=}")
-            except Exception as e:
-                logger.error(f"Произошла ошибка при получении информации по новым заявкам в виде словаря {e=}")
+                    # 14.Собираем информацию по новым заявкам в виде словаря
+                    try:
+                        new_claims_data = collect_new_claims_data(driver)
+                        print(f"Information of new claims: {new_claims_data=}")
+                        logger.info(f"Information of new claims: {new_claims_data=}")
+                        # Заявки, которые уже есть в базе, повторно не открываем и не принимаем
+                        new_claims_data, skipped_count = skip_known_claims(new_claims_data)
+                        if skipped_count:
+                            print(f"Пропущено уже сохранённых заявок: {skipped_count}")
+                            logger.info(f"УК {company_name}: пропущено уже сохранённых заявок — {skipped_count}")
+                            if not new_claims_data:
+                                return {}
+                    except Exception as e:
+                        logger.error(f"Произошла ошибка при получении информации по новым заявкам в виде словаря {e=}")
                 
-            # 15. Получаем детальную информацию о всех новых заявках
-            try:
-                all_claim_info = click_all_claim_details_and_save(driver, new_claims_data)
-                if all_claim_info:
-                    print("Информация о всех новых заявках c номерами и названиями заявок:", all_claim_info)
-
-                    logger.info(f"Информация о всех новых заявках: {all_claim_info=}")
-
-                    print("Обновляем ифнформацию в new_claims_data, добавляем названия компаний")
-                    result_new_claims_data = update_claims_with_company_names(all_claim_info, new_claims_data)
-                    return result_new_claims_data
+                    # 15. Получаем детальную информацию о всех новых заявках
+                    try:
+                        all_claim_info = click_all_claim_details_and_save(driver, new_claims_data, company_name=company_name)
+                        if all_claim_info:
+                            print("Информация о всех новых заявках c номерами и названиями заявок:", all_claim_info)
+
+                            logger.info(f"Информация о всех новых заявках: {all_claim_info=}")
+
+                            print("Обновляем ифнформацию в new_claims_data, добавляем названия компаний")
+                            result_new_claims_data = update_claims_with_company_names(all_claim_info, new_claims_data)
+                            return result_new_claims_data
+                        else:
+                            print("Не удалось получить информацию о заявках")
+                            logger.warning("Не удалось получить информацию о новых заявках. Возможно их нет")
+                    except Exception as e:
+                            logger.error(f"При получении подробной информации о новых заявках произошла ошибка: {e=}")
                 else:
-                    print("Не удалось получить информацию о заявках")
-                    logger.warning("Не удалось получить информацию о новых заявках. Возможно их нет")
-            except Exception as e:
-                    logger.error(f"При получении подробной информации о новых заявках произошла ошибка: {e=}")
-        else:
-            logger.error("❌ Авторизация не прошла — не удалось подтвердить статус авторизации")
+                    logger.error("❌ Авторизация не прошла — не удалось подтвердить статус авторизации")
 
-            # Дополнительная диагностика
-            try:
-                # Ищем сообщения об ошибках
-                error_selectors = [
-                    ".error-message",
-            ".alert-danger",
-            ".text-danger",
-            "[role='alert']",
-            ".notification.error"
-        ]
-                for selector in error_selectors:
+                    # Дополнительная диагностика
                     try:
-                        element = driver.find_element(By.CSS_SELECTOR, selector)
-                        error_text = element.text.strip()
-                        if error_text:
-                            logger.error(f"На странице обнаружено сообщение об ошибке: {error_text}")
-                            break
-                    except:
-                        continue
-
-                # Проверяем CAPTCHA
-                try:
-                    captcha_element = driver.find_element(
-                                (By.XPATH, "//*[contains(text(), 'CAPTCHA') or contains(@id, 'captcha') or contains(@class, 'captcha')]")
-                                   )
-                    if captcha_element.is_displayed():
-                        logger.error("На странице обнаружена CAPTCHA — требуется ручное подтверждение.")
-                except:
-                    pass  # CAPTCHA не найдена или не видна
-
-                current_url = driver.current_url
-                page_title = driver.title
-                logger.info(f"Текущий URL: {current_url}")
-                logger.info(f"Заголовок страницы: {page_title}")
-
-            except TimeoutException as e:
-                logger.error(f"Таймаут ожидания элемента: {e}")
-        if driver:
-            save_page_html(driver, 'timeout_page.html', 'work_parsed_pages')
-            driver.save_screenshot('timeout_screenshot.png')
-    except WebDriverException as e:
-        logger.error(f"Ошибка WebDriver: {e}")
-        if driver:
-            save_page_html(driver, 'webdriver_error_page.html', 'work_parsed_pages')
-            driver.save_screenshot('webdriver_error_screenshot.png')
+                        # Ищем сообщения об ошибках
+                        error_selectors = [
+                            ".error-message",
+                    ".alert-danger",
+                    ".text-danger",
+                    "[role='alert']",
+                    ".notification.error"
+                ]
+                        for selector in error_selectors:
+                            try:
+                                element = driver.find_element(By.CSS_SELECTOR, selector)
+                                error_text = element.text.strip()
+                                if error_text:
+                                    logger.error(f"На странице обнаружено сообщение об ошибке: {error_text}")
+                                    break
+                            except:
+                                continue
+
+                        # Проверяем CAPTCHA
+                        try:
+                            captcha_element = driver.find_element(
+                                        (By.XPATH, "//*[contains(text(), 'CAPTCHA') or contains(@id, 'captcha') or contains(@class, 'captcha')]")
+                                           )
+                            if captcha_element.is_displayed():
+                                logger.error("На странице обнаружена CAPTCHA — требуется ручное подтверждение.")
+                        except:
+                            pass  # CAPTCHA не найдена или не видна
+
+                        current_url = driver.current_url
+                        page_title = driver.title
+                        logger.info(f"Текущий URL: {current_url}")
+                        logger.info(f"Заголовок страницы: {page_title}")
+
+                    except TimeoutException as e:
+                        logger.error(f"Таймаут ожидания элемента: {e}")
+                    forensics.capture_failure(driver, 'authorization', company_name=company_name)
+            except WebDriverException as e:
+                logger.error(f"Ошибка WebDriver: {e}")
+                forensics.capture_failure(driver, 'webdriver_error', error=e, company_name=company_name)
+                session.broken = True
+            except Exception as e:
+                logger.error(f"Непредвиденная ошибка: {type(e).__name__}: {e}")
+                forensics.capture_failure(driver, 'unexpected_error', error=e, company_name=company_name)
     except Exception as e:
-        logger.error(f"Непредвиденная ошибка: {type(e).__name__}: {e}")
-        if driver:
-            save_page_html(driver, 'unexpected_error_page.html', 'work_parsed_pages')
-            driver.save_screenshot('unexpected_error_screenshot.png')
+        logger.error(f"Не удалось получить сессию браузера для УК {company_name}: {type(e).__name__}: {e}")
     finally:
-        if driver:
-            #logger.info("Браузер остаётся открытым. Нажмите Enter в консоли для закрытия...")
-            #input("Чтобы остановить скрипт, нажмите Enter")  # Ожидание ввода от пользователя
-            scroll_and_click_header_then_logout(driver)
-            driver.quit()
-            redis_db.remove_process("check_new_claims")
-            logger.info("Драйвер закрыт")
+        redis_db.remove_process("check_new_claims")
 
 
 
@@ -0,0 +1,140 @@
+import os, sys
+
+project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(project_directory)
+
+import json
+import threading
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from create_bot import logger
+from redis_db import redis_db
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+# Таймаут короткой пробы локатора (общие стратегии, строки уже отрисованной таблицы), сек
+SELECTOR_PROBE_TIMEOUT = float(os.getenv("SELECTOR_PROBE_TIMEOUT", 1.5))
+# Файл, дублирующий сохранённые в Redis победившие стратегии
+SELECTOR_CACHE_FILE = os.getenv("SELECTOR_CACHE_FILE", "data/selector_strategies.json")
+
+
+def strategy_key(strategy: dict) -> str:
+    """Устойчивый ключ стратегии: описание не зависит от номера строки в локаторе"""
+    return strategy.get('key') or strategy['desc']
+
+
+class StrategyRegistry:
+    """
+    Запоминает, какая стратегия поиска элемента последней сработала для каждого действия,
+    и предлагает её первой при следующем поиске.
+
+    Победители хранятся в Redis (hash selector_winners) и дублируются в файл на диске,
+    чтобы переживать перезапуск бота и недоступность Redis.
+    """
+
+    def __init__(self, cache_file: str = SELECTOR_CACHE_FILE):
+        self.cache_file = cache_file
+        self._winners: dict[str, str] | None = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        if self._winners is not None:
+            return self._winners
+        winners = redis_db.get_selector_winners()
+        if not winners and os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    winners = json.load(f)
+            except Exception as e:
+                logger.warning(f"Не удалось прочитать кэш стратегий {self.cache_file}: {e}")
+        self._winners = winners or {}
+        return self._winners
+
+    def _save_to_file(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(self._winners, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить кэш стратегий {self.cache_file}: {e}")
+
+    def get_winner(self, action: str) -> str | None:
+        with self._lock:
+            return self._load().get(action)
+
+    def record_winner(self, action: str, strategy: dict):
+        """Запоминает сработавшую стратегию для действия"""
+        key = strategy_key(strategy)
+        with self._lock:
+            winners = self._load()
+            if winners.get(action) == key:
+                return
+            winners[action] = key
+            redis_db.set_selector_winner(action, key)
+            self._save_to_file()
+        logger.info(f"Для действия «{action}» запомнена стратегия: {key}")
+
+    def ordered(self, action: str, strategies: list[dict]) -> list[dict]:
+        """Возвращает стратегии в порядке: сначала последняя сработавшая, затем остальные"""
+        winner = self.get_winner(action)
+        return sorted(strategies, key=lambda strategy: strategy_key(strategy) != winner)
+
+
+strategy_registry = StrategyRegistry()
+
+
+def _wait_any_strategy(driver, strategies: list[dict], timeout: float, condition):
+    """Опрашивает стратегии по кругу (в заданном порядке) в пределах timeout"""
+    def any_strategy(d):
+        for strategy in strategies:
+            try:
+                element = condition((strategy['by'], strategy['locator']))(d)
+            except Exception:
+                continue
+            if element:
+                return element, strategy
+        return False
+
+    try:
+        return WebDriverWait(driver, timeout).until(any_strategy)
+    except TimeoutException:
+        return None, None
+
+
+def find_element_by_strategies(driver, action: str, strategies: list[dict], timeout: float = 15,
+                               condition=EC.element_to_be_clickable,
+                               probe_timeout: float = SELECTOR_PROBE_TIMEOUT):
+    """
+    Ищет элемент по списку стратегий {'by', 'locator', 'desc', 'fallback'}.
+
+    Точные стратегии опрашиваются по кругу весь timeout, первой в каждом опросе —
+    последняя сработавшая. Общие стратегии с 'fallback': True проверяются только после этого,
+    в пределах probe_timeout, и никогда не запоминаются как сработавшие: иначе при медленной
+    отрисовке страницы общий локатор мог бы найти другой элемент и стать первым для всех следующих поисков.
+
+    Returns:
+        tuple: (element, strategy) или (None, None), если элемент не найден
+    """
+    precise = strategy_registry.ordered(action, [strategy for strategy in strategies if not strategy.get('fallback')])
+    fallbacks = [strategy for strategy in strategies if strategy.get('fallback')]
+
+    # 1. Точные стратегии — полное ожидание
+    if precise:
+        element, strategy = _wait_any_strategy(driver, precise, timeout, condition)
+        if element is not None:
+            strategy_registry.record_winner(action, strategy)
+            return element, strategy
+        logger.warning(f"«{action}»: элемент не найден точными стратегиями за {timeout} сек")
+
+    # 2. Общие стратегии — короткая проба, без запоминания
+    if fallbacks:
+        element, strategy = _wait_any_strategy(driver, fallbacks, probe_timeout, condition)
+        if element is not None:
+            logger.warning(f"«{action}»: элемент найден общей стратегией — {strategy['desc']}")
+            return element, strategy
+
+    logger.warning(f"«{action}»: элемент не найден ни одной стратегией")
+    return None, None
@@ -0,0 +1,204 @@
+import os, sys
+
+project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(project_directory)
+
+import threading
+import time
+from contextlib import contextmanager
+from create_bot import logger
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+# Включение пула (0 — старое поведение: новый браузер и выход из аккаунта на каждый вызов)
+SESSION_POOL_ENABLED = os.getenv("SESSION_POOL_ENABLED", "1") == "1"
+# Максимальное время жизни одного браузера в пуле, сек (после — пересоздаём)
+SESSION_MAX_AGE = int(os.getenv("SESSION_MAX_AGE", 6 * 60 * 60))
+
+
+class BrowserSession:
+    """Браузерная сессия одной управляющей компании"""
+
+    def __init__(self, company_name: str):
+        self.company_name = company_name
+        self.driver = None
+        self.authorized = False
+        self.created_at = 0.0
+        self.last_used = 0.0
+        # Выставляется вызывающим кодом после ошибки WebDriver — драйвер будет закрыт при возврате
+        self.broken = False
+        # Драйвер Selenium не потокобезопасен — одновременно с сессией работает только один вызов
+        self.lock = threading.Lock()
+
+
+class SessionPool:
+    """
+    Пул авторизованных браузеров, ключ — название управляющей компании из COMPANY_ACCESS.
+
+    Держит драйверы "тёплыми" между запусками планировщика: перед выдачей проверяет
+    авторизацию и выполняет повторный вход только если сессия на сайте истекла.
+
+    Args:
+        create_driver: функция без аргументов, создающая новый драйвер
+        authorize: функция (driver, company_name) -> bool, выполняющая вход на сайт
+        is_authorized: функция (driver) -> bool, проверяющая, что сессия ещё активна
+        close_driver: функция (driver), корректно закрывающая драйвер
+        needs_recycle: функция (driver) -> bool, True — браузер пора пересоздать (например, по памяти)
+        on_checkout: функция (driver, company_name), вызываемая перед выдачей авторизованной сессии
+        max_age: максимальный возраст драйвера в секундах
+        enabled: если False — драйвер закрывается после каждого использования
+    """
+
+    def __init__(self, create_driver, authorize, is_authorized, close_driver, needs_recycle=None,
+                 on_checkout=None, max_age: int = SESSION_MAX_AGE, enabled: bool = SESSION_POOL_ENABLED):
+        self.create_driver = create_driver
+        self.authorize = authorize
+        self.is_authorized = is_authorized
+        self.close_driver = close_driver
+        self.needs_recycle = needs_recycle
+        self.on_checkout = on_checkout
+        self.max_age = max_age
+        self.enabled = enabled
+        self._sessions: dict[str, BrowserSession] = {}
+        self._lock = threading.Lock()
+
+    def _get_session(self, company_name: str) -> BrowserSession:
+        key = company_name.lower()
+        with self._lock:
+            if key not in self._sessions:
+                self._sessions[key] = BrowserSession(company_name)
+            return self._sessions[key]
+
+    def _is_alive(self, session: BrowserSession) -> bool:
+        """Проверяет, что процесс браузера жив и драйвер ещё не устарел"""
+        if session.driver is None:
+            return False
+        if time.time() - session.created_at > self.max_age:
+            logger.info(f"Сессия УК {session.company_name} старше {self.max_age} сек — пересоздаём браузер")
+            return False
+        if self.needs_recycle is not None and self.needs_recycle(session.driver):
+            logger.info(f"Браузер сессии УК {session.company_name} пересоздаётся по превышению ресурсов")
+            return False
+        try:
+            session.driver.current_url
+            return True
+        except Exception as e:
+            logger.warning(f"Браузер сессии УК {session.company_name} не отвечает: {e}")
+            return False
+
+    def _discard(self, session: BrowserSession):
+        """Закрывает драйвер сессии"""
+        if session.driver is not None:
+            try:
+                self.close_driver(session.driver)
+            except Exception as e:
+                logger.warning(f"Ошибка при закрытии драйвера УК {session.company_name}: {e}")
+        session.driver = None
+        session.authorized = False
+
+    def _checkout(self, session: BrowserSession):
+        """Готовит к выдаче авторизованный драйвер"""
+        session.broken = False
+        if self._is_alive(session):
+            if self.is_authorized(session.driver):
+                logger.info(f"Используем активную сессию УК {session.company_name}")
+                session.authorized = True
+                return
+            logger.info(f"Сессия УК {session.company_name} истекла — выполняем повторный вход")
+            session.authorized = self.authorize(session.driver, session.company_name)
+            if session.authorized:
+                return
+        self._discard(session)
+
+        session.driver = self.create_driver()
+        session.created_at = time.time()
+        session.authorized = self.authorize(session.driver, session.company_name)
+        if not session.authorized:
+            logger.warning(f"Не удалось подтвердить авторизацию для УК {session.company_name}")
+
+    @contextmanager
+    def session(self, company_name: str):
+        """
+        Выдаёт авторизованную сессию компании на время блока with.
+
+        Пример:
+            with session_pool.session("Радуга") as session:
+                session.driver.get(...)
+        """
+        session = self._get_session(company_name)
+        with session.lock:
+            try:
+                self._checkout(session)
+                if session.authorized and self.on_checkout is not None:
+                    try:
+                        self.on_checkout(session.driver, session.company_name)
+                    except Exception as e:
+                        logger.warning(f"Ошибка обработчика выдачи сессии УК {session.company_name}: {e}")
+                yield session
+            except Exception:
+                # После необработанной ошибки состояние браузера неизвестно
+                self._discard(session)
+                raise
+            finally:
+                session.last_used = time.time()
+                if not self.enabled or session.broken:
+                    self._discard(session)
+
+    def invalidate(self, company_name: str):
+        """Принудительно закрывает сессию компании (например, после ошибки WebDriver)"""
+        session = self._get_session(company_name)
+        with session.lock:
+            self._discard(session)
+
+    def release_idle(self) -> bool:
+        """
+        Закрывает браузер, который дольше всех простаивает без работы,
+        чтобы освободить место под новый. Занятые сессии не трогает.
+
+        Returns:
+            bool: True, если браузер был закрыт
+        """
+        with self._lock:
+            sessions = sorted(
+                (session for session in self._sessions.values() if session.driver is not None),
+                key=lambda session: session.last_used
+            )
+        for session in sessions:
+            if not session.lock.acquire(blocking=False):
+                continue
+            try:
+                if session.driver is None:
+                    continue
+                logger.info(f"Закрываем простаивающий браузер УК {session.company_name}")
+                self._discard(session)
+                return True
+            finally:
+                session.lock.release()
+        return False
+
+    def recycle_idle(self) -> int:
+        """Пересоздаёт при следующем использовании простаивающие браузеры, превысившие лимиты"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        recycled = 0
+        for session in sessions:
+            if not session.lock.acquire(blocking=False):
+                continue
+            try:
+                if session.driver is not None and not self._is_alive(session):
+                    self._discard(session)
+                    recycled += 1
+            finally:
+                session.lock.release()
+        return recycled
+
+    def close_all(self):
+        """Закрывает все браузеры пула (при остановке бота)"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            with session.lock:
+                self._discard(session)
+        logger.info("Все сессии пула браузеров закрыты")
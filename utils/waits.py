@@ -0,0 +1,156 @@
+import os, sys
+
+project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(project_directory)
+
+import re
+import time
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+from create_bot import logger
+from utils.network_tracker import get_network_tracker
+
+
+# Частота опроса условий, сек
+POLL_FREQUENCY = 0.2
+
+
+class WaitBudget:
+    """
+    Бюджет времени на шаг сценария: все ожидания внутри шага
+    делят общий лимит и не могут суммарно превысить его.
+
+    Пример:
+        budget = WaitBudget(30, "заявка 6180019")
+        wait_for_url_matches(driver, r"/\\d+$", timeout=budget.timeout(10))
+    """
+
+    def __init__(self, total: float, name: str = ""):
+        self.total = total
+        self.name = name
+        self.deadline = time.monotonic() + total
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def timeout(self, step_max: float) -> float:
+        """Таймаут очередного ожидания: не больше step_max и не больше остатка бюджета"""
+        return min(step_max, self.remaining())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+def wait_until(driver, condition, timeout: float, description: str = "") -> bool:
+    """
+    Ждёт выполнения условия condition(driver) не дольше timeout секунд.
+
+    Returns:
+        bool: True, если условие выполнено; False по таймауту
+    """
+    if timeout <= 0:
+        return bool(condition(driver))
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(condition)
+        return True
+    except TimeoutException:
+        if description:
+            logger.debug(f"Ожидание «{description}» не дождалось результата за {timeout:.1f} сек")
+        return False
+
+
+ANGULAR_STABLE_JS = """
+try {
+    if (window.getAllAngularTestabilities) {
+        return window.getAllAngularTestabilities().every(t => t.isStable());
+    }
+} catch (e) {}
+// Testability недоступна в production‑сборке — полагаемся на остальные признаки
+return true;
+"""
+
+
+def angular_is_stable(driver) -> bool:
+    """True, если в зоне Angular нет незавершённых макрозадач"""
+    try:
+        return bool(driver.execute_script(ANGULAR_STABLE_JS))
+    except Exception:
+        return True
+
+
+def wait_for_angular_stable(driver, timeout: float = 10) -> bool:
+    """Ждёт стабилизации зоны Angular"""
+    return wait_until(driver, angular_is_stable, timeout, "стабилизация Angular")
+
+
+def wait_for_network_idle(driver, timeout: float = 10, idle_time: float = 0.5) -> bool:
+    """Ждёт, пока у браузера не останется активных XHR/Fetch запросов (по событиям CDP)"""
+    tracker = get_network_tracker(driver)
+    return wait_until(driver, lambda d: tracker.is_idle(idle_time), timeout, "завершение сетевых запросов")
+
+
+def wait_for_page_ready(driver, timeout: float = 10, idle_time: float = 0.5) -> bool:
+    """
+    Ждёт готовности страницы: document.readyState, стабильность Angular
+    и отсутствие активных сетевых запросов. Все три ожидания делят общий таймаут.
+    """
+    budget = WaitBudget(timeout)
+    ready = wait_until(
+        driver,
+        lambda d: d.execute_script("return document.readyState") == "complete",
+        budget.timeout(timeout),
+        "document.readyState"
+    )
+    ready = wait_for_angular_stable(driver, budget.timeout(timeout)) and ready
+    ready = wait_for_network_idle(driver, budget.timeout(timeout), idle_time) and ready
+    return ready
+
+
+def count_rows(driver, css_selector: str = "tr.cdk-row") -> int:
+    """Количество строк таблицы на странице (один запрос к браузеру)"""
+    return driver.execute_script("return document.querySelectorAll(arguments[0]).length;", css_selector)
+
+
+def wait_for_row_count_growth(driver, previous_count: int, timeout: float = 15, css_selector: str = "tr.cdk-row") -> int:
+    """
+    Ждёт, пока количество строк таблицы станет больше previous_count.
+
+    Returns:
+        int: новое количество строк (равно previous_count, если роста не было)
+    """
+    wait_until(driver, lambda d: count_rows(d, css_selector) > previous_count, timeout, "рост количества строк")
+    return count_rows(driver, css_selector)
+
+
+def wait_for_list_load(driver, previous_count: int, timeout: float = 15, css_selector: str = "tr.cdk-row",
+                       idle_time: float = 0.3) -> int:
+    """
+    Ждёт подгрузки списка после клика: роста количества строк таблицы или завершения
+    перехваченного запроса списка (ответ получен, сеть молчит idle_time секунд) —
+    что наступит раньше. Перехват ответов включает NetworkTracker.capture().
+
+    Returns:
+        int: новое количество строк (равно previous_count, если строк не добавилось)
+    """
+    tracker = get_network_tracker(driver)
+    responses_before = tracker.captured_total
+
+    def list_loaded(d):
+        if count_rows(d, css_selector) > previous_count:
+            return True
+        return tracker.captured_total > responses_before and tracker.is_idle(idle_time)
+
+    wait_until(driver, list_loaded, timeout, "подгрузка списка")
+    return count_rows(driver, css_selector)
+
+
+def wait_for_url_change(driver, old_url: str, timeout: float = 10) -> bool:
+    """Ждёт, пока адрес страницы станет отличным от old_url"""
+    return wait_until(driver, lambda d: d.current_url != old_url, timeout, "смена URL")
+
+
+def wait_for_url_matches(driver, pattern: str, timeout: float = 10) -> bool:
+    """Ждёт, пока адрес страницы совпадёт с регулярным выражением pattern"""
+    compiled = re.compile(pattern)
+    return wait_until(driver, lambda d: compiled.search(d.current_url) is not None, timeout, f"URL {pattern}")